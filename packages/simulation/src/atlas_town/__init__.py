@@ -2,6 +2,8 @@
 
 __version__ = "0.1.0"
 
+from typing import TYPE_CHECKING, Any
+
 from atlas_town.agents import (
     AccountantAgent,
     AgentState,
@@ -13,7 +15,6 @@ from atlas_town.agents import (
     create_customers_for_industry,
     create_vendors_for_industry,
 )
-from atlas_town.clients import ClaudeClient, GeminiClient, OpenAIClient
 from atlas_town.config import configure_logging, get_settings
 from atlas_town.events import (
     EventPublisher,
@@ -27,6 +28,12 @@ from atlas_town.orchestrator import Orchestrator, OrganizationContext
 from atlas_town.scheduler import DayPhase, Scheduler, SimulatedTime
 from atlas_town.tools import AtlasAPIClient, ToolExecutor
 
+if TYPE_CHECKING:
+    from atlas_town.clients import ClaudeClient, GeminiClient, OpenAIClient
+
+# Re-exported lazily so importing the package doesn't load every provider SDK
+_LAZY_CLIENTS = frozenset({"ClaudeClient", "GeminiClient", "OpenAIClient"})
+
 __all__ = [
     # Version
     "__version__",
@@ -64,3 +71,11 @@ __all__ = [
     "get_settings",
     "configure_logging",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_CLIENTS:
+        from atlas_town import clients
+
+        return getattr(clients, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -14,7 +14,14 @@ from atlas_town.agents.customer import (
     CustomerType,
     create_customers_for_industry,
 )
-from atlas_town.agents.owner import LLMProvider, OwnerAgent, OwnerPersona, create_all_owners
+from atlas_town.agents.owner import (
+    LLMProvider,
+    OwnerAgent,
+    OwnerPersona,
+    create_all_owners,
+    create_all_owners_async,
+    get_shared_llm_client,
+)
 from atlas_town.agents.vendor import (
     VendorAgent,
     VendorProfile,
@@ -36,6 +43,8 @@ __all__ = [
     "OwnerPersona",
     "LLMProvider",
     "create_all_owners",
+    "create_all_owners_async",
+    "get_shared_llm_client",
     # Customer
     "CustomerAgent",
     "CustomerProfile",
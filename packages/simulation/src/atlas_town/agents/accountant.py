@@ -1,21 +1,45 @@
 """Sarah the Accountant - manages books for all organizations."""
 
-from typing import Any
+from __future__ import annotations
+
+import asyncio
+import copy
+import hashlib
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Sequence
+from typing import TYPE_CHECKING, Any
 from uuid import UUID
 
-import structlog
-
-from atlas_town.agents.base import AgentAction, AgentState, BaseAgent
-from atlas_town.agents.owner import LLMProvider
-from atlas_town.clients.claude import ClaudeClient
-from atlas_town.clients.gemini import GeminiClient
-from atlas_town.clients.ollama import OllamaClient
-from atlas_town.clients.openai_client import OpenAIClient
+from atlas_town.agents.base import AgentAction, AgentMessage, AgentState, BaseAgent
+from atlas_town.agents.owner import LLMProvider, get_shared_llm_client
+from atlas_town.clients._json import loads
+from atlas_town.clients.toon import TOON_FORMAT_NOTE
 from atlas_town.config import get_settings
 from atlas_town.tools.definitions import ACCOUNTANT_TOOLS
 from atlas_town.tools.executor import ToolExecutor
 
-logger = structlog.get_logger(__name__)
+if TYPE_CHECKING:
+    from atlas_town.agents.owner import LLMClient
+
+# Tools that change state later calls depend on; a turn containing one of
+# these runs its calls sequentially, in the order the model emitted them.
+ORDER_DEPENDENT_TOOLS = frozenset({"switch_organization"})
+
+# Structurally identical invoice requests within this window reuse the
+# previous result instead of running the LLM loop (and invoicing) again.
+INVOICE_CACHE_TTL_SECONDS = 60.0
+INVOICE_CACHE_MAX_ENTRIES = 128
+
+ACCOUNTANT_SESSION_ID = "atlas-town-accountant"
+
+# Sarah's history persists across tasks; older turns are folded into a summary
+MAX_HISTORY_MESSAGES = 60
+KEEP_RECENT_MESSAGES = 20
+
+HISTORY_SUMMARY_PROMPT = """Summarize this bookkeeping conversation for your own
+future reference. Keep organization names, document numbers, IDs, amounts, and
+any unresolved issues. Be concise."""
 
 SARAH_SYSTEM_PROMPT = """You are Sarah Chen, a professional bookkeeper and accountant managing
 the finances for multiple small businesses in Atlas Town. You are meticulous,
@@ -60,6 +84,8 @@ When reconciling bank activity:
 4. Categorize clear items to the right income/expense account
 5. Flag any items that require investigation or missing entries
 
+""" + TOON_FORMAT_NOTE + """
+
 ## Communication Style
 When explaining your work:
 - State which organization you're working on
@@ -81,7 +107,7 @@ class AccountantAgent(BaseAgent):
     def __init__(
         self,
         agent_id: UUID | None = None,
-        llm_client: ClaudeClient | OpenAIClient | GeminiClient | OllamaClient | None = None,
+        llm_client: LLMClient | None = None,
         llm_provider: LLMProvider | None = None,
         tool_executor: ToolExecutor | None = None,
     ):
@@ -89,42 +115,35 @@ class AccountantAgent(BaseAgent):
             agent_id=agent_id,
             name="Sarah Chen",
             description="Professional bookkeeper managing finances for Atlas Town businesses",
+            max_history_messages=MAX_HISTORY_MESSAGES,
+            keep_recent_messages=KEEP_RECENT_MESSAGES,
         )
 
+        # Every accountant sends the same prompt prefix, so they share one key
+        # that lets providers route repeat prefixes to a warm cache
+        self.session_id = ACCOUNTANT_SESSION_ID
         self._llm_client = llm_client or self._create_llm_client(llm_provider)
         self._tool_executor = tool_executor
-        self._logger = logger.bind(agent_id=str(self.id), agent_name=self.name)
-
-    def _create_llm_client(
-        self, provider: LLMProvider | None = None
-    ) -> ClaudeClient | OpenAIClient | GeminiClient | OllamaClient:
-        """Create the LLM client based on provider or environment config."""
-        settings = get_settings()
+        self._tool_semaphore = asyncio.Semaphore(max(1, get_settings().tool_concurrency_limit))
+        self._invoice_cache: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
 
+    def _create_llm_client(self, provider: LLMProvider | None = None) -> LLMClient:
+        """Get the shared LLM client for the provider or environment config."""
         # Use explicit provider, env var override, or default to Claude
         if provider is None:
-            provider_str = settings.llm_provider.lower()
+            provider_str = get_settings().llm_provider.lower()
             try:
                 provider = LLMProvider(provider_str)
             except ValueError:
                 provider = LLMProvider.CLAUDE
 
-        if provider == LLMProvider.CLAUDE:
-            return ClaudeClient()
-        elif provider == LLMProvider.OPENAI:
-            return OpenAIClient()
-        elif provider == LLMProvider.GEMINI:
-            return GeminiClient()
-        elif provider == LLMProvider.OLLAMA:
-            return OllamaClient()
-        elif provider == LLMProvider.LM_STUDIO:
-            return OpenAIClient(
-                api_key="lm-studio",
-                base_url=settings.lm_studio_base_url,
-                model=settings.lm_studio_model or None,
-            )
-        else:
-            return ClaudeClient()
+        return get_shared_llm_client(provider)
+
+    def _prompt_cache_options(self) -> dict[str, Any]:
+        """Route Sarah's turns to one prompt cache on clients that support it."""
+        if getattr(self._llm_client, "accepts_prompt_cache_key", False):
+            return {"prompt_cache_key": self.session_id}
+        return {}
 
     def set_tool_executor(self, executor: ToolExecutor) -> None:
         """Set the tool executor for this agent."""
@@ -134,31 +153,39 @@ class AccountantAgent(BaseAgent):
         """Get Sarah's system prompt."""
         return SARAH_SYSTEM_PROMPT
 
-    def _get_tools(self) -> list[dict[str, Any]]:
+    def _get_tools(self) -> Sequence[dict[str, Any]]:
         """Get the accounting tools available to Sarah."""
         return ACCOUNTANT_TOOLS
 
-    def _format_messages_for_llm(self) -> list[dict[str, Any]]:
-        """Format conversation history for the LLM client."""
-        messages = []
-        for msg in self._conversation_history:
-            messages.append({
-                "role": msg.role,
-                "content": msg.content,
-                "tool_calls": msg.tool_calls,
-                "tool_call_id": msg.tool_call_id,
-            })
-        return messages
+    async def _summarize_messages(self, messages: list[AgentMessage]) -> str:
+        """Summarize dropped history with the LLM, falling back to extraction."""
+        transcript = await super()._summarize_messages(messages)
+        try:
+            response = await self._llm_client.generate(
+                system_prompt=HISTORY_SUMMARY_PROMPT,
+                messages=[{"role": "user", "content": transcript}],
+                tools=None,
+            )
+        except Exception as e:
+            self._logger.warning("history_summary_failed", error=str(e))
+            return transcript
+        return response.content or transcript
 
     async def _generate_response(self) -> AgentAction:
         """Generate a response using Claude."""
         self._logger.debug("generating_response")
 
-        # Call the LLM
+        # Call the LLM; when it streams, read-only tool calls are prefetched
+        # while the model is still emitting the rest of its turn
+        options = self._prompt_cache_options()
+        if getattr(self._llm_client, "streams_tool_calls", False) and self._tool_executor:
+            options["on_tool_use"] = self._make_tool_prefetcher(self._tool_executor)
+
         response = await self._llm_client.generate(
             system_prompt=self._get_system_prompt(),
             messages=self._format_messages_for_llm(),
             tools=self._get_tools(),
+            **options,
         )
 
         # Add assistant message to history
@@ -169,13 +196,14 @@ class AccountantAgent(BaseAgent):
 
         # Determine the action type
         if response.tool_calls:
-            # Agent wants to use a tool
-            tool_call = response.tool_calls[0]  # Process one tool at a time
+            # Agent wants to use one or more tools
+            tool_call = response.tool_calls[0]
             action = AgentAction(
                 agent_id=self.id,
                 action_type="tool_call",
                 tool_name=tool_call["name"],
                 tool_args=tool_call["arguments"],
+                tool_calls=response.tool_calls,
                 message=response.content,
             )
             self.state = AgentState.ACTING
@@ -198,6 +226,44 @@ class AccountantAgent(BaseAgent):
 
         return action
 
+    def _make_tool_prefetcher(
+        self, executor: ToolExecutor
+    ) -> Callable[[str, dict[str, Any]], None]:
+        """Build a per-turn callback that prefetches read-only tool calls.
+
+        Once an order-dependent tool appears in the turn, later reads may run
+        against different state, so speculation stops for the rest of the turn.
+        """
+        blocked = False
+
+        def prefetch(tool_name: str, arguments: dict[str, Any]) -> None:
+            nonlocal blocked
+            if tool_name in ORDER_DEPENDENT_TOOLS:
+                blocked = True
+            if not blocked and executor.prefetch(tool_name, arguments):
+                self._logger.debug("tool_prefetched", tool=tool_name)
+
+        return prefetch
+
+    async def warmup(self) -> None:
+        """Issue a throwaway turn so the provider caches Sarah's prompt prefix.
+
+        The system prompt and tool schema are sent exactly as in real turns,
+        so the first task of the simulation starts from a warm prefix cache
+        (or, for local models, an already-loaded model). Nothing is added to
+        the conversation history, and failures are logged rather than raised.
+        """
+        try:
+            await self._llm_client.generate(
+                system_prompt=self._get_system_prompt(),
+                messages=[{"role": "user", "content": "Ready?"}],
+                tools=self._get_tools(),
+                **self._prompt_cache_options(),
+            )
+            self._logger.info("warmup_completed")
+        except Exception as e:
+            self._logger.warning("warmup_failed", error=str(e))
+
     async def execute_tool(self, tool_name: str, tool_args: dict[str, Any]) -> dict[str, Any]:
         """Execute a tool call and return the result.
 
@@ -215,6 +281,32 @@ class AccountantAgent(BaseAgent):
         result = await self._tool_executor.execute(tool_name, tool_args)
         return result
 
+    async def _execute_tool_calls(
+        self, tool_calls: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """Execute every tool call from one LLM turn.
+
+        Independent calls run concurrently (bounded by TOOL_CONCURRENCY_LIMIT)
+        in a task group, so an unexpected error cancels the turn's other calls;
+        turns that include an order-dependent tool run sequentially.
+
+        Args:
+            tool_calls: Tool calls as returned by the LLM client.
+
+        Returns:
+            Tool results, in the same order as ``tool_calls``.
+        """
+        if any(tc["name"] in ORDER_DEPENDENT_TOOLS for tc in tool_calls):
+            return [await self.execute_tool(tc["name"], tc["arguments"]) for tc in tool_calls]
+
+        async def run(tool_call: dict[str, Any]) -> dict[str, Any]:
+            async with self._tool_semaphore:
+                return await self.execute_tool(tool_call["name"], tool_call["arguments"])
+
+        async with asyncio.TaskGroup() as tg:
+            runs = [tg.create_task(run(tc)) for tc in tool_calls]
+        return [r.result() for r in runs]
+
     async def run_task(self, task: str, max_iterations: int = 10) -> str:
         """Run a task to completion, handling tool calls automatically.
 
@@ -228,59 +320,105 @@ class AccountantAgent(BaseAgent):
         Returns:
             Final response from Sarah.
         """
-        self._logger.info("starting_task", task=task[:100])
-
-        # Initial prompt
-        current_prompt = task
-        final_response = ""
-
-        for iteration in range(max_iterations):
-            self._logger.debug("iteration", number=iteration + 1)
-
-            # Think and decide on action
-            action = await self.think(current_prompt)
-
-            if action.action_type == "tool_call":
-                # Execute the tool
-                if not self._tool_executor:
-                    error_msg = "Cannot execute tools: no tool executor configured"
-                    self._logger.error("no_tool_executor")
-                    return error_msg
-
-                result = await self.execute_tool(
-                    action.tool_name or "",
-                    action.tool_args,
-                )
-
-                # Add tool result to conversation
-                # Find the tool call ID from the last assistant message
-                tool_call_id = "unknown"
-                for msg in reversed(self._conversation_history):
-                    if msg.role == "assistant" and msg.tool_calls:
-                        tool_call_id = msg.tool_calls[-1].get("id", "unknown")
-                        break
-
-                self.add_tool_result(
-                    tool_call_id=tool_call_id,
-                    result=str(result),
-                )
-
-                # Continue the loop - Sarah will process the result
-                current_prompt = ""  # No new user input, just continue
-
-            elif action.action_type == "complete":
-                # Task is done
-                final_response = action.message or ""
-                self._logger.info("task_completed", response_length=len(final_response))
-                break
+        with self.log_context():
+            self._logger.info("starting_task", task=task[:100])
 
-            elif action.action_type == "message":
-                # Sarah sent a message but may need to continue
-                final_response = action.message or ""
-                # Check if she's asking for clarification or done
-                break
+            # Initial prompt
+            current_prompt = task
+            final_response = ""
+
+            for iteration in range(max_iterations):
+                self._logger.debug("iteration", number=iteration + 1)
+
+                # Think and decide on action
+                action = await self.think(current_prompt)
+
+                if action.action_type == "tool_call":
+                    # Execute the tools
+                    if not self._tool_executor:
+                        error_msg = "Cannot execute tools: no tool executor configured"
+                        self._logger.error("no_tool_executor")
+                        return error_msg
+
+                    results = await self._execute_tool_calls(action.tool_calls)
+
+                    # Answer every tool call so the next LLM request sees all results
+                    for tool_call, result in zip(action.tool_calls, results, strict=True):
+                        self.add_tool_result(
+                            tool_call_id=tool_call.get("id", "unknown"),
+                            result=result,
+                        )
 
-        return final_response
+                    # Continue the loop - Sarah will process the result
+                    current_prompt = ""  # No new user input, just continue
+
+                elif action.action_type == "complete":
+                    # Task is done
+                    final_response = action.message or ""
+                    self._logger.info("task_completed", response_length=len(final_response))
+                    break
+
+                elif action.action_type == "message":
+                    # Sarah sent a message but may need to continue
+                    final_response = action.message or ""
+                    # Check if she's asking for clarification or done
+                    break
+
+            return final_response
+
+    async def run_tasks_batch(
+        self,
+        tasks: list[tuple[UUID, str]],
+        tool_executors: dict[UUID, ToolExecutor] | None = None,
+        max_inflight: int = 8,
+        on_result: Callable[[UUID, str], Awaitable[None] | None] | None = None,
+    ) -> list[str]:
+        """Run independent per-organization tasks concurrently.
+
+        Each task runs on its own worker agent that shares this agent's LLM
+        client, so histories stay separate while the provider connection is
+        reused. Organizations with an entry in ``tool_executors`` (one API
+        client per org) run concurrently, up to ``max_inflight`` at a time.
+        Tasks for organizations without one fall back to this agent's shared
+        executor; those run one at a time after switching the API client to
+        the task's organization.
+
+        Args:
+            tasks: (org_id, task description) pairs.
+            tool_executors: Optional per-organization tool executors.
+            max_inflight: Maximum number of tasks running at once.
+            on_result: Optional callback invoked as each task finishes.
+
+        Returns:
+            Final responses, in the same order as ``tasks``.
+        """
+        executors = tool_executors or {}
+        inflight = asyncio.Semaphore(max(1, max_inflight))
+        shared_lock = asyncio.Lock()
+
+        async def run(org_id: UUID, task: str) -> str:
+            executor = executors.get(org_id)
+            worker = AccountantAgent(llm_client=self._llm_client, tool_executor=executor)
+            worker.set_organization(org_id)
+            async with inflight:
+                if executor is not None:
+                    response = await worker.run_task(task)
+                else:
+                    async with shared_lock:
+                        if self._tool_executor:
+                            await self._tool_executor.client.switch_organization(org_id)
+                            worker.set_tool_executor(self._tool_executor)
+                        response = await worker.run_task(task)
+            if on_result is not None:
+                maybe_awaitable = on_result(org_id, response)
+                if maybe_awaitable is not None:
+                    await maybe_awaitable
+            return response
+
+        self._logger.info("batch_started", task_count=len(tasks), max_inflight=max_inflight)
+        async with asyncio.TaskGroup() as tg:
+            runs = [tg.create_task(run(org_id, task)) for org_id, task in tasks]
+        return [r.result() for r in runs]
 
     async def process_invoice(
         self,
@@ -298,6 +436,12 @@ class AccountantAgent(BaseAgent):
         Returns:
             The created invoice details.
         """
+        cache_key = self._invoice_cache_key(customer_id, items, notes)
+        cached = self._invoice_cache.get(cache_key)
+        if cached is not None and time.monotonic() - cached[0] < INVOICE_CACHE_TTL_SECONDS:
+            self._logger.info("invoice_cache_hit", customer_id=customer_id)
+            return copy.deepcopy(cached[1])
+
         task = f"""Please create an invoice for customer {customer_id} with the following items:
 
 {self._format_items(items)}
@@ -306,22 +450,78 @@ Notes: {notes if notes else 'None'}
 
 After creating the invoice, please send it to the customer."""
 
+        # Sarah's history spans tasks, so remember where this one starts.
+        # Compaction only folds away a prefix of the history: if it takes this
+        # marker, everything older is gone with it.
+        history = self._conversation_history
+        before_task = history[-1] if history else None
         await self.run_task(task)
 
-        # Return the last tool result which should be the invoice
+        task_messages: list[AgentMessage] = []
         for msg in reversed(self._conversation_history):
-            if msg.role == "tool_result":
-                return {"status": "success", "result": msg.content}
+            if msg is before_task:
+                break
+            task_messages.append(msg)
+
+        # Return this task's last tool result, which should be the invoice
+        result: dict[str, Any] = next(
+            (
+                {"status": "success", "result": msg.content}
+                for msg in task_messages
+                if msg.role == "tool_result"
+            ),
+            {"status": "completed"},
+        )
+
+        if not self._created_invoice(task_messages):
+            # Nothing was created, so an identical retry must not be dropped
+            return result
+        self._invoice_cache[cache_key] = (time.monotonic(), copy.deepcopy(result))
+        self._invoice_cache.move_to_end(cache_key)
+        while len(self._invoice_cache) > INVOICE_CACHE_MAX_ENTRIES:
+            self._invoice_cache.popitem(last=False)
+        return result
 
-        return {"status": "completed"}
+    @staticmethod
+    def _created_invoice(messages: Sequence[AgentMessage]) -> bool:
+        """Whether a create_invoice call among ``messages`` reported success."""
+        call_ids = {
+            tc.get("id")
+            for msg in messages
+            if msg.role == "assistant"
+            for tc in msg.tool_calls
+            if tc.get("name") == "create_invoice"
+        }
+        for msg in messages:
+            if msg.role != "tool_result" or msg.tool_call_id not in call_ids:
+                continue
+            try:
+                outcome = loads(msg.content)
+            except ValueError:
+                continue
+            if isinstance(outcome, dict) and outcome.get("success") is True:
+                return True
+        return False
+
+    @staticmethod
+    def _invoice_cache_key(customer_id: str, items: list[dict[str, Any]], notes: str) -> str:
+        """Hash the structure of an invoice request, independent of item order."""
+        normalized_items = sorted(
+            (
+                str(item.get("description", "Item")),
+                str(item.get("quantity", 1)),
+                str(item.get("unit_price", "0.00")),
+            )
+            for item in items
+        )
+        payload = repr((customer_id, normalized_items, notes))
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
 
     def _format_items(self, items: list[dict[str, Any]]) -> str:
         """Format line items for a prompt."""
-        lines = []
-        for i, item in enumerate(items, 1):
-            lines.append(
-                f"{i}. {item.get('description', 'Item')} - "
-                f"Qty: {item.get('quantity', 1)}, "
-                f"Price: ${item.get('unit_price', '0.00')}"
-            )
-        return "\n".join(lines)
+        return "\n".join(
+            f"{i}. {item.get('description', 'Item')} - "
+            f"Qty: {item.get('quantity', 1)}, "
+            f"Price: ${item.get('unit_price', '0.00')}"
+            for i, item in enumerate(items, 1)
+        )
@@ -1,16 +1,89 @@
 """Base agent class defining the interface for all AI agents."""
 
+import gzip
+import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
+from collections.abc import Sequence
+from contextlib import AbstractContextManager
+from dataclasses import asdict, dataclass, field
 from datetime import UTC, datetime
 from enum import Enum
+from functools import cached_property
+from pathlib import Path
 from typing import Any
 from uuid import UUID, uuid4
 
 import structlog
 
+from atlas_town.clients._json import dumps, loads
+from atlas_town.clients.toon import TOON_PREFIX, encode_toon
+
 logger = structlog.get_logger(__name__)
 
+SUMMARY_PREFIX = "[Summary of earlier conversation]"
+# Characters of each message kept by the default extractive summary
+_SUMMARY_SNIPPET_CHARS = 200
+
+# Upper bound on a tool result fed back to the LLM (~5k tokens)
+MAX_TOOL_RESULT_CHARS = 20_000
+
+
+def _encode_tool_result(result: Any) -> tuple[str, bool]:
+    """Render a tool result, returning (text, is_table)."""
+    if isinstance(result, str):
+        return result, False
+    if isinstance(result, dict) and "result" in result:
+        table = encode_toon(result["result"], label="result")
+        if table is not None:
+            rest = {key: value for key, value in result.items() if key != "result"}
+            return f"{dumps(rest)}\n{table}", True
+    else:
+        table = encode_toon(result)
+        if table is not None:
+            return table, True
+    return dumps(result), False
+
+
+def format_tool_result(result: Any, max_chars: int = MAX_TOOL_RESULT_CHARS) -> str:
+    """Serialize a tool result for the conversation history.
+
+    Lists of same-shaped records (bare, or the ``result`` list of an executor
+    response) become a TOON table, which drops the per-row field names;
+    everything else is compact JSON, which is smaller than a Python repr and
+    is what the models expect to read. Oversized results are truncated:
+    tables and list results keep as many leading rows as fit, other payloads
+    are cut at ``max_chars``; either way a marker says what was dropped.
+    """
+    text, is_table = _encode_tool_result(result)
+    if len(text) <= max_chars:
+        return text
+
+    if is_table:
+        # Cells are escaped, so every line after the header is one row; a
+        # wrapped result has its other fields as a JSON line before it
+        lines = text.split("\n")
+        end = 1 if text.startswith(TOON_PREFIX) else 2
+        used = sum(len(line) + 1 for line in lines[:end])
+        while end < len(lines) and used + len(lines[end]) + 1 <= max_chars:
+            used += len(lines[end]) + 1
+            end += 1
+        return "\n".join(lines[:end]) + f"\n[...truncated {len(lines) - end} rows]"
+
+    rows = result.get("result") if isinstance(result, dict) else result
+    if isinstance(rows, list) and rows:
+        budget = max_chars - (len(text) - len(dumps(rows)))
+        kept = 0
+        used = 2  # enclosing brackets
+        for row in rows:
+            used += len(dumps(row)) + 1
+            if used > budget:
+                break
+            kept += 1
+        trimmed = {**result, "result": rows[:kept]} if isinstance(result, dict) else rows[:kept]
+        return f"{dumps(trimmed)} [...truncated {len(rows) - kept} rows]"
+
+    return f"{text[:max_chars]} [...truncated {len(text) - max_chars} chars]"
+
 
 class AgentState(str, Enum):
     """Possible states for an agent."""
@@ -22,38 +95,67 @@ class AgentState(str, Enum):
     ERROR = "error"
 
 
-@dataclass
-class AgentMessage:
+class _Timestamped:
+    """Mixin exposing ``created_ns`` (epoch nanoseconds) as a UTC datetime.
+
+    Records store the raw clock reading, which is much cheaper to take than
+    building a datetime; the conversion only happens if someone asks.
+    """
+
+    __slots__ = ()
+
+    created_ns: int
+
+    @property
+    def timestamp(self) -> datetime:
+        """When the record was created, as an aware UTC datetime."""
+        seconds, nanos = divmod(self.created_ns, 1_000_000_000)
+        return datetime.fromtimestamp(seconds, UTC).replace(microsecond=nanos // 1000)
+
+
+@dataclass(slots=True)
+class AgentMessage(_Timestamped):
     """A message in the agent's conversation history."""
 
     role: str  # "user", "assistant", or "tool_result"
     content: str
     tool_calls: list[dict[str, Any]] = field(default_factory=list)
     tool_call_id: str | None = None
-    timestamp: datetime = field(default_factory=lambda: datetime.now(UTC))
+    created_ns: int = field(default_factory=time.time_ns)
 
 
-@dataclass
-class AgentAction:
+@dataclass(slots=True)
+class AgentAction(_Timestamped):
     """An action taken by an agent."""
 
     agent_id: UUID
     action_type: str  # "tool_call", "message", "complete"
     tool_name: str | None = None
     tool_args: dict[str, Any] = field(default_factory=dict)
+    tool_calls: list[dict[str, Any]] = field(default_factory=list)  # all calls this turn
     message: str | None = None
-    timestamp: datetime = field(default_factory=lambda: datetime.now(UTC))
+    created_ns: int = field(default_factory=time.time_ns)
 
 
-@dataclass
-class AgentObservation:
+@dataclass(slots=True)
+class AgentObservation(_Timestamped):
     """An observation/result from an action."""
 
     action_id: UUID
     success: bool
     result: Any = None
     error: str | None = None
-    timestamp: datetime = field(default_factory=lambda: datetime.now(UTC))
+    created_ns: int = field(default_factory=time.time_ns)
+
+
+def _format_message(message: AgentMessage) -> dict[str, Any]:
+    """Convert a history message to the dict form the LLM clients accept."""
+    return {
+        "role": message.role,
+        "content": message.content,
+        "tool_calls": message.tool_calls,
+        "tool_call_id": message.tool_call_id,
+    }
 
 
 class BaseAgent(ABC):
@@ -67,6 +169,10 @@ class BaseAgent(ABC):
     Subclasses must implement:
     - _get_system_prompt(): Returns the agent's persona and instructions
     - _get_tools(): Returns the list of tools available to this agent
+
+    When ``max_history_messages`` is set, the conversation history is kept
+    bounded: once it grows past the limit, everything but the most recent
+    ``keep_recent_messages`` is folded into a single summary message.
     """
 
     def __init__(
@@ -74,25 +180,49 @@ class BaseAgent(ABC):
         agent_id: UUID | None = None,
         name: str = "Agent",
         description: str = "",
+        max_history_messages: int | None = None,
+        keep_recent_messages: int = 10,
     ):
+        if keep_recent_messages < 1:
+            raise ValueError("keep_recent_messages must be at least 1")
+        if max_history_messages is not None and keep_recent_messages >= max_history_messages:
+            raise ValueError("keep_recent_messages must be less than max_history_messages")
         self.id = agent_id or uuid4()
         self.name = name
         self.description = description
         self.state = AgentState.IDLE
         self._conversation_history: list[AgentMessage] = []
+        # LLM-ready dicts mirroring _conversation_history, kept in step with it
+        self._formatted_messages: list[dict[str, Any]] = []
         self._action_history: list[AgentAction] = []
+        # Tool call ids from the latest assistant turn still awaiting a result
+        self._pending_tool_call_ids: list[str] = []
         self._current_org_id: UUID | None = None
+        self._max_history_messages = max_history_messages
+        self._keep_recent_messages = keep_recent_messages
+        # Messages already written by dump_state(); None forces a full rewrite
+        self._persisted_upto: int | None = None
+        self._persisted_path: Path | None = None
 
-        self._logger = logger.bind(agent_id=str(self.id), agent_name=self.name)
+    @property
+    def conversation_history(self) -> Sequence[AgentMessage]:
+        """Get a read-only live view of the agent's conversation history.
+
+        Use snapshot_history() for a copy that will not change as the agent runs.
+        """
+        return self._conversation_history
 
     @property
-    def conversation_history(self) -> list[AgentMessage]:
-        """Get the agent's conversation history."""
+    def action_history(self) -> Sequence[AgentAction]:
+        """Get a read-only live view of the agent's action history."""
+        return self._action_history
+
+    def snapshot_history(self) -> list[AgentMessage]:
+        """Get a copy of the conversation history."""
         return self._conversation_history.copy()
 
-    @property
-    def action_history(self) -> list[AgentAction]:
-        """Get the agent's action history."""
+    def snapshot_actions(self) -> list[AgentAction]:
+        """Get a copy of the action history."""
         return self._action_history.copy()
 
     @property
@@ -100,6 +230,26 @@ class BaseAgent(ABC):
         """Get the current organization context."""
         return self._current_org_id
 
+    @cached_property
+    def _logger(self) -> Any:
+        """This agent's logger, bound to ``_log_fields()`` on first use.
+
+        Agents that never log outside log_context() never pay for the bind.
+        """
+        return logger.bind(**self._log_fields())
+
+    def _log_fields(self) -> dict[str, Any]:
+        """Get the fields identifying this agent in logs; subclasses may add their own."""
+        return {"agent_id": str(self.id), "agent_name": self.name}
+
+    def log_context(self) -> AbstractContextManager[Any]:
+        """Bind this agent's identity to every log line emitted in the block.
+
+        Unlike the instance logger, this also reaches the LLM clients and tool
+        executor the agent calls into.
+        """
+        return structlog.contextvars.bound_contextvars(**self._log_fields())
+
     def set_organization(self, org_id: UUID) -> None:
         """Set the organization context for this agent."""
         self._current_org_id = org_id
@@ -115,7 +265,7 @@ class BaseAgent(ABC):
         pass
 
     @abstractmethod
-    def _get_tools(self) -> list[dict[str, Any]]:
+    def _get_tools(self) -> Sequence[dict[str, Any]]:
         """Get the list of tools available to this agent.
 
         Returns:
@@ -123,10 +273,22 @@ class BaseAgent(ABC):
         """
         pass
 
+    def _append_message(self, message: AgentMessage) -> None:
+        self._conversation_history.append(message)
+        self._formatted_messages.append(_format_message(message))
+
+    def _format_messages_for_llm(self) -> list[dict[str, Any]]:
+        """Get the conversation history in the shape the LLM clients expect.
+
+        The list is maintained incrementally as messages are added, so this
+        is O(1); callers must treat it as read-only.
+        """
+        return self._formatted_messages
+
     def add_user_message(self, content: str) -> None:
         """Add a user message to the conversation history."""
         message = AgentMessage(role="user", content=content)
-        self._conversation_history.append(message)
+        self._append_message(message)
         self._logger.debug("user_message_added", content_length=len(content))
 
     def add_assistant_message(
@@ -138,21 +300,30 @@ class BaseAgent(ABC):
             content=content,
             tool_calls=tool_calls or [],
         )
-        self._conversation_history.append(message)
+        self._append_message(message)
+        if message.tool_calls:
+            self._pending_tool_call_ids = [
+                tc.get("id", "unknown") for tc in message.tool_calls
+            ]
         self._logger.debug(
             "assistant_message_added",
             content_length=len(content),
-            tool_calls=len(tool_calls or []),
+            tool_calls=len(message.tool_calls),
         )
 
-    def add_tool_result(self, tool_call_id: str, result: str) -> None:
-        """Add a tool result to the conversation history."""
+    def add_tool_result(self, tool_call_id: str, result: Any) -> None:
+        """Add a tool result to the conversation history.
+
+        Non-string results are serialized with format_tool_result().
+        """
         message = AgentMessage(
             role="tool_result",
-            content=result,
+            content=format_tool_result(result),
             tool_call_id=tool_call_id,
         )
-        self._conversation_history.append(message)
+        self._append_message(message)
+        if tool_call_id in self._pending_tool_call_ids:
+            self._pending_tool_call_ids.remove(tool_call_id)
         self._logger.debug("tool_result_added", tool_call_id=tool_call_id)
 
     def record_action(self, action: AgentAction) -> None:
@@ -167,9 +338,107 @@ class BaseAgent(ABC):
     def clear_history(self) -> None:
         """Clear conversation and action history."""
         self._conversation_history.clear()
+        self._formatted_messages.clear()
         self._action_history.clear()
+        self._pending_tool_call_ids.clear()
+        self._persisted_upto = None
         self._logger.debug("history_cleared")
 
+    def dump_state(self, path: str | Path) -> int:
+        """Persist the conversation history as gzip-compressed JSON lines.
+
+        Saves are incremental: messages added since the previous save to the
+        same path are appended as a new gzip member. The file is rewritten in
+        full on the first save, after the history is compacted or cleared,
+        or when saving to a different path.
+
+        Args:
+            path: File to write.
+
+        Returns:
+            Number of messages written.
+        """
+        path = Path(path)
+        history = self._conversation_history
+        start = self._persisted_upto
+        if start is None or path != self._persisted_path:
+            start = 0
+        mode = "ab" if start else "wb"
+        new_messages = history[start:]
+        if new_messages or mode == "wb":
+            with gzip.GzipFile(path, mode) as f:
+                f.writelines(
+                    (dumps(asdict(msg)) + "\n").encode() for msg in new_messages
+                )
+        self._persisted_upto = len(history)
+        self._persisted_path = path
+        return len(new_messages)
+
+    def load_state(self, path: str | Path) -> None:
+        """Replace the conversation history with one saved by dump_state().
+
+        Args:
+            path: File to read.
+        """
+        path = Path(path)
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            self._conversation_history = [AgentMessage(**loads(line)) for line in f]
+        self._formatted_messages = [_format_message(m) for m in self._conversation_history]
+        self._pending_tool_call_ids.clear()
+        self._persisted_upto = len(self._conversation_history)
+        self._persisted_path = path
+        self._logger.debug("state_loaded", message_count=len(self._conversation_history))
+
+    async def _maybe_compact_history(self) -> None:
+        """Fold old messages into a summary once the history exceeds its limit.
+
+        The retained window always starts at a user message so that no tool
+        result is separated from the assistant turn that requested it.
+        """
+        limit = self._max_history_messages
+        history = self._conversation_history
+        if limit is None or len(history) <= limit:
+            return
+
+        cut = len(history) - self._keep_recent_messages
+        while cut > 0 and history[cut].role != "user":
+            cut -= 1
+        if cut <= 0:
+            return
+
+        old_messages = history[:cut]
+        summary = await self._summarize_messages(old_messages)
+        # Replace in place so views handed out by conversation_history stay live
+        summary_message = AgentMessage(role="user", content=f"{SUMMARY_PREFIX}\n{summary}")
+        history[:cut] = [summary_message]
+        self._formatted_messages[:cut] = [_format_message(summary_message)]
+        self._persisted_upto = None
+        self._logger.debug(
+            "history_compacted",
+            summarized=len(old_messages),
+            kept=len(history) - 1,
+        )
+
+    async def _summarize_messages(self, messages: list[AgentMessage]) -> str:
+        """Summarize messages being dropped from the history window.
+
+        The default is a cheap extractive synopsis; subclasses with an LLM
+        client can override this to produce an abstractive summary.
+        """
+        lines = []
+        for msg in messages:
+            content = msg.content.strip()
+            if content.startswith(SUMMARY_PREFIX):
+                content = content[len(SUMMARY_PREFIX):].strip()
+            elif len(content) > _SUMMARY_SNIPPET_CHARS:
+                content = content[:_SUMMARY_SNIPPET_CHARS] + "..."
+            if msg.tool_calls:
+                names = ", ".join(tc.get("name", "?") for tc in msg.tool_calls)
+                content = f"{content} (called: {names})".strip()
+            if content:
+                lines.append(f"- {msg.role}: {content}")
+        return "\n".join(lines)
+
     def get_context_summary(self) -> dict[str, Any]:
         """Get a summary of the agent's current context.
 
@@ -197,17 +466,19 @@ class BaseAgent(ABC):
         Returns:
             The action the agent decided to take.
         """
-        self.state = AgentState.THINKING
-        self._logger.info("thinking_started", prompt_length=len(prompt))
+        with self.log_context():
+            self.state = AgentState.THINKING
+            self._logger.info("thinking_started", prompt_length=len(prompt))
 
-        # Add the prompt as a user message
-        self.add_user_message(prompt)
+            # Add the prompt as a user message
+            self.add_user_message(prompt)
+            await self._maybe_compact_history()
 
-        # Subclasses implement the actual LLM call
-        action = await self._generate_response()
+            # Subclasses implement the actual LLM call
+            action = await self._generate_response()
 
-        self.record_action(action)
-        return action
+            self.record_action(action)
+            return action
 
     @abstractmethod
     async def _generate_response(self) -> AgentAction:
@@ -226,27 +497,18 @@ class BaseAgent(ABC):
         Args:
             observation: The result of the previous action.
         """
-        self._logger.info(
-            "observation_received",
-            success=observation.success,
-            has_error=observation.error is not None,
-        )
-
-        # If there was a tool call, add the result to history
-        if observation.result is not None:
-            result_str = (
-                str(observation.result)
-                if not isinstance(observation.result, str)
-                else observation.result
+        with self.log_context():
+            self._logger.info(
+                "observation_received",
+                success=observation.success,
+                has_error=observation.error is not None,
             )
-            # Find the most recent tool call to get its ID
-            for msg in reversed(self._conversation_history):
-                if msg.role == "assistant" and msg.tool_calls:
-                    tool_call_id = msg.tool_calls[-1].get("id", "unknown")
-                    self.add_tool_result(tool_call_id, result_str)
-                    break
 
-        self.state = AgentState.IDLE
+            # If there was a tool call, answer the oldest one still awaiting a result
+            if observation.result is not None and self._pending_tool_call_ids:
+                self.add_tool_result(self._pending_tool_call_ids[0], observation.result)
+
+            self.state = AgentState.IDLE
 
     def __repr__(self) -> str:
         return (
@@ -1,16 +1,22 @@
 """Customer agent archetypes for generating realistic transactions."""
 
+import asyncio
+import random
+from collections.abc import Mapping, Sequence
 from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Any
 from uuid import UUID
 
-import structlog
-
 from atlas_town.agents.base import AgentAction, BaseAgent
-from atlas_town.clients.openai_client import OpenAIClient
+from atlas_town.agents.owner import LLMProvider, get_shared_llm_client
+
+_NO_TOOLS: tuple[dict[str, Any], ...] = ()
 
-logger = structlog.get_logger(__name__)
+# Shared by customers that aren't given their own generator
+_default_rng = random.Random()
 
 
 class CustomerType(str, Enum):
@@ -22,7 +28,7 @@ class CustomerType(str, Enum):
     ONE_TIME = "one_time"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class CustomerProfile:
     """Profile defining customer behavior."""
 
@@ -31,158 +37,221 @@ class CustomerProfile:
     payment_reliability: float  # 0.0 to 1.0 (probability of paying on time)
     average_order_value: float
     order_frequency: str  # "daily", "weekly", "monthly", "occasional"
-    preferred_services: list[str]
+    preferred_services: tuple[str, ...]
     payment_method: str
 
 
-# Customer archetypes for each business type
-CUSTOMER_ARCHETYPES: dict[str, list[CustomerProfile]] = {
-    "landscaping": [
-        CustomerProfile(
-            name="Residential Homeowner",
-            customer_type=CustomerType.RESIDENTIAL,
-            payment_reliability=0.85,
-            average_order_value=150.0,
-            order_frequency="weekly",
-            preferred_services=["lawn_mowing", "trimming", "leaf_removal"],
-            payment_method="check",
-        ),
-        CustomerProfile(
-            name="Property Manager",
-            customer_type=CustomerType.COMMERCIAL,
-            payment_reliability=0.95,
-            average_order_value=500.0,
-            order_frequency="weekly",
-            preferred_services=["lawn_care", "landscaping", "snow_removal"],
-            payment_method="bank_transfer",
-        ),
-        CustomerProfile(
-            name="Commercial Building",
-            customer_type=CustomerType.RECURRING,
-            payment_reliability=0.90,
-            average_order_value=800.0,
-            order_frequency="monthly",
-            preferred_services=["grounds_maintenance", "seasonal_planting"],
-            payment_method="bank_transfer",
-        ),
-    ],
-    "restaurant": [
-        CustomerProfile(
-            name="Walk-in Diner",
-            customer_type=CustomerType.ONE_TIME,
-            payment_reliability=1.0,
-            average_order_value=25.0,
-            order_frequency="daily",
-            preferred_services=["dine_in", "takeout"],
-            payment_method="credit_card",
-        ),
-        CustomerProfile(
-            name="Catering Client",
-            customer_type=CustomerType.RECURRING,
-            payment_reliability=0.90,
-            average_order_value=350.0,
-            order_frequency="monthly",
-            preferred_services=["catering", "event_packages"],
-            payment_method="check",
-        ),
-        CustomerProfile(
-            name="Corporate Account",
-            customer_type=CustomerType.COMMERCIAL,
-            payment_reliability=0.95,
-            average_order_value=200.0,
-            order_frequency="weekly",
-            preferred_services=["lunch_delivery", "meeting_catering"],
-            payment_method="invoice",
-        ),
-    ],
-    "technology": [
-        CustomerProfile(
-            name="Small Business",
-            customer_type=CustomerType.RECURRING,
-            payment_reliability=0.85,
-            average_order_value=2500.0,
-            order_frequency="monthly",
-            preferred_services=["it_support", "maintenance"],
-            payment_method="bank_transfer",
+# Customer archetypes for each business type (read-only)
+CUSTOMER_ARCHETYPES: Mapping[str, tuple[CustomerProfile, ...]] = MappingProxyType(
+    {
+        "landscaping": (
+            CustomerProfile(
+                name="Residential Homeowner",
+                customer_type=CustomerType.RESIDENTIAL,
+                payment_reliability=0.85,
+                average_order_value=150.0,
+                order_frequency="weekly",
+                preferred_services=("lawn_mowing", "trimming", "leaf_removal"),
+                payment_method="check",
+            ),
+            CustomerProfile(
+                name="Property Manager",
+                customer_type=CustomerType.COMMERCIAL,
+                payment_reliability=0.95,
+                average_order_value=500.0,
+                order_frequency="weekly",
+                preferred_services=("lawn_care", "landscaping", "snow_removal"),
+                payment_method="bank_transfer",
+            ),
+            CustomerProfile(
+                name="Commercial Building",
+                customer_type=CustomerType.RECURRING,
+                payment_reliability=0.90,
+                average_order_value=800.0,
+                order_frequency="monthly",
+                preferred_services=("grounds_maintenance", "seasonal_planting"),
+                payment_method="bank_transfer",
+            ),
         ),
-        CustomerProfile(
-            name="Project Client",
-            customer_type=CustomerType.ONE_TIME,
-            payment_reliability=0.80,
-            average_order_value=15000.0,
-            order_frequency="occasional",
-            preferred_services=["software_development", "consulting"],
-            payment_method="milestone_payments",
+        "restaurant": (
+            CustomerProfile(
+                name="Walk-in Diner",
+                customer_type=CustomerType.ONE_TIME,
+                payment_reliability=1.0,
+                average_order_value=25.0,
+                order_frequency="daily",
+                preferred_services=("dine_in", "takeout"),
+                payment_method="credit_card",
+            ),
+            CustomerProfile(
+                name="Catering Client",
+                customer_type=CustomerType.RECURRING,
+                payment_reliability=0.90,
+                average_order_value=350.0,
+                order_frequency="monthly",
+                preferred_services=("catering", "event_packages"),
+                payment_method="check",
+            ),
+            CustomerProfile(
+                name="Corporate Account",
+                customer_type=CustomerType.COMMERCIAL,
+                payment_reliability=0.95,
+                average_order_value=200.0,
+                order_frequency="weekly",
+                preferred_services=("lunch_delivery", "meeting_catering"),
+                payment_method="invoice",
+            ),
         ),
-        CustomerProfile(
-            name="Enterprise Retainer",
-            customer_type=CustomerType.COMMERCIAL,
-            payment_reliability=0.95,
-            average_order_value=5000.0,
-            order_frequency="monthly",
-            preferred_services=["retainer", "priority_support"],
-            payment_method="bank_transfer",
+        "technology": (
+            CustomerProfile(
+                name="Small Business",
+                customer_type=CustomerType.RECURRING,
+                payment_reliability=0.85,
+                average_order_value=2500.0,
+                order_frequency="monthly",
+                preferred_services=("it_support", "maintenance"),
+                payment_method="bank_transfer",
+            ),
+            CustomerProfile(
+                name="Project Client",
+                customer_type=CustomerType.ONE_TIME,
+                payment_reliability=0.80,
+                average_order_value=15000.0,
+                order_frequency="occasional",
+                preferred_services=("software_development", "consulting"),
+                payment_method="milestone_payments",
+            ),
+            CustomerProfile(
+                name="Enterprise Retainer",
+                customer_type=CustomerType.COMMERCIAL,
+                payment_reliability=0.95,
+                average_order_value=5000.0,
+                order_frequency="monthly",
+                preferred_services=("retainer", "priority_support"),
+                payment_method="bank_transfer",
+            ),
         ),
-    ],
-    "healthcare": [
-        CustomerProfile(
-            name="Regular Patient",
-            customer_type=CustomerType.RECURRING,
-            payment_reliability=0.75,
-            average_order_value=200.0,
-            order_frequency="monthly",
-            preferred_services=["checkup", "cleaning"],
-            payment_method="insurance_copay",
+        "healthcare": (
+            CustomerProfile(
+                name="Regular Patient",
+                customer_type=CustomerType.RECURRING,
+                payment_reliability=0.75,
+                average_order_value=200.0,
+                order_frequency="monthly",
+                preferred_services=("checkup", "cleaning"),
+                payment_method="insurance_copay",
+            ),
+            CustomerProfile(
+                name="Insurance Patient",
+                customer_type=CustomerType.RECURRING,
+                payment_reliability=0.95,
+                average_order_value=500.0,
+                order_frequency="occasional",
+                preferred_services=("procedures", "x_rays"),
+                payment_method="insurance",
+            ),
+            CustomerProfile(
+                name="Self-Pay Patient",
+                customer_type=CustomerType.ONE_TIME,
+                payment_reliability=0.70,
+                average_order_value=350.0,
+                order_frequency="occasional",
+                preferred_services=("emergency", "cosmetic"),
+                payment_method="credit_card",
+            ),
         ),
-        CustomerProfile(
-            name="Insurance Patient",
-            customer_type=CustomerType.RECURRING,
-            payment_reliability=0.95,
-            average_order_value=500.0,
-            order_frequency="occasional",
-            preferred_services=["procedures", "x_rays"],
-            payment_method="insurance",
+        "real_estate": (
+            CustomerProfile(
+                name="Home Buyer",
+                customer_type=CustomerType.ONE_TIME,
+                payment_reliability=1.0,
+                average_order_value=12000.0,  # Commission
+                order_frequency="occasional",
+                preferred_services=("buying_agent",),
+                payment_method="escrow",
+            ),
+            CustomerProfile(
+                name="Home Seller",
+                customer_type=CustomerType.ONE_TIME,
+                payment_reliability=1.0,
+                average_order_value=15000.0,  # Commission
+                order_frequency="occasional",
+                preferred_services=("listing_agent",),
+                payment_method="closing",
+            ),
+            CustomerProfile(
+                name="Property Owner",
+                customer_type=CustomerType.RECURRING,
+                payment_reliability=0.90,
+                average_order_value=200.0,  # Management fee
+                order_frequency="monthly",
+                preferred_services=("property_management",),
+                payment_method="bank_transfer",
+            ),
         ),
-        CustomerProfile(
-            name="Self-Pay Patient",
-            customer_type=CustomerType.ONE_TIME,
-            payment_reliability=0.70,
-            average_order_value=350.0,
-            order_frequency="occasional",
-            preferred_services=["emergency", "cosmetic"],
-            payment_method="credit_card",
-        ),
-    ],
-    "real_estate": [
-        CustomerProfile(
-            name="Home Buyer",
-            customer_type=CustomerType.ONE_TIME,
-            payment_reliability=1.0,
-            average_order_value=12000.0,  # Commission
-            order_frequency="occasional",
-            preferred_services=["buying_agent"],
-            payment_method="escrow",
-        ),
-        CustomerProfile(
-            name="Home Seller",
-            customer_type=CustomerType.ONE_TIME,
-            payment_reliability=1.0,
-            average_order_value=15000.0,  # Commission
-            order_frequency="occasional",
-            preferred_services=["listing_agent"],
-            payment_method="closing",
-        ),
-        CustomerProfile(
-            name="Property Owner",
-            customer_type=CustomerType.RECURRING,
-            payment_reliability=0.90,
-            average_order_value=200.0,  # Management fee
-            order_frequency="monthly",
-            preferred_services=["property_management"],
-            payment_method="bank_transfer",
-        ),
-    ],
-}
+    }
+)
+
+
+@dataclass(frozen=True, slots=True)
+class ArchetypeColumns:
+    """Column-wise view of one industry's customer archetypes.
+
+    Each field holds one CustomerProfile attribute for every archetype, in
+    table order, so aggregate queries scan a single tuple instead of
+    reading the attribute off each profile.
+    """
+
+    reliability: tuple[float, ...]
+    avg_value: tuple[float, ...]
+    frequency: tuple[str, ...]
+
+    @classmethod
+    def from_profiles(cls, profiles: Sequence[CustomerProfile]) -> "ArchetypeColumns":
+        """Build the columns for a sequence of profiles."""
+        return cls(
+            reliability=tuple(p.payment_reliability for p in profiles),
+            avg_value=tuple(p.average_order_value for p in profiles),
+            frequency=tuple(p.order_frequency for p in profiles),
+        )
+
+
+_ARCHETYPE_COLUMNS: Mapping[str, ArchetypeColumns] = MappingProxyType(
+    {
+        industry: ArchetypeColumns.from_profiles(profiles)
+        for industry, profiles in CUSTOMER_ARCHETYPES.items()
+    }
+)
+_EMPTY_COLUMNS = ArchetypeColumns((), (), ())
+
+
+def get_archetype_columns(industry: str) -> ArchetypeColumns:
+    """Get the column-wise archetype view for an industry.
+
+    Args:
+        industry: The business industry (e.g., "landscaping", "restaurant")
+
+    Returns:
+        The industry's columns, empty for an unknown industry.
+    """
+    return _ARCHETYPE_COLUMNS.get(industry, _EMPTY_COLUMNS)
+
+
+@lru_cache
+def _render_customer_prompt(profile: CustomerProfile, industry: str) -> str:
+    """Build the system prompt shared by every customer with this profile."""
+    return f"""You are simulating a {profile.customer_type.value} customer for a
+{industry} business.
+
+Profile:
+- Name: {profile.name}
+- Typical order value: ${profile.average_order_value:.2f}
+- Order frequency: {profile.order_frequency}
+- Preferred services: {', '.join(profile.preferred_services)}
+- Payment method: {profile.payment_method}
+
+Your role is to generate realistic purchase requests and behaviors.
+When asked, describe what you'd like to purchase in natural language."""
 
 
 class CustomerAgent(BaseAgent):
@@ -197,6 +266,7 @@ class CustomerAgent(BaseAgent):
         profile: CustomerProfile,
         business_industry: str,
         agent_id: UUID | None = None,
+        rng: random.Random | None = None,
     ):
         super().__init__(
             agent_id=agent_id,
@@ -206,43 +276,37 @@ class CustomerAgent(BaseAgent):
 
         self._profile = profile
         self._industry = business_industry
-        self._llm_client = OpenAIClient()
-
-        self._logger = logger.bind(
-            agent_id=str(self.id),
-            customer_type=profile.customer_type.value,
-            industry=business_industry,
-        )
+        self._rng = rng or _default_rng
+        # All customers talk to the same OpenAI endpoint; share one pooled client
+        self._llm_client = get_shared_llm_client(LLMProvider.OPENAI)
+        self._system_prompt = _render_customer_prompt(profile, business_industry)
 
     @property
     def profile(self) -> CustomerProfile:
         """Get the customer profile."""
         return self._profile
 
+    def _log_fields(self) -> dict[str, Any]:
+        """Get the log fields identifying this agent."""
+        return {
+            **super()._log_fields(),
+            "customer_type": self._profile.customer_type.value,
+            "industry": self._industry,
+        }
+
     def _get_system_prompt(self) -> str:
         """Get the customer's system prompt."""
-        return f"""You are simulating a {self._profile.customer_type.value} customer for a
-{self._industry} business.
-
-Profile:
-- Name: {self._profile.name}
-- Typical order value: ${self._profile.average_order_value:.2f}
-- Order frequency: {self._profile.order_frequency}
-- Preferred services: {', '.join(self._profile.preferred_services)}
-- Payment method: {self._profile.payment_method}
-
-Your role is to generate realistic purchase requests and behaviors.
-When asked, describe what you'd like to purchase in natural language."""
+        return self._system_prompt
 
-    def _get_tools(self) -> list[dict[str, Any]]:
+    def _get_tools(self) -> Sequence[dict[str, Any]]:
         """Customers don't have tools - they generate requests."""
-        return []
+        return _NO_TOOLS
 
     async def _generate_response(self) -> AgentAction:
         """Generate a customer response."""
         response = await self._llm_client.generate(
             system_prompt=self._get_system_prompt(),
-            messages=[{"role": m.role, "content": m.content} for m in self._conversation_history],
+            messages=self._format_messages_for_llm(),
             tools=None,
         )
 
@@ -277,10 +341,54 @@ Describe what you want to purchase. Be specific about quantities and services.""
             "payment_method": self._profile.payment_method,
         }
 
+    @classmethod
+    async def generate_purchase_requests_batch(
+        cls, agents: Sequence["CustomerAgent"]
+    ) -> list[dict[str, Any]]:
+        """Generate purchase requests for several customers concurrently.
+
+        Customers of one industry share most of their prompt, so issuing the
+        requests together also lets the provider reuse the cached prefix.
+
+        Args:
+            agents: Customers to generate requests for.
+
+        Returns:
+            Purchase requests, in the same order as ``agents``.
+        """
+        async with asyncio.TaskGroup() as tg:
+            runs = [tg.create_task(agent.generate_purchase_request()) for agent in agents]
+        return [r.result() for r in runs]
+
     def will_pay_on_time(self) -> bool:
         """Determine if this customer will pay on time based on reliability."""
-        import random
-        return random.random() < self._profile.payment_reliability
+        return self._rng.random() < self._profile.payment_reliability
+
+
+def simulate_payments(
+    profiles: Sequence[CustomerProfile],
+    n_trials: int,
+    rng: random.Random | None = None,
+) -> list[list[bool]]:
+    """Simulate on-time payment outcomes for many customers at once.
+
+    Equivalent to calling will_pay_on_time() for every profile in every
+    trial, but reliabilities are read once and the draws run in a single
+    comprehension rather than through per-agent method calls. Draws are made
+    trial by trial, profile by profile, so a seeded generator reproduces the
+    same outcomes as the equivalent sequence of will_pay_on_time() calls.
+
+    Args:
+        profiles: Customer profiles to simulate.
+        n_trials: Number of independent replicates.
+        rng: Optional generator for reproducible runs.
+
+    Returns:
+        One row per trial, with one on-time flag per profile.
+    """
+    draw = (rng or _default_rng).random
+    reliabilities = [p.payment_reliability for p in profiles]
+    return [[draw() < r for r in reliabilities] for _ in range(n_trials)]
 
 
 def create_customers_for_industry(industry: str) -> list[CustomerAgent]:
@@ -292,5 +400,7 @@ def create_customers_for_industry(industry: str) -> list[CustomerAgent]:
     Returns:
         List of CustomerAgent instances
     """
-    archetypes = CUSTOMER_ARCHETYPES.get(industry, [])
-    return [CustomerAgent(profile=p, business_industry=industry) for p in archetypes]
+    return [
+        CustomerAgent(profile=p, business_industry=industry)
+        for p in CUSTOMER_ARCHETYPES.get(industry, ())
+    ]
@@ -1,21 +1,30 @@
 """Business owner agents for Atlas Town."""
 
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Callable, Mapping, Sequence
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any
+from string import Template
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, TypeAlias
 from uuid import UUID
 
-import structlog
-
 from atlas_town.agents.base import AgentAction, AgentState, BaseAgent
-from atlas_town.clients.claude import ClaudeClient
-from atlas_town.clients.gemini import GeminiClient
-from atlas_town.clients.ollama import OllamaClient
-from atlas_town.clients.openai_client import OpenAIClient
+from atlas_town.clients.toon import TOON_FORMAT_NOTE
 from atlas_town.config import get_settings
 from atlas_town.tools.definitions import OWNER_TOOLS
 
-logger = structlog.get_logger(__name__)
+if TYPE_CHECKING:
+    # Provider SDKs are slow to import; each client module is loaded only
+    # when its provider is first used (see _LLM_FACTORIES)
+    from atlas_town.clients.claude import ClaudeClient
+    from atlas_town.clients.gemini import GeminiClient
+    from atlas_town.clients.ollama import OllamaClient
+    from atlas_town.clients.openai_client import OpenAIClient
+    from atlas_town.clients.router import RouterLLMClient
 
 
 class LLMProvider(str, Enum):
@@ -28,116 +37,198 @@ class LLMProvider(str, Enum):
     LM_STUDIO = "lm_studio"
 
 
-@dataclass
+LLMClient: TypeAlias = (
+    "ClaudeClient | OpenAIClient | GeminiClient | OllamaClient | RouterLLMClient"
+)
+
+
+def _create_claude_client() -> ClaudeClient:
+    from atlas_town.clients.claude import ClaudeClient
+
+    return ClaudeClient()
+
+
+def _create_openai_client() -> OpenAIClient:
+    from atlas_town.clients.openai_client import OpenAIClient
+
+    return OpenAIClient()
+
+
+def _create_gemini_client() -> GeminiClient:
+    from atlas_town.clients.gemini import GeminiClient
+
+    return GeminiClient()
+
+
+def _create_ollama_client() -> OllamaClient:
+    from atlas_town.clients.ollama import OllamaClient
+
+    return OllamaClient()
+
+
+def _create_lm_studio_client() -> OpenAIClient:
+    from atlas_town.clients.openai_client import OpenAIClient
+
+    # LM Studio uses the OpenAI-compatible API and doesn't require a real key
+    settings = get_settings()
+    return OpenAIClient(
+        api_key="lm-studio",
+        base_url=settings.lm_studio_base_url,
+        model=settings.lm_studio_model or None,
+    )
+
+
+_LLM_FACTORIES: dict[LLMProvider, Callable[[], LLMClient]] = {
+    LLMProvider.CLAUDE: _create_claude_client,
+    LLMProvider.OPENAI: _create_openai_client,
+    LLMProvider.GEMINI: _create_gemini_client,
+    LLMProvider.OLLAMA: _create_ollama_client,
+    LLMProvider.LM_STUDIO: _create_lm_studio_client,
+}
+
+
+# Owners may be built from worker threads. Each provider has its own lock, so
+# every provider gets a single client but different providers build in parallel
+_LLM_CLIENTS: dict[LLMProvider, LLMClient] = {}
+_LLM_CLIENT_LOCKS: Mapping[LLMProvider, threading.Lock] = MappingProxyType(
+    {provider: threading.Lock() for provider in LLMProvider}
+)
+
+
+def _build_llm_client(provider: LLMProvider) -> LLMClient:
+    client = _LLM_FACTORIES[provider]()
+    fallback_name = get_settings().llm_fallback_provider
+    if fallback_name is None or fallback_name == provider.value:
+        return client
+
+    from atlas_town.clients.router import RouterLLMClient
+
+    # Resolves to the fallback's own shared client (it is never wrapped, so
+    # this takes no further locks), and both paths reuse the same pools
+    return RouterLLMClient(client, get_shared_llm_client(LLMProvider(fallback_name)))
+
+
+def get_shared_llm_client(provider: LLMProvider) -> LLMClient:
+    """Get the process-wide LLM client for a provider.
+
+    Clients hold the provider SDK's HTTP connection pool, so agents share one
+    per provider instead of each opening their own. Per-agent request options
+    such as a prompt cache key are passed to generate() instead.
+    """
+    client = _LLM_CLIENTS.get(provider)
+    if client is None:
+        with _LLM_CLIENT_LOCKS[provider]:
+            client = _LLM_CLIENTS.get(provider)
+            if client is None:
+                client = _LLM_CLIENTS[provider] = _build_llm_client(provider)
+    return client
+
+
+@dataclass(frozen=True, slots=True)
 class OwnerPersona:
     """Defines a business owner's personality and business."""
 
     name: str
     business_name: str
     industry: str
-    personality_traits: list[str]
+    personality_traits: tuple[str, ...]
     communication_style: str
     business_focus: str
-    typical_concerns: list[str]
+    typical_concerns: tuple[str, ...]
     llm_provider: LLMProvider
 
 
-# The 5 business owner personas
-OWNER_PERSONAS: dict[str, OwnerPersona] = {
-    "craig": OwnerPersona(
-        name="Craig Miller",
-        business_name="Craig's Landscaping",
-        industry="landscaping",
-        personality_traits=["practical", "hardworking", "straightforward", "weather-conscious"],
-        communication_style="Direct and no-nonsense, uses industry jargon",
-        business_focus="Seasonal lawn care, landscaping projects, snow removal in winter",
-        typical_concerns=[
-            "Weather affecting jobs",
-            "Equipment maintenance costs",
-            "Seasonal cash flow",
-            "Finding reliable workers",
-        ],
-        llm_provider=LLMProvider.OPENAI,
-    ),
-    "tony": OwnerPersona(
-        name="Tony Russo",
-        business_name="Tony's Pizzeria",
-        industry="restaurant",
-        personality_traits=["passionate", "family-oriented", "quality-focused", "community-minded"],
-        communication_style="Warm and expressive, talks about food with enthusiasm",
-        business_focus="Authentic Italian pizza, family recipes, local ingredients",
-        typical_concerns=[
-            "Food costs and margins",
-            "Staff scheduling",
-            "Health inspections",
-            "Competition from chains",
-        ],
-        llm_provider=LLMProvider.OPENAI,
-    ),
-    "maya": OwnerPersona(
-        name="Maya Patel",
-        business_name="Nexus Tech Consulting",
-        industry="technology",
-        personality_traits=["analytical", "innovative", "client-focused", "detail-oriented"],
-        communication_style="Professional and precise, explains technical concepts clearly",
-        business_focus="IT consulting, software development, cloud migration",
-        typical_concerns=[
-            "Project timelines and scope creep",
-            "Keeping skills current",
-            "Retainer vs project billing",
-            "Client communication",
-        ],
-        llm_provider=LLMProvider.CLAUDE,
-    ),
-    "chen": OwnerPersona(
-        name="Dr. Emily Chen",
-        business_name="Main Street Dental",
-        industry="healthcare",
-        personality_traits=["caring", "meticulous", "patient-focused", "professional"],
-        communication_style="Calm and reassuring, explains procedures clearly",
-        business_focus="Family dentistry, preventive care, cosmetic procedures",
-        typical_concerns=[
-            "Insurance reimbursements",
-            "Equipment upgrades",
-            "Patient retention",
-            "Compliance and regulations",
-        ],
-        llm_provider=LLMProvider.GEMINI,
-    ),
-    "marcus": OwnerPersona(
-        name="Marcus Johnson",
-        business_name="Harbor Realty",
-        industry="real_estate",
-        personality_traits=["persuasive", "networked", "market-savvy", "ambitious"],
-        communication_style="Confident and relationship-focused, market insights",
-        business_focus="Residential sales, property management, investment properties",
-        typical_concerns=[
-            "Market fluctuations",
-            "Commission tracking",
-            "Trust account compliance",
-            "Lead generation",
-        ],
-        llm_provider=LLMProvider.OPENAI,
-    ),
-}
-
-
-def _create_owner_system_prompt(persona: OwnerPersona) -> str:
-    """Generate a system prompt for a business owner."""
-    traits = ", ".join(persona.personality_traits)
-    concerns = "\n".join(f"- {c}" for c in persona.typical_concerns)
-
-    return f"""You are {persona.name}, the owner of {persona.business_name}, a
-{persona.industry} business in Atlas Town.
-
-## Your Personality
-You are {traits}. {persona.communication_style}
-
-## Your Business
-{persona.business_focus}
-
-## Your Typical Concerns
-{concerns}
+# The 5 business owner personas (read-only)
+OWNER_PERSONAS: Mapping[str, OwnerPersona] = MappingProxyType(
+    {
+        "craig": OwnerPersona(
+            name="Craig Miller",
+            business_name="Craig's Landscaping",
+            industry="landscaping",
+            personality_traits=("practical", "hardworking", "straightforward", "weather-conscious"),
+            communication_style="Direct and no-nonsense, uses industry jargon",
+            business_focus="Seasonal lawn care, landscaping projects, snow removal in winter",
+            typical_concerns=(
+                "Weather affecting jobs",
+                "Equipment maintenance costs",
+                "Seasonal cash flow",
+                "Finding reliable workers",
+            ),
+            llm_provider=LLMProvider.OPENAI,
+        ),
+        "tony": OwnerPersona(
+            name="Tony Russo",
+            business_name="Tony's Pizzeria",
+            industry="restaurant",
+            personality_traits=(
+                "passionate",
+                "family-oriented",
+                "quality-focused",
+                "community-minded",
+            ),
+            communication_style="Warm and expressive, talks about food with enthusiasm",
+            business_focus="Authentic Italian pizza, family recipes, local ingredients",
+            typical_concerns=(
+                "Food costs and margins",
+                "Staff scheduling",
+                "Health inspections",
+                "Competition from chains",
+            ),
+            llm_provider=LLMProvider.OPENAI,
+        ),
+        "maya": OwnerPersona(
+            name="Maya Patel",
+            business_name="Nexus Tech Consulting",
+            industry="technology",
+            personality_traits=("analytical", "innovative", "client-focused", "detail-oriented"),
+            communication_style="Professional and precise, explains technical concepts clearly",
+            business_focus="IT consulting, software development, cloud migration",
+            typical_concerns=(
+                "Project timelines and scope creep",
+                "Keeping skills current",
+                "Retainer vs project billing",
+                "Client communication",
+            ),
+            llm_provider=LLMProvider.CLAUDE,
+        ),
+        "chen": OwnerPersona(
+            name="Dr. Emily Chen",
+            business_name="Main Street Dental",
+            industry="healthcare",
+            personality_traits=("caring", "meticulous", "patient-focused", "professional"),
+            communication_style="Calm and reassuring, explains procedures clearly",
+            business_focus="Family dentistry, preventive care, cosmetic procedures",
+            typical_concerns=(
+                "Insurance reimbursements",
+                "Equipment upgrades",
+                "Patient retention",
+                "Compliance and regulations",
+            ),
+            llm_provider=LLMProvider.GEMINI,
+        ),
+        "marcus": OwnerPersona(
+            name="Marcus Johnson",
+            business_name="Harbor Realty",
+            industry="real_estate",
+            personality_traits=("persuasive", "networked", "market-savvy", "ambitious"),
+            communication_style="Confident and relationship-focused, market insights",
+            business_focus="Residential sales, property management, investment properties",
+            typical_concerns=(
+                "Market fluctuations",
+                "Commission tracking",
+                "Trust account compliance",
+                "Lead generation",
+            ),
+            llm_provider=LLMProvider.OPENAI,
+        ),
+    }
+)
+
+
+# Static instructions come first and persona details last, so every owner's
+# prompt shares one long prefix that providers can cache across owners
+_OWNER_PROMPT_TEMPLATE = Template("""You are a business owner in Atlas Town, a
+simulated town of small businesses.
 
 ## Your Role in the Simulation
 As a business owner, you:
@@ -147,16 +238,51 @@ As a business owner, you:
 4. Generate realistic business transactions
 
 ## Guidelines
-- Stay in character as {persona.name}
-- Make decisions that a real {persona.industry} business owner would make
+- Stay in character as the owner described below
+- Make decisions that a real business owner in your industry would make
 - Express concerns naturally based on your personality
 - When reviewing reports, comment on items relevant to your business
 
-## Communication Style
-{persona.communication_style}
+$tool_result_format
 
 Remember: You're running a real business. Think about cash flow, customer
-relationships, vendor payments, and growth opportunities."""
+relationships, vendor payments, and growth opportunities.
+
+## Who You Are
+You are $name, the owner of $business_name, a
+$industry business in Atlas Town.
+
+## Your Personality
+You are $traits. $communication_style
+
+## Your Business
+$business_focus
+
+## Your Typical Concerns
+$concerns
+
+## Communication Style
+$communication_style""")
+
+
+def _create_owner_system_prompt(persona: OwnerPersona) -> str:
+    """Generate a system prompt for a business owner."""
+    return _OWNER_PROMPT_TEMPLATE.substitute(
+        tool_result_format=TOON_FORMAT_NOTE,
+        name=persona.name,
+        business_name=persona.business_name,
+        industry=persona.industry,
+        traits=", ".join(persona.personality_traits),
+        communication_style=persona.communication_style,
+        business_focus=persona.business_focus,
+        concerns="\n".join(f"- {c}" for c in persona.typical_concerns),
+    )
+
+
+# Personas never change at runtime, so their prompts are rendered once
+OWNER_SYSTEM_PROMPTS: dict[str, str] = {
+    key: _create_owner_system_prompt(persona) for key, persona in OWNER_PERSONAS.items()
+}
 
 
 class OwnerAgent(BaseAgent):
@@ -180,6 +306,7 @@ class OwnerAgent(BaseAgent):
             raise ValueError(f"Unknown persona: {persona_key}. Valid: {valid_keys}")
 
         self._persona = OWNER_PERSONAS[persona_key]
+        self._system_prompt = OWNER_SYSTEM_PROMPTS[persona_key]
 
         super().__init__(
             agent_id=agent_id,
@@ -191,45 +318,23 @@ class OwnerAgent(BaseAgent):
         if org_id:
             self.set_organization(org_id)
 
+        # An owner's turns all share its persona prompt prefix; the key routes
+        # them to the same provider-side prompt cache
+        self.session_id = f"atlas-town-owner-{persona_key}"
+
         # Create the appropriate LLM client
         self._llm_client = self._create_llm_client()
 
-        self._logger = logger.bind(
-            agent_id=str(self.id),
-            agent_name=self.name,
-            business=self._persona.business_name,
-        )
-
-    def _create_llm_client(self) -> ClaudeClient | OpenAIClient | GeminiClient | OllamaClient:
-        """Create the LLM client based on persona's provider or environment override."""
-        # Check for environment variable override
-        settings = get_settings()
-        provider_override = settings.llm_provider.lower()
-
+    def _create_llm_client(self) -> LLMClient:
+        """Get the shared LLM client for the persona's provider or a local override."""
         # Use override if set to a local provider, otherwise use persona's provider
+        provider_override = get_settings().llm_provider.lower()
         if provider_override in ("ollama", "lm_studio"):
             provider = LLMProvider(provider_override)
         else:
             provider = self._persona.llm_provider
 
-        if provider == LLMProvider.CLAUDE:
-            return ClaudeClient()
-        elif provider == LLMProvider.OPENAI:
-            return OpenAIClient()
-        elif provider == LLMProvider.GEMINI:
-            return GeminiClient()
-        elif provider == LLMProvider.OLLAMA:
-            return OllamaClient()
-        elif provider == LLMProvider.LM_STUDIO:
-            # LM Studio uses OpenAI-compatible API
-            return OpenAIClient(
-                api_key="lm-studio",  # LM Studio doesn't require a real key
-                base_url=settings.lm_studio_base_url,
-                model=settings.lm_studio_model or None,
-            )
-        else:
-            # Default to OpenAI
-            return OpenAIClient()
+        return get_shared_llm_client(provider)
 
     @property
     def persona(self) -> OwnerPersona:
@@ -246,35 +351,33 @@ class OwnerAgent(BaseAgent):
         """Get the industry."""
         return self._persona.industry
 
+    def _log_fields(self) -> dict[str, Any]:
+        """Get the log fields identifying this agent."""
+        return {**super()._log_fields(), "business": self._persona.business_name}
+
     def _get_system_prompt(self) -> str:
         """Get the owner's system prompt."""
-        return _create_owner_system_prompt(self._persona)
+        return self._system_prompt
 
-    def _get_tools(self) -> list[dict[str, Any]]:
+    def _get_tools(self) -> Sequence[dict[str, Any]]:
         """Get the tools available to this owner (read-only access)."""
         return OWNER_TOOLS
 
-    def _format_messages_for_llm(self) -> list[dict[str, Any]]:
-        """Format conversation history for the LLM client."""
-        messages = []
-        for msg in self._conversation_history:
-            messages.append({
-                "role": msg.role,
-                "content": msg.content,
-                "tool_calls": msg.tool_calls,
-                "tool_call_id": msg.tool_call_id,
-            })
-        return messages
-
     async def _generate_response(self) -> AgentAction:
         """Generate a response using the configured LLM."""
         self._logger.debug("generating_response")
 
-        # Call the LLM (all clients have the same interface)
+        # Call the LLM (all clients have the same interface); OpenAI-compatible
+        # ones route the persona's turns to one prompt cache
+        options: dict[str, Any] = {}
+        if getattr(self._llm_client, "accepts_prompt_cache_key", False):
+            options["prompt_cache_key"] = self.session_id
+
         response = await self._llm_client.generate(
             system_prompt=self._get_system_prompt(),
             messages=self._format_messages_for_llm(),
             tools=self._get_tools(),
+            **options,
         )
 
         # Add assistant message to history
@@ -380,3 +483,25 @@ def create_all_owners(org_ids: dict[str, UUID] | None = None) -> dict[str, Owner
         )
 
     return owners
+
+
+async def create_all_owners_async(
+    org_ids: dict[str, UUID] | None = None,
+) -> dict[str, OwnerAgent]:
+    """Create all 5 owner agents concurrently.
+
+    Owners are constructed in worker threads, so building their (distinct)
+    provider clients overlaps instead of running back to back.
+
+    Args:
+        org_ids: Optional mapping of persona_key -> organization UUID
+
+    Returns:
+        Dictionary of persona_key -> OwnerAgent
+    """
+    org_ids = org_ids or {}
+    keys = list(OWNER_PERSONAS)
+    agents = await asyncio.gather(
+        *(asyncio.to_thread(OwnerAgent, persona_key=key, org_id=org_ids.get(key)) for key in keys)
+    )
+    return dict(zip(keys, agents, strict=True))
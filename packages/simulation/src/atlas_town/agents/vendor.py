@@ -1,16 +1,25 @@
 """Vendor agent archetypes for generating realistic expenses."""
 
-from dataclasses import dataclass
+import random
+import sys
+import zlib
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass, field, replace
 from enum import Enum
+from types import MappingProxyType
 from typing import Any
 from uuid import UUID
 
-import structlog
-
 from atlas_town.agents.base import AgentAction, BaseAgent
-from atlas_town.clients.openai_client import OpenAIClient
+from atlas_town.agents.owner import LLMProvider, get_shared_llm_client
+
+_NO_TOOLS: tuple[dict[str, Any], ...] = ()
 
-logger = structlog.get_logger(__name__)
+# Chance that an "as_needed" vendor bills on any given day
+_AS_NEEDED_BILL_PROBABILITY = 0.2
+
+# Shared by vendors that aren't given their own generator
+_default_rng = random.Random()
 
 
 class VendorType(str, Enum):
@@ -22,7 +31,7 @@ class VendorType(str, Enum):
     RECURRING = "recurring"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class VendorProfile:
     """Profile defining vendor behavior."""
 
@@ -33,255 +42,269 @@ class VendorProfile:
     billing_frequency: str  # "daily", "weekly", "monthly", "as_needed"
     payment_terms: int  # days until due
     description: str
-
-
-# Vendor archetypes for each business type
-VENDOR_ARCHETYPES: dict[str, list[VendorProfile]] = {
-    "landscaping": [
-        VendorProfile(
-            name="Green Thumb Supplies",
-            vendor_type=VendorType.SUPPLIER,
-            category="supplies",
-            typical_amount=500.0,
-            billing_frequency="weekly",
-            payment_terms=30,
-            description="Seeds, fertilizer, mulch, plants",
-        ),
-        VendorProfile(
-            name="Midwest Equipment Rental",
-            vendor_type=VendorType.SERVICE,
-            category="equipment_rental",
-            typical_amount=350.0,
-            billing_frequency="as_needed",
-            payment_terms=15,
-            description="Heavy equipment rental for large projects",
-        ),
-        VendorProfile(
-            name="QuickFuel Gas Station",
-            vendor_type=VendorType.RECURRING,
-            category="fuel",
-            typical_amount=400.0,
-            billing_frequency="weekly",
-            payment_terms=7,
-            description="Fuel for trucks and equipment",
-        ),
-        VendorProfile(
-            name="Smith Insurance Agency",
-            vendor_type=VendorType.RECURRING,
-            category="insurance",
-            typical_amount=800.0,
-            billing_frequency="monthly",
-            payment_terms=30,
-            description="Liability and equipment insurance",
-        ),
-        VendorProfile(
-            name="Atlas Community Bank",
-            vendor_type=VendorType.RECURRING,
-            category="financing",
-            typical_amount=650.0,
-            billing_frequency="monthly",
-            payment_terms=30,
-            description="Business loan and credit line servicing",
-        ),
-    ],
-    "restaurant": [
-        VendorProfile(
-            name="Fresh Foods Distributor",
-            vendor_type=VendorType.SUPPLIER,
-            category="food_inventory",
-            typical_amount=2500.0,
-            billing_frequency="weekly",
-            payment_terms=14,
-            description="Fresh produce, meat, dairy",
-        ),
-        VendorProfile(
-            name="Sysco Food Service",
-            vendor_type=VendorType.SUPPLIER,
-            category="supplies",
-            typical_amount=1200.0,
-            billing_frequency="weekly",
-            payment_terms=21,
-            description="Dry goods, canned items, cleaning supplies",
-        ),
-        VendorProfile(
-            name="City Utilities",
-            vendor_type=VendorType.UTILITY,
-            category="utilities",
-            typical_amount=650.0,
-            billing_frequency="monthly",
-            payment_terms=30,
-            description="Gas, water, electric",
-        ),
-        VendorProfile(
-            name="POS Systems Inc",
-            vendor_type=VendorType.RECURRING,
-            category="software",
-            typical_amount=150.0,
-            billing_frequency="monthly",
-            payment_terms=30,
-            description="Point of sale system subscription",
-        ),
-        VendorProfile(
-            name="Kitchen Repair Pros",
-            vendor_type=VendorType.SERVICE,
-            category="equipment_maintenance",
-            typical_amount=850.0,
-            billing_frequency="as_needed",
-            payment_terms=15,
-            description="Commercial kitchen equipment repairs and maintenance",
+    # Billing days derived from the name; crc32 is stable across runs, hash() isn't
+    weekly_dow: int = field(init=False, repr=False, compare=False)
+    monthly_day: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # Share one copy of the small set of repeated keys, including for
+        # profiles built at runtime, and let comparisons hit the identity check
+        object.__setattr__(self, "category", sys.intern(self.category))
+        object.__setattr__(self, "billing_frequency", sys.intern(self.billing_frequency))
+        name_hash = zlib.crc32(self.name.encode())
+        object.__setattr__(self, "weekly_dow", name_hash % 7)
+        object.__setattr__(self, "monthly_day", name_hash % 28 + 1)
+
+
+# Vendor archetypes for each business type (read-only)
+VENDOR_ARCHETYPES: Mapping[str, tuple[VendorProfile, ...]] = MappingProxyType(
+    {
+        "landscaping": (
+            VendorProfile(
+                name="Green Thumb Supplies",
+                vendor_type=VendorType.SUPPLIER,
+                category="supplies",
+                typical_amount=500.0,
+                billing_frequency="weekly",
+                payment_terms=30,
+                description="Seeds, fertilizer, mulch, plants",
+            ),
+            VendorProfile(
+                name="Midwest Equipment Rental",
+                vendor_type=VendorType.SERVICE,
+                category="equipment_rental",
+                typical_amount=350.0,
+                billing_frequency="as_needed",
+                payment_terms=15,
+                description="Heavy equipment rental for large projects",
+            ),
+            VendorProfile(
+                name="QuickFuel Gas Station",
+                vendor_type=VendorType.RECURRING,
+                category="fuel",
+                typical_amount=400.0,
+                billing_frequency="weekly",
+                payment_terms=7,
+                description="Fuel for trucks and equipment",
+            ),
+            VendorProfile(
+                name="Smith Insurance Agency",
+                vendor_type=VendorType.RECURRING,
+                category="insurance",
+                typical_amount=800.0,
+                billing_frequency="monthly",
+                payment_terms=30,
+                description="Liability and equipment insurance",
+            ),
+            VendorProfile(
+                name="Atlas Community Bank",
+                vendor_type=VendorType.RECURRING,
+                category="financing",
+                typical_amount=650.0,
+                billing_frequency="monthly",
+                payment_terms=30,
+                description="Business loan and credit line servicing",
+            ),
         ),
-        VendorProfile(
-            name="Atlas Community Bank",
-            vendor_type=VendorType.RECURRING,
-            category="financing",
-            typical_amount=900.0,
-            billing_frequency="monthly",
-            payment_terms=30,
-            description="Restaurant equipment loan and working capital line",
+        "restaurant": (
+            VendorProfile(
+                name="Fresh Foods Distributor",
+                vendor_type=VendorType.SUPPLIER,
+                category="food_inventory",
+                typical_amount=2500.0,
+                billing_frequency="weekly",
+                payment_terms=14,
+                description="Fresh produce, meat, dairy",
+            ),
+            VendorProfile(
+                name="Sysco Food Service",
+                vendor_type=VendorType.SUPPLIER,
+                category="supplies",
+                typical_amount=1200.0,
+                billing_frequency="weekly",
+                payment_terms=21,
+                description="Dry goods, canned items, cleaning supplies",
+            ),
+            VendorProfile(
+                name="City Utilities",
+                vendor_type=VendorType.UTILITY,
+                category="utilities",
+                typical_amount=650.0,
+                billing_frequency="monthly",
+                payment_terms=30,
+                description="Gas, water, electric",
+            ),
+            VendorProfile(
+                name="POS Systems Inc",
+                vendor_type=VendorType.RECURRING,
+                category="software",
+                typical_amount=150.0,
+                billing_frequency="monthly",
+                payment_terms=30,
+                description="Point of sale system subscription",
+            ),
+            VendorProfile(
+                name="Kitchen Repair Pros",
+                vendor_type=VendorType.SERVICE,
+                category="equipment_maintenance",
+                typical_amount=850.0,
+                billing_frequency="as_needed",
+                payment_terms=15,
+                description="Commercial kitchen equipment repairs and maintenance",
+            ),
+            VendorProfile(
+                name="Atlas Community Bank",
+                vendor_type=VendorType.RECURRING,
+                category="financing",
+                typical_amount=900.0,
+                billing_frequency="monthly",
+                payment_terms=30,
+                description="Restaurant equipment loan and working capital line",
+            ),
         ),
-    ],
-    "technology": [
-        VendorProfile(
-            name="AWS Cloud Services",
-            vendor_type=VendorType.RECURRING,
-            category="cloud_hosting",
-            typical_amount=1500.0,
-            billing_frequency="monthly",
-            payment_terms=30,
-            description="Cloud infrastructure and hosting",
+        "technology": (
+            VendorProfile(
+                name="AWS Cloud Services",
+                vendor_type=VendorType.RECURRING,
+                category="cloud_hosting",
+                typical_amount=1500.0,
+                billing_frequency="monthly",
+                payment_terms=30,
+                description="Cloud infrastructure and hosting",
+            ),
+            VendorProfile(
+                name="JetBrains Software",
+                vendor_type=VendorType.RECURRING,
+                category="software_licenses",
+                typical_amount=500.0,
+                billing_frequency="monthly",
+                payment_terms=30,
+                description="Development tools and IDE licenses",
+            ),
+            VendorProfile(
+                name="TechPro Contractors",
+                vendor_type=VendorType.SERVICE,
+                category="contractors",
+                typical_amount=3000.0,
+                billing_frequency="as_needed",
+                payment_terms=15,
+                description="Specialized contractors for projects",
+            ),
+            VendorProfile(
+                name="Coworking Space LLC",
+                vendor_type=VendorType.RECURRING,
+                category="rent",
+                typical_amount=2000.0,
+                billing_frequency="monthly",
+                payment_terms=1,
+                description="Office space rental",
+            ),
+            VendorProfile(
+                name="Atlas Community Bank",
+                vendor_type=VendorType.RECURRING,
+                category="financing",
+                typical_amount=750.0,
+                billing_frequency="monthly",
+                payment_terms=30,
+                description="Tech startup financing and credit line",
+            ),
         ),
-        VendorProfile(
-            name="JetBrains Software",
-            vendor_type=VendorType.RECURRING,
-            category="software_licenses",
-            typical_amount=500.0,
-            billing_frequency="monthly",
-            payment_terms=30,
-            description="Development tools and IDE licenses",
+        "healthcare": (
+            VendorProfile(
+                name="Dental Supply Co",
+                vendor_type=VendorType.SUPPLIER,
+                category="medical_supplies",
+                typical_amount=1800.0,
+                billing_frequency="weekly",
+                payment_terms=30,
+                description="Dental supplies, tools, consumables",
+            ),
+            VendorProfile(
+                name="Lab Services Inc",
+                vendor_type=VendorType.SERVICE,
+                category="lab_services",
+                typical_amount=800.0,
+                billing_frequency="monthly",
+                payment_terms=30,
+                description="Dental lab work, crowns, bridges",
+            ),
+            VendorProfile(
+                name="Medical Equipment Leasing",
+                vendor_type=VendorType.RECURRING,
+                category="equipment_lease",
+                typical_amount=1200.0,
+                billing_frequency="monthly",
+                payment_terms=30,
+                description="X-ray and imaging equipment lease",
+            ),
+            VendorProfile(
+                name="Practice Management Software",
+                vendor_type=VendorType.RECURRING,
+                category="software",
+                typical_amount=350.0,
+                billing_frequency="monthly",
+                payment_terms=30,
+                description="Patient management and billing software",
+            ),
+            VendorProfile(
+                name="Atlas Community Bank",
+                vendor_type=VendorType.RECURRING,
+                category="financing",
+                typical_amount=1100.0,
+                billing_frequency="monthly",
+                payment_terms=30,
+                description="Medical equipment loan and operating line",
+            ),
         ),
-        VendorProfile(
-            name="TechPro Contractors",
-            vendor_type=VendorType.SERVICE,
-            category="contractors",
-            typical_amount=3000.0,
-            billing_frequency="as_needed",
-            payment_terms=15,
-            description="Specialized contractors for projects",
+        "real_estate": (
+            VendorProfile(
+                name="MLS Subscription Service",
+                vendor_type=VendorType.RECURRING,
+                category="subscriptions",
+                typical_amount=400.0,
+                billing_frequency="monthly",
+                payment_terms=30,
+                description="Multiple Listing Service access",
+            ),
+            VendorProfile(
+                name="ProPhotography Studios",
+                vendor_type=VendorType.SERVICE,
+                category="marketing",
+                typical_amount=300.0,
+                billing_frequency="as_needed",
+                payment_terms=15,
+                description="Property photography and virtual tours",
+            ),
+            VendorProfile(
+                name="SignMasters Printing",
+                vendor_type=VendorType.SUPPLIER,
+                category="marketing_materials",
+                typical_amount=250.0,
+                billing_frequency="as_needed",
+                payment_terms=30,
+                description="For sale signs, brochures, business cards",
+            ),
+            VendorProfile(
+                name="Office Space Partners",
+                vendor_type=VendorType.RECURRING,
+                category="rent",
+                typical_amount=1800.0,
+                billing_frequency="monthly",
+                payment_terms=1,
+                description="Office rent and utilities",
+            ),
+            VendorProfile(
+                name="Atlas Community Bank",
+                vendor_type=VendorType.RECURRING,
+                category="financing",
+                typical_amount=700.0,
+                billing_frequency="monthly",
+                payment_terms=30,
+                description="Brokerage credit line and financing services",
+            ),
         ),
-        VendorProfile(
-            name="Coworking Space LLC",
-            vendor_type=VendorType.RECURRING,
-            category="rent",
-            typical_amount=2000.0,
-            billing_frequency="monthly",
-            payment_terms=1,
-            description="Office space rental",
-        ),
-        VendorProfile(
-            name="Atlas Community Bank",
-            vendor_type=VendorType.RECURRING,
-            category="financing",
-            typical_amount=750.0,
-            billing_frequency="monthly",
-            payment_terms=30,
-            description="Tech startup financing and credit line",
-        ),
-    ],
-    "healthcare": [
-        VendorProfile(
-            name="Dental Supply Co",
-            vendor_type=VendorType.SUPPLIER,
-            category="medical_supplies",
-            typical_amount=1800.0,
-            billing_frequency="weekly",
-            payment_terms=30,
-            description="Dental supplies, tools, consumables",
-        ),
-        VendorProfile(
-            name="Lab Services Inc",
-            vendor_type=VendorType.SERVICE,
-            category="lab_services",
-            typical_amount=800.0,
-            billing_frequency="monthly",
-            payment_terms=30,
-            description="Dental lab work, crowns, bridges",
-        ),
-        VendorProfile(
-            name="Medical Equipment Leasing",
-            vendor_type=VendorType.RECURRING,
-            category="equipment_lease",
-            typical_amount=1200.0,
-            billing_frequency="monthly",
-            payment_terms=30,
-            description="X-ray and imaging equipment lease",
-        ),
-        VendorProfile(
-            name="Practice Management Software",
-            vendor_type=VendorType.RECURRING,
-            category="software",
-            typical_amount=350.0,
-            billing_frequency="monthly",
-            payment_terms=30,
-            description="Patient management and billing software",
-        ),
-        VendorProfile(
-            name="Atlas Community Bank",
-            vendor_type=VendorType.RECURRING,
-            category="financing",
-            typical_amount=1100.0,
-            billing_frequency="monthly",
-            payment_terms=30,
-            description="Medical equipment loan and operating line",
-        ),
-    ],
-    "real_estate": [
-        VendorProfile(
-            name="MLS Subscription Service",
-            vendor_type=VendorType.RECURRING,
-            category="subscriptions",
-            typical_amount=400.0,
-            billing_frequency="monthly",
-            payment_terms=30,
-            description="Multiple Listing Service access",
-        ),
-        VendorProfile(
-            name="ProPhotography Studios",
-            vendor_type=VendorType.SERVICE,
-            category="marketing",
-            typical_amount=300.0,
-            billing_frequency="as_needed",
-            payment_terms=15,
-            description="Property photography and virtual tours",
-        ),
-        VendorProfile(
-            name="SignMasters Printing",
-            vendor_type=VendorType.SUPPLIER,
-            category="marketing_materials",
-            typical_amount=250.0,
-            billing_frequency="as_needed",
-            payment_terms=30,
-            description="For sale signs, brochures, business cards",
-        ),
-        VendorProfile(
-            name="Office Space Partners",
-            vendor_type=VendorType.RECURRING,
-            category="rent",
-            typical_amount=1800.0,
-            billing_frequency="monthly",
-            payment_terms=1,
-            description="Office rent and utilities",
-        ),
-        VendorProfile(
-            name="Atlas Community Bank",
-            vendor_type=VendorType.RECURRING,
-            category="financing",
-            typical_amount=700.0,
-            billing_frequency="monthly",
-            payment_terms=30,
-            description="Brokerage credit line and financing services",
-        ),
-    ],
-}
+    }
+)
 
 
 class VendorAgent(BaseAgent):
@@ -296,6 +319,7 @@ class VendorAgent(BaseAgent):
         profile: VendorProfile,
         business_industry: str,
         agent_id: UUID | None = None,
+        rng: random.Random | None = None,
     ):
         super().__init__(
             agent_id=agent_id,
@@ -305,19 +329,37 @@ class VendorAgent(BaseAgent):
 
         self._profile = profile
         self._industry = business_industry
-        self._llm_client = OpenAIClient()
-
-        self._logger = logger.bind(
-            agent_id=str(self.id),
-            vendor_type=profile.vendor_type.value,
-            category=profile.category,
-        )
+        self._rng = rng or _default_rng
+        # All vendors talk to the same OpenAI endpoint; share one pooled client
+        self._llm_client = get_shared_llm_client(LLMProvider.OPENAI)
 
     @property
     def profile(self) -> VendorProfile:
         """Get the vendor profile."""
         return self._profile
 
+    def apply_price_increase(self, multiplier: float) -> None:
+        """Raise this vendor's typical bill amount.
+
+        Profiles are shared with the archetype table, so the agent switches to
+        an adjusted copy rather than changing the shared profile.
+
+        Args:
+            multiplier: Factor to apply to the typical amount (e.g., 1.025)
+        """
+        self._profile = replace(
+            self._profile,
+            typical_amount=round(self._profile.typical_amount * multiplier, 2),
+        )
+
+    def _log_fields(self) -> dict[str, Any]:
+        """Get the log fields identifying this agent."""
+        return {
+            **super()._log_fields(),
+            "vendor_type": self._profile.vendor_type.value,
+            "category": self._profile.category,
+        }
+
     def _get_system_prompt(self) -> str:
         """Get the vendor's system prompt."""
         return f"""You are simulating {self._profile.name}, a
@@ -333,15 +375,15 @@ Profile:
 Your role is to generate realistic bills and invoices.
 When asked, provide details about what you're billing for."""
 
-    def _get_tools(self) -> list[dict[str, Any]]:
+    def _get_tools(self) -> Sequence[dict[str, Any]]:
         """Vendors don't have tools - they generate bills."""
-        return []
+        return _NO_TOOLS
 
     async def _generate_response(self) -> AgentAction:
         """Generate a vendor response."""
         response = await self._llm_client.generate(
             system_prompt=self._get_system_prompt(),
-            messages=[{"role": m.role, "content": m.content} for m in self._conversation_history],
+            messages=self._format_messages_for_llm(),
             tools=None,
         )
 
@@ -359,10 +401,8 @@ When asked, provide details about what you're billing for."""
         Returns:
             Dictionary with bill details (items, amount, due_date_offset, notes)
         """
-        import random
-
         # Add some variance to the typical amount (±20%)
-        variance = random.uniform(0.8, 1.2)
+        variance = self._rng.uniform(0.8, 1.2)
         amount = round(self._profile.typical_amount * variance, 2)
 
         prompt = f"""As {self._profile.name}, generate a bill for a {self._industry} business.
@@ -392,23 +432,82 @@ Describe the specific items or services being billed. Be realistic and detailed.
         Returns:
             True if bill should be sent today
         """
-        import random
-
-        if self._profile.billing_frequency == "daily":
+        profile = self._profile
+        frequency = profile.billing_frequency
+        if frequency == "daily":
             return True
-        elif self._profile.billing_frequency == "weekly":
-            # Bill on a consistent day of week (use vendor name hash)
-            return hash(self._profile.name) % 7 == day_of_month % 7
-        elif self._profile.billing_frequency == "monthly":
+        elif frequency == "weekly":
+            # Bill on a consistent day of week
+            return profile.weekly_dow == day_of_month % 7
+        elif frequency == "monthly":
             # Bill on a consistent day of month
-            bill_day = (hash(self._profile.name) % 28) + 1
-            return day_of_month == bill_day
-        elif self._profile.billing_frequency == "as_needed":
+            return day_of_month == profile.monthly_day
+        elif frequency == "as_needed":
             # 20% chance on any given day
-            return random.random() < 0.2
+            return self._rng.random() < _AS_NEEDED_BILL_PROBABILITY
         return False
 
 
+@dataclass(frozen=True, slots=True)
+class VendorSchedule:
+    """Billing rules for a group of vendors, compiled up front.
+
+    Daily, weekly and monthly schedules depend only on the day of the month,
+    so they are resolved once for days 1-31; only as-needed vendors still
+    need a random draw each day. Answers "who bills today" for the whole
+    group instead of a should_send_bill_today() call per vendor.
+    """
+
+    vendors: tuple[VendorAgent, ...]
+    # Day of month -> indices into vendors of those on a fixed schedule
+    by_day: Mapping[int, tuple[int, ...]]
+    # Indices into vendors of those that bill as needed
+    as_needed: tuple[int, ...]
+
+    @classmethod
+    def from_vendors(cls, vendors: Sequence[VendorAgent]) -> "VendorSchedule":
+        """Build the schedule for a sequence of vendors."""
+        by_day: dict[int, list[int]] = {day: [] for day in range(1, 32)}
+        as_needed: list[int] = []
+        for index, vendor in enumerate(vendors):
+            profile = vendor.profile
+            frequency = profile.billing_frequency
+            if frequency == "as_needed":
+                as_needed.append(index)
+                continue
+            for day, due in by_day.items():
+                if (
+                    frequency == "daily"
+                    or (frequency == "weekly" and profile.weekly_dow == day % 7)
+                    or (frequency == "monthly" and profile.monthly_day == day)
+                ):
+                    due.append(index)
+        return cls(
+            vendors=tuple(vendors),
+            by_day=MappingProxyType({day: tuple(due) for day, due in by_day.items()}),
+            as_needed=tuple(as_needed),
+        )
+
+    def due_on(self, day_of_month: int, rng: random.Random | None = None) -> list[VendorAgent]:
+        """Get the vendors that bill on a day, in schedule order.
+
+        Gives the same answer as calling should_send_bill_today() on each
+        vendor in order, including the order of random draws.
+
+        Args:
+            day_of_month: Current day of the month (1-31)
+            rng: Optional generator for as-needed vendors
+
+        Returns:
+            Vendors that should send a bill today
+        """
+        draw = (rng or _default_rng).random
+        scheduled = self.by_day.get(day_of_month, ())
+        drawn = [i for i in self.as_needed if draw() < _AS_NEEDED_BILL_PROBABILITY]
+        indices = sorted((*scheduled, *drawn)) if drawn else scheduled
+        return [self.vendors[i] for i in indices]
+
+
 def create_vendors_for_industry(industry: str) -> list[VendorAgent]:
     """Create vendor agents for a specific industry.
 
@@ -418,5 +517,7 @@ def create_vendors_for_industry(industry: str) -> list[VendorAgent]:
     Returns:
         List of VendorAgent instances
     """
-    archetypes = VENDOR_ARCHETYPES.get(industry, [])
-    return [VendorAgent(profile=p, business_industry=industry) for p in archetypes]
+    return [
+        VendorAgent(profile=p, business_industry=industry)
+        for p in VENDOR_ARCHETYPES.get(industry, ())
+    ]
@@ -3,29 +3,38 @@
 from __future__ import annotations
 
 import calendar
+import hashlib
 import json
-import random
-from dataclasses import dataclass
+import math
+from dataclasses import dataclass, field
 from datetime import date, timedelta
 from decimal import Decimal
+from enum import StrEnum
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 from uuid import NAMESPACE_URL, UUID, uuid5
 
 import structlog
 
+from atlas_town.clients._json import loads
 from atlas_town.config.personas_loader import load_persona_b2b_configs
 from atlas_town.economics import InflationModel, get_inflation_model
 
 logger = structlog.get_logger(__name__)
 
 B2B_NAMESPACE = uuid5(NAMESPACE_URL, "atlas-town-b2b")
+# SHA-1 state with the namespace already absorbed; copied per pair id
+_B2B_NAMESPACE_SHA1 = hashlib.sha1(B2B_NAMESPACE.bytes, usedforsecurity=False)
 
-DEFAULT_FREQUENCY = "monthly"
 DEFAULT_DAY_OF_MONTH = 10
 DEFAULT_TERMS_DAYS = 30
 DEFAULT_PAYMENT_FLOW = "same_day"  # "none" or "same_day"
 
+# uuid5 sets version and variant bits above bit 61, so the low 53 are pure hash
+_UNIFORM_MASK = (1 << 53) - 1
+_UNIFORM_SCALE = float(1 << 53)
+
 DEFAULT_AMOUNT_RANGES_BY_OWNER = {
     "craig": (Decimal("300"), Decimal("2500")),
     "tony": (Decimal("150"), Decimal("1200")),
@@ -35,13 +44,53 @@ DEFAULT_AMOUNT_RANGES_BY_OWNER = {
 }
 
 
-@dataclass(frozen=True)
+class B2BFrequency(StrEnum):
+    """How often a B2B pair transacts."""
+
+    DAILY = "daily"
+    WEEKLY = "weekly"
+    MONTHLY = "monthly"
+    QUARTERLY = "quarterly"
+
+    @classmethod
+    def parse(cls, value: str) -> B2BFrequency:
+        """Normalize a configured frequency; unrecognized values bill monthly."""
+        try:
+            return cls(value.strip().lower())
+        except ValueError:
+            return cls.MONTHLY
+
+
+class B2BRelationship(StrEnum):
+    """Which side of a B2B pair the configuring org is on."""
+
+    VENDOR = "vendor"
+    CUSTOMER = "customer"
+    AUTO = "auto"
+
+    @classmethod
+    def parse(cls, value: str) -> B2BRelationship:
+        """Normalize a configured relationship, accepting seller/buyer aliases."""
+        return _RELATIONSHIP_ALIASES.get(value.strip().lower(), cls.AUTO)
+
+
+_RELATIONSHIP_ALIASES = {
+    "vendor": B2BRelationship.VENDOR,
+    "seller": B2BRelationship.VENDOR,
+    "customer": B2BRelationship.CUSTOMER,
+    "buyer": B2BRelationship.CUSTOMER,
+}
+
+DEFAULT_FREQUENCY = B2BFrequency.MONTHLY
+
+
+@dataclass(frozen=True, slots=True)
 class B2BCounterpartySpec:
     """Persona-configured B2B counterparty entry."""
 
     org_key: str
-    relationship: str = "auto"  # vendor|customer|auto
-    frequency: str = DEFAULT_FREQUENCY
+    relationship: B2BRelationship = B2BRelationship.AUTO
+    frequency: B2BFrequency = DEFAULT_FREQUENCY
     day_of_month: int | None = None
     amount_min: Decimal | None = None
     amount_max: Decimal | None = None
@@ -50,7 +99,7 @@ class B2BCounterpartySpec:
     payment_flow: str = DEFAULT_PAYMENT_FLOW
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class B2BConfig:
     """Persona-level B2B configuration."""
 
@@ -58,13 +107,13 @@ class B2BConfig:
     counterparties: tuple[B2BCounterpartySpec, ...] = ()
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class B2BPairSpec:
     """Resolved B2B relationship between seller and buyer."""
 
     seller_key: str
     buyer_key: str
-    frequency: str = DEFAULT_FREQUENCY
+    frequency: B2BFrequency = DEFAULT_FREQUENCY
     day_of_month: int = DEFAULT_DAY_OF_MONTH
     amount_min: Decimal | None = None
     amount_max: Decimal | None = None
@@ -73,7 +122,7 @@ class B2BPairSpec:
     payment_flow: str = DEFAULT_PAYMENT_FLOW
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class B2BPlannedPair:
     """Planned B2B transaction for a specific date."""
 
@@ -88,16 +137,103 @@ class B2BPlannedPair:
     description: str
     due_date: date
     payment_flow: str
+    _hash: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # pair_id is derived from both orgs and the date, so it identifies the pair
+        object.__setattr__(self, "_hash", hash(self.pair_id))
+
+    def __hash__(self) -> int:
+        return self._hash
+
+
+@dataclass(frozen=True, slots=True)
+class _DueSchedule:
+    """Pair specs bucketed by the calendar rule that makes them due.
+
+    Specs are stored with their resolution order so that the specs due on a
+    date come back in the same order the coordinator resolved them.
+    """
+
+    daily: tuple[tuple[int, B2BPairSpec], ...]
+    weekly: tuple[tuple[int, B2BPairSpec], ...]
+    monthly_by_day: dict[int, tuple[tuple[int, B2BPairSpec], ...]]
+    quarterly_by_day: dict[int, tuple[tuple[int, B2BPairSpec], ...]]
+
+    @classmethod
+    def build(cls, specs: list[B2BPairSpec]) -> _DueSchedule:
+        daily: list[tuple[int, B2BPairSpec]] = []
+        weekly: list[tuple[int, B2BPairSpec]] = []
+        monthly: dict[int, list[tuple[int, B2BPairSpec]]] = {}
+        quarterly: dict[int, list[tuple[int, B2BPairSpec]]] = {}
+        for index, spec in enumerate(specs):
+            entry = (index, spec)
+            frequency = B2BFrequency.parse(spec.frequency)
+            if frequency is B2BFrequency.DAILY:
+                daily.append(entry)
+            elif frequency is B2BFrequency.WEEKLY:
+                weekly.append(entry)
+            elif frequency is B2BFrequency.QUARTERLY:
+                quarterly.setdefault(spec.day_of_month, []).append(entry)
+            else:
+                monthly.setdefault(spec.day_of_month, []).append(entry)
+        return cls(
+            daily=tuple(daily),
+            weekly=tuple(weekly),
+            monthly_by_day={day: tuple(v) for day, v in monthly.items()},
+            quarterly_by_day={day: tuple(v) for day, v in quarterly.items()},
+        )
 
-
+    def due_on(self, current_date: date) -> list[B2BPairSpec]:
+        """Get the specs due on a date, in resolution order."""
+        due = list(self.daily)
+        if current_date.weekday() == 0:  # Monday
+            due.extend(self.weekly)
+        by_day = [self.monthly_by_day]
+        if current_date.month in (1, 4, 7, 10):
+            by_day.append(self.quarterly_by_day)
+        last_day = calendar.monthrange(current_date.year, current_date.month)[1]
+        for buckets in by_day:
+            due.extend(buckets.get(current_date.day, ()))
+            if current_date.day == last_day:
+                # Days past the end of a short month fall on its last day
+                for day, entries in buckets.items():
+                    if day > last_day:
+                        due.extend(entries)
+        due.sort(key=lambda entry: entry[0])
+        return [spec for _, spec in due]
+
+
+def _triangular_from_seed(seed: int, low: float, high: float, mode: float) -> float:
+    """Sample a triangular distribution using the low bits of a hash as the variate.
+
+    Same inverse-CDF as random.triangular(), but the uniform draw comes
+    straight from the seed instead of a freshly seeded Mersenne Twister,
+    which costs far more to set up than the sample itself.
+    """
+    u = (seed & _UNIFORM_MASK) / _UNIFORM_SCALE
+    if high == low:
+        return low
+    c = (mode - low) / (high - low)
+    if u > c:
+        u = 1.0 - u
+        c = 1.0 - c
+        low, high = high, low
+    return low + (high - low) * math.sqrt(u * c)
+
+
+@lru_cache
 def load_business_credentials() -> dict[str, dict[str, Any]]:
-    """Load business credentials to map org keys to canonical names."""
+    """Load business credentials to map org keys to canonical names.
+
+    The file doesn't change during a run, so it is read once per process.
+    """
     base_dir = Path(__file__).resolve().parents[2]
     creds_path = base_dir / "business_credentials.json"
     if not creds_path.exists():
         return {}
     try:
-        data = json.loads(creds_path.read_text(encoding="utf-8"))
+        data = loads(creds_path.read_bytes())
     except json.JSONDecodeError:
         return {}
     if not isinstance(data, dict):
@@ -105,13 +241,31 @@ def load_business_credentials() -> dict[str, dict[str, Any]]:
     return data
 
 
+def _b2b_uuid5(name: str) -> UUID:
+    """Equivalent to ``uuid5(B2B_NAMESPACE, name)`` without re-hashing the namespace."""
+    digest = _B2B_NAMESPACE_SHA1.copy()
+    digest.update(name.encode("utf-8"))
+    return UUID(bytes=digest.digest()[:16], version=5)
+
+
+@lru_cache(maxsize=1024)
+def _default_b2b_description(seller_name: str, buyer_name: str) -> str:
+    # A pair recurs for the whole run, so build its description once
+    return f"B2B services - {seller_name} to {buyer_name}"
+
+
+def _as_uuid(value: Any) -> UUID:
+    """Return value as a UUID, parsing only when it isn't one already."""
+    return value if isinstance(value, UUID) else UUID(str(value))
+
+
+# The same customer and org names are compared on every resolution pass
+@lru_cache(maxsize=4096)
 def _normalize_name(name: str) -> str:
     return " ".join(name.replace("'", "").split()).strip().lower()
 
 
-def _names_match(left: str, right: str) -> bool:
-    left_norm = _normalize_name(left)
-    right_norm = _normalize_name(right)
+def _normalized_names_match(left_norm: str, right_norm: str) -> bool:
     if not left_norm or not right_norm:
         return False
     if left_norm == right_norm:
@@ -151,11 +305,45 @@ class B2BCoordinator:
             org_reference if org_reference is not None else load_business_credentials()
         )
         self._inflation = inflation or get_inflation_model()
-        self._seen_pairs: set[str] = set()
+        # Raw UUID bytes of handled pairs, grouped by the date they were planned
+        # for so finished days can be pruned; undated marks are kept for good
+        self._seen_pairs: dict[date | None, set[bytes]] = {}
+        # Resolved specs depend only on each org's customer names, which rarely
+        # change between ticks; keep the schedule until they do
+        self._schedule_key: tuple[tuple[str, tuple[str, ...]], ...] | None = None
+        self._schedule: _DueSchedule | None = None
         self._logger = logger.bind(component="b2b_coordinator")
 
-    def mark_pair_seen(self, pair_id: str) -> None:
-        self._seen_pairs.add(pair_id)
+    def mark_pair_seen(self, pair_id: str, planned_on: date | None = None) -> None:
+        """Record that a pair has been handled so it isn't planned again.
+
+        Args:
+            pair_id: The planned pair's id.
+            planned_on: The date the pair was planned for; enables pruning.
+        """
+        self._seen_pairs.setdefault(planned_on, set()).add(UUID(pair_id).bytes)
+
+    def prune_seen_before(self, cutoff: date) -> None:
+        """Forget pairs planned for dates before ``cutoff``.
+
+        Pair ids are date-scoped, so once the simulation has moved past a
+        date its pairs can't be planned again by plan_pairs().
+        """
+        for planned_on in [d for d in self._seen_pairs if d is not None and d < cutoff]:
+            del self._seen_pairs[planned_on]
+
+    def invalidate_pair_specs(self) -> None:
+        """Drop the cached pair specs so the next plan re-resolves them.
+
+        The cache already notices changed customer names; call this after
+        changing something it can't see, such as an org's name.
+        """
+        self._schedule = None
+        self._schedule_key = None
+
+    def _is_seen(self, pair_uuid: UUID, current_date: date) -> bool:
+        key = pair_uuid.bytes
+        return any(key in self._seen_pairs.get(d, ()) for d in (current_date, None))
 
     def plan_pairs(
         self,
@@ -163,30 +351,25 @@ class B2BCoordinator:
         customers_by_org: dict[str, list[dict[str, Any]]],
     ) -> list[B2BPlannedPair]:
         """Plan B2B pairs due on the current date."""
-        pair_specs = self._resolve_pair_specs(customers_by_org)
         planned: list[B2BPlannedPair] = []
 
-        for spec in pair_specs:
-            if not self._is_due(spec, current_date):
-                continue
-
+        for spec in self._due_schedule(customers_by_org).due_on(current_date):
             seller_ctx = self._orgs_by_key.get(spec.seller_key)
             buyer_ctx = self._orgs_by_key.get(spec.buyer_key)
             if not seller_ctx or not buyer_ctx:
                 continue
 
-            pair_id = self._pair_id(
-                UUID(str(seller_ctx.id)),
-                UUID(str(buyer_ctx.id)),
-                current_date,
-            )
-            if pair_id in self._seen_pairs:
+            seller_org_id = _as_uuid(seller_ctx.id)
+            buyer_org_id = _as_uuid(buyer_ctx.id)
+            pair_uuid = self._pair_uuid(seller_org_id, buyer_org_id, current_date)
+            if self._is_seen(pair_uuid, current_date):
                 continue
+            pair_id = str(pair_uuid)
 
-            amount = self._amount_for_pair(spec, current_date)
+            amount = self._amount_for_pair(spec, current_date, pair_uuid.int)
             seller_name = str(getattr(seller_ctx, "name", spec.seller_key))
             buyer_name = str(getattr(buyer_ctx, "name", spec.buyer_key))
-            description = spec.description or f"B2B services - {seller_name} to {buyer_name}"
+            description = spec.description or _default_b2b_description(seller_name, buyer_name)
             due_date = current_date + timedelta(days=spec.invoice_terms_days)
 
             planned.append(
@@ -194,8 +377,8 @@ class B2BCoordinator:
                     pair_id=pair_id,
                     seller_key=spec.seller_key,
                     buyer_key=spec.buyer_key,
-                    seller_org_id=UUID(str(seller_ctx.id)),
-                    buyer_org_id=UUID(str(buyer_ctx.id)),
+                    seller_org_id=seller_org_id,
+                    buyer_org_id=buyer_org_id,
                     seller_name=seller_name,
                     buyer_name=buyer_name,
                     amount=amount,
@@ -207,6 +390,42 @@ class B2BCoordinator:
 
         return planned
 
+    def plan_pairs_range(
+        self,
+        start_date: date,
+        end_date: date,
+        customers_by_org: dict[str, list[dict[str, Any]]],
+    ) -> list[B2BPlannedPair]:
+        """Plan B2B pairs due on every date from start_date to end_date inclusive.
+
+        Useful for backfills: the due schedule is resolved once and reused for
+        every day in the range. Pairs are not marked seen.
+        """
+        planned: list[B2BPlannedPair] = []
+        current = start_date
+        while current <= end_date:
+            planned.extend(self.plan_pairs(current, customers_by_org))
+            current += timedelta(days=1)
+        return planned
+
+    def _due_schedule(
+        self,
+        customers_by_org: dict[str, list[dict[str, Any]]],
+    ) -> _DueSchedule:
+        key = tuple(
+            (
+                org_key,
+                tuple(
+                    str(c.get("display_name") or c.get("name", "")) for c in customers
+                ),
+            )
+            for org_key, customers in customers_by_org.items()
+        )
+        if self._schedule is None or key != self._schedule_key:
+            self._schedule = _DueSchedule.build(self._resolve_pair_specs(customers_by_org))
+            self._schedule_key = key
+        return self._schedule
+
     def _resolve_pair_specs(
         self,
         customers_by_org: dict[str, list[dict[str, Any]]],
@@ -237,14 +456,14 @@ class B2BCoordinator:
                 )
 
         # Auto-discover pairs based on customers
+        org_names = {key: self._org_name_for_key(key) for key in self._orgs_by_key}
         for seller_key, customers in customers_by_org.items():
-            seller_name = self._org_name_for_key(seller_key)
+            seller_name = org_names.get(seller_key) or self._org_name_for_key(seller_key)
             if not seller_name:
                 continue
-            for buyer_key in self._orgs_by_key:
+            for buyer_key, buyer_name in org_names.items():
                 if buyer_key == seller_key:
                     continue
-                buyer_name = self._org_name_for_key(buyer_key)
                 if not buyer_name:
                     continue
                 if not self._customers_match_org(customers, buyer_name):
@@ -280,8 +499,12 @@ class B2BCoordinator:
                     counterparties.append(
                         B2BCounterpartySpec(
                             org_key=str(org_key_value),
-                            relationship=str(item.get("relationship", "auto")),
-                            frequency=str(item.get("frequency", DEFAULT_FREQUENCY)),
+                            relationship=B2BRelationship.parse(
+                                str(item.get("relationship", "auto"))
+                            ),
+                            frequency=B2BFrequency.parse(
+                                str(item.get("frequency", DEFAULT_FREQUENCY))
+                            ),
                             day_of_month=item.get("day_of_month"),
                             amount_min=Decimal(str(amount_min)) if amount_min is not None else None,
                             amount_max=Decimal(str(amount_max)) if amount_max is not None else None,
@@ -304,11 +527,11 @@ class B2BCoordinator:
         counterparty: B2BCounterpartySpec,
         customers_by_org: dict[str, list[dict[str, Any]]],
     ) -> tuple[str | None, str | None]:
-        relationship = counterparty.relationship.strip().lower()
+        relationship = counterparty.relationship
         counterparty_key = counterparty.org_key
-        if relationship in {"vendor", "seller"}:
+        if relationship is B2BRelationship.VENDOR:
             return org_key, counterparty_key
-        if relationship in {"customer", "buyer"}:
+        if relationship is B2BRelationship.CUSTOMER:
             return counterparty_key, org_key
 
         # Auto: infer from customer list, fallback to org as seller
@@ -334,50 +557,39 @@ class B2BCoordinator:
     def _customers_match_org(customers: list[dict[str, Any]], org_name: str | None) -> bool:
         if not org_name:
             return False
+        target = _normalize_name(org_name)
         for customer in customers:
             display = customer.get("display_name") or customer.get("name", "")
-            if _names_match(str(display), org_name):
+            if _normalized_names_match(_normalize_name(str(display)), target):
                 return True
         return False
 
-    def _pair_id(self, seller_org_id: UUID, buyer_org_id: UUID, current_date: date) -> str:
+    def _pair_uuid(self, seller_org_id: UUID, buyer_org_id: UUID, current_date: date) -> UUID:
         seed = f"{seller_org_id}:{buyer_org_id}:{current_date.isoformat()}"
-        return str(uuid5(B2B_NAMESPACE, seed))
+        return _b2b_uuid5(seed)
+
+    def _amount_for_pair(self, spec: B2BPairSpec, current_date: date, seed: int) -> Decimal:
+        """Pick the pair's amount for a date.
 
-    def _amount_for_pair(self, spec: B2BPairSpec, current_date: date) -> Decimal:
+        ``seed`` is the pair UUID's integer value, so the amount reuses the hash
+        that already identifies the pair and date instead of computing another.
+        """
         amount_min, amount_max = self._default_amount_range(spec)
         if amount_min is None or amount_max is None:
             amount_min, amount_max = Decimal("250"), Decimal("2500")
 
-        seed = uuid5(
-            B2B_NAMESPACE,
-            f"{spec.seller_key}:{spec.buyer_key}:{current_date.isoformat()}",
-        ).int
-        rng = random.Random(seed)
-        amount_float = rng.triangular(
+        amount_float = _triangular_from_seed(
+            seed,
             float(amount_min),
             float(amount_max),
             float(amount_min) + (float(amount_max) - float(amount_min)) * 0.3,
         )
-        amount_float = round(amount_float / 0.05) * 0.05
-        amount = Decimal(str(round(amount_float, 2)))
+        # Round to the nearest nickel in integer cents, skipping a str round-trip
+        cents = round(amount_float * 20) * 5
+        amount = Decimal(cents).scaleb(-2)
         return self._inflation.apply(amount, current_date)
 
     def _default_amount_range(self, spec: B2BPairSpec) -> tuple[Decimal | None, Decimal | None]:
         if spec.amount_min is not None or spec.amount_max is not None:
             return spec.amount_min, spec.amount_max
         return DEFAULT_AMOUNT_RANGES_BY_OWNER.get(spec.seller_key, (None, None))
-
-    @staticmethod
-    def _is_due(spec: B2BPairSpec, current_date: date) -> bool:
-        frequency = spec.frequency.strip().lower()
-        if frequency == "daily":
-            return True
-        if frequency == "weekly":
-            return current_date.weekday() == 0  # Monday
-        if frequency == "quarterly" and current_date.month not in (1, 4, 7, 10):
-            return False
-        day = spec.day_of_month
-        last_day = calendar.monthrange(current_date.year, current_date.month)[1]
-        target_day = min(day, last_day)
-        return current_date.day == target_day
@@ -1,9 +1,32 @@
-"""LLM client implementations for Atlas Town simulation."""
+"""LLM client implementations for Atlas Town simulation.
 
-from atlas_town.clients.claude import ClaudeClient, ClaudeResponse
-from atlas_town.clients.gemini import GeminiClient, GeminiResponse
-from atlas_town.clients.ollama import OllamaClient, OllamaResponse
-from atlas_town.clients.openai_client import OpenAIClient, OpenAIResponse
+Each client pulls in its provider's SDK, so the submodules are imported
+lazily on first attribute access rather than with the package.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from atlas_town.clients.cache import ResponseCache
+    from atlas_town.clients.claude import ClaudeClient, ClaudeResponse
+    from atlas_town.clients.gemini import GeminiClient, GeminiResponse
+    from atlas_town.clients.ollama import OllamaClient, OllamaResponse
+    from atlas_town.clients.openai_client import OpenAIClient, OpenAIResponse
+    from atlas_town.clients.router import RouterLLMClient
+
+_EXPORTS = {
+    "ClaudeClient": "atlas_town.clients.claude",
+    "ClaudeResponse": "atlas_town.clients.claude",
+    "OpenAIClient": "atlas_town.clients.openai_client",
+    "OpenAIResponse": "atlas_town.clients.openai_client",
+    "GeminiClient": "atlas_town.clients.gemini",
+    "GeminiResponse": "atlas_town.clients.gemini",
+    "OllamaClient": "atlas_town.clients.ollama",
+    "OllamaResponse": "atlas_town.clients.ollama",
+    "ResponseCache": "atlas_town.clients.cache",
+    "RouterLLMClient": "atlas_town.clients.router",
+}
 
 __all__ = [
     "ClaudeClient",
@@ -14,4 +37,13 @@ __all__ = [
     "GeminiResponse",
     "OllamaClient",
     "OllamaResponse",
+    "ResponseCache",
+    "RouterLLMClient",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(module), name)
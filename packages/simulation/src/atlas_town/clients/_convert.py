@@ -0,0 +1,401 @@
+"""Provider-neutral message and tool conversion shared by the LLM clients.
+
+Agents speak one format: messages with role "user", "assistant" (optional
+``tool_calls`` of ``{"id", "name", "arguments"}``) or "tool_result", and
+tools with ``name``, ``description`` and a JSON Schema ``input_schema``.
+These pure functions map that format onto each provider's wire dicts and
+import no SDK, so every client can use them without pulling in the others'
+dependencies. Gemini contents are built from SDK types and stay in
+gemini.py; only its schema mapping lives here.
+
+Release wheels may compile this module with mypyc (see the hatch build hook
+in pyproject.toml), so it must stay fully annotated and mypy-strict clean,
+and tests must not monkeypatch its globals.
+"""
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Generic, ParamSpec, TypeVar
+
+from atlas_town.clients._json import dumps, loads
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+# Histories longer than this are converted on a worker thread
+OFF_LOOP_MESSAGE_THRESHOLD = 200
+
+
+async def convert_history(
+    messages: Sequence[dict[str, Any]],
+    convert: Callable[P, T],
+    *args: P.args,
+    **kwargs: P.kwargs,
+) -> T:
+    """Run ``convert(*args, **kwargs)``, off the event loop for long histories.
+
+    Conversion is pure Python and linear in the history, so for a long-lived
+    agent it can hold the loop for milliseconds while other agents' turns
+    wait. On a thread the interpreter switches back to the loop every few
+    milliseconds instead. Short histories convert inline, where a thread
+    hop would cost more than it saves.
+
+    Args:
+        messages: The history being converted (only its length is used).
+        convert: The converter to run.
+        *args: Positional arguments for ``convert``.
+        **kwargs: Keyword arguments for ``convert``.
+
+    Returns:
+        Whatever ``convert`` returns.
+    """
+    if len(messages) > OFF_LOOP_MESSAGE_THRESHOLD:
+        return await asyncio.to_thread(convert, *args, **kwargs)
+    return convert(*args, **kwargs)
+
+
+# Appends the conversion of some neutral messages to a converted list
+Extend = Callable[[list[T], Sequence[dict[str, Any]]], None]
+
+
+@dataclass
+class _ConvertedHistory(Generic[T]):
+    """What a HistoryConverter remembers about one history list."""
+
+    source: Sequence[dict[str, Any]]
+    count: int
+    first: dict[str, Any] | None
+    last: dict[str, Any] | None
+    converted: list[T]
+
+    def continues(self, messages: Sequence[dict[str, Any]]) -> bool:
+        """Whether ``messages`` is this history with only messages appended."""
+        if messages is not self.source or len(messages) < self.count:
+            return False
+        if not self.count:
+            return True
+        return messages[0] is self.first and messages[self.count - 1] is self.last
+
+
+class HistoryConverter(Generic[T]):
+    """Converts growing conversation histories, reusing earlier work.
+
+    An agent appends to the same history list for its whole life, so
+    between two requests only the messages added since need converting.
+    For each of the most recently used ``maxsize`` lists this remembers how
+    many messages were converted and the result, and hands only the new
+    tail to ``extend``. A history that was cleared or compacted in place
+    (its first or last converted message is no longer the same object) is
+    converted from scratch; messages already in a history must not be
+    mutated.
+    """
+
+    def __init__(self, extend: Extend[T], maxsize: int = 64):
+        self._extend = extend
+        self._maxsize = maxsize
+        # id(history) -> state; the state holds the list, so the id stays valid
+        self._histories: OrderedDict[int, _ConvertedHistory[T]] = OrderedDict()
+
+    async def convert(self, messages: Sequence[dict[str, Any]]) -> list[T]:
+        """Convert ``messages``, off the event loop if the new part is long.
+
+        Returns:
+            A new list the caller may modify.
+        """
+        key = id(messages)
+        state = self._histories.get(key)
+        if state is not None and state.continues(messages):
+            start, converted = state.count, list(state.converted)
+        else:
+            start, converted = 0, []
+
+        tail = messages[start:]
+        if tail:
+            await convert_history(tail, self._extend, converted, tail)
+
+        self._histories[key] = _ConvertedHistory(
+            source=messages,
+            count=len(messages),
+            first=messages[0] if messages else None,
+            last=messages[-1] if messages else None,
+            converted=converted,
+        )
+        self._histories.move_to_end(key)
+        while len(self._histories) > self._maxsize:
+            self._histories.popitem(last=False)
+        return list(converted)
+
+# ---------------------------------------------------------------------------
+# Anthropic
+# ---------------------------------------------------------------------------
+
+
+def _anthropic_user(msg: dict[str, Any]) -> dict[str, Any]:
+    return {"role": "user", "content": msg["content"]}
+
+
+def _anthropic_assistant(msg: dict[str, Any]) -> dict[str, Any]:
+    content = msg.get("content")
+    blocks: list[dict[str, Any]] = [{"type": "text", "text": content}] if content else []
+    blocks.extend(
+        {
+            "type": "tool_use",
+            "id": tool_call["id"],
+            "name": tool_call["name"],
+            "input": tool_call["arguments"],
+        }
+        for tool_call in msg.get("tool_calls", ())
+    )
+    return {"role": "assistant", "content": blocks or msg.get("content", "")}
+
+
+def _anthropic_tool_result(msg: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "type": "tool_result",
+        "tool_use_id": msg["tool_call_id"],
+        "content": msg["content"],
+    }
+
+
+# Neutral role -> Anthropic message; tool results are merged separately
+_ANTHROPIC_CONVERTERS: dict[str, Callable[[dict[str, Any]], dict[str, Any]]] = {
+    "user": _anthropic_user,
+    "assistant": _anthropic_assistant,
+}
+
+
+def to_anthropic_messages(messages: Sequence[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Convert conversation history to Anthropic's message format."""
+    anthropic_messages: list[dict[str, Any]] = []
+    extend_anthropic_messages(anthropic_messages, messages)
+    return anthropic_messages
+
+
+def _is_tool_results(message: dict[str, Any]) -> bool:
+    content = message["content"]
+    return (
+        message["role"] == "user"
+        and isinstance(content, list)
+        and bool(content)
+        and all(block.get("type") == "tool_result" for block in content)
+    )
+
+
+def extend_anthropic_messages(
+    anthropic_messages: list[dict[str, Any]], messages: Sequence[dict[str, Any]]
+) -> None:
+    """Append ``messages`` in Anthropic's format to an already converted history.
+
+    Results continuing a tool-result message at the end of
+    ``anthropic_messages`` are merged into a copy of it.
+    """
+    # Content list of the trailing tool-result message, if the last message
+    # appended was one; results of a multi-tool turn go back in a single
+    # user message
+    open_results: list[dict[str, Any]] | None = None
+    if anthropic_messages and _is_tool_results(anthropic_messages[-1]):
+        open_results = list(anthropic_messages[-1]["content"])
+        anthropic_messages[-1] = {"role": "user", "content": open_results}
+
+    for msg in messages:
+        role = msg["role"]
+        if role == "tool_result":
+            block = _anthropic_tool_result(msg)
+            if open_results is not None:
+                open_results.append(block)
+            else:
+                open_results = [block]
+                anthropic_messages.append({"role": "user", "content": open_results})
+            continue
+
+        convert = _ANTHROPIC_CONVERTERS.get(role)
+        if convert is not None:
+            anthropic_messages.append(convert(msg))
+            open_results = None
+
+
+def to_anthropic_tools(tools: Sequence[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Convert tools to Anthropic's format (our format minus any extra keys)."""
+    return [
+        {
+            "name": tool["name"],
+            "description": tool["description"],
+            "input_schema": tool["input_schema"],
+        }
+        for tool in tools
+    ]
+
+
+# ---------------------------------------------------------------------------
+# OpenAI-compatible (OpenAI, LM Studio, Ollama)
+# ---------------------------------------------------------------------------
+
+
+def to_openai_messages(
+    system_prompt: str,
+    messages: Sequence[dict[str, Any]],
+    *,
+    arguments_as_json: bool = True,
+    require_content: bool = False,
+) -> list[dict[str, Any]]:
+    """Convert conversation history to the OpenAI chat format.
+
+    Args:
+        system_prompt: Sent as the leading system message.
+        messages: Conversation history in our format.
+        arguments_as_json: Encode tool call arguments as a JSON string (OpenAI)
+            rather than passing the dict through (Ollama).
+        require_content: Always include assistant ``content``, as Ollama
+            requires, even when the turn only has tool calls.
+
+    Returns:
+        Messages ready for a chat completions request.
+    """
+    converted: list[dict[str, Any]] = [{"role": "system", "content": system_prompt}]
+    extend_openai_messages(
+        converted,
+        messages,
+        arguments_as_json=arguments_as_json,
+        require_content=require_content,
+    )
+    return converted
+
+
+def extend_openai_messages(
+    converted: list[dict[str, Any]],
+    messages: Sequence[dict[str, Any]],
+    *,
+    arguments_as_json: bool = True,
+    require_content: bool = False,
+) -> None:
+    """Append ``messages`` in the OpenAI chat format to ``converted``.
+
+    Takes the same options as to_openai_messages(); no system message is added.
+    """
+    converters = _openai_converters(arguments_as_json, require_content)
+    append = converted.append
+    for msg in messages:
+        convert = converters.get(msg["role"])
+        if convert is not None:
+            append(convert(msg))
+
+
+def _openai_user(msg: dict[str, Any]) -> dict[str, Any]:
+    return {"role": "user", "content": msg["content"]}
+
+
+def _openai_tool_result(msg: dict[str, Any]) -> dict[str, Any]:
+    return {"role": "tool", "tool_call_id": msg["tool_call_id"], "content": msg["content"]}
+
+
+def _argument_dict(arguments: Any) -> Any:
+    return arguments if isinstance(arguments, dict) else loads(arguments)
+
+
+@lru_cache
+def _openai_converters(
+    arguments_as_json: bool, require_content: bool
+) -> dict[str, Callable[[dict[str, Any]], dict[str, Any]]]:
+    """Neutral role -> OpenAI message, specialized for one set of options.
+
+    The options are fixed per client, so they are decided once here rather
+    than re-checked for every message.
+    """
+    encode_arguments: Callable[[Any], Any] = dumps if arguments_as_json else _argument_dict
+
+    def assistant(msg: dict[str, Any]) -> dict[str, Any]:
+        content = msg.get("content")
+        assistant_msg: dict[str, Any] = {"role": "assistant"}
+        if require_content or content:
+            assistant_msg["content"] = content or ""
+        tool_calls = msg.get("tool_calls")
+        if tool_calls:
+            assistant_msg["tool_calls"] = [
+                {
+                    "id": tc["id"],
+                    "type": "function",
+                    "function": {
+                        "name": tc["name"],
+                        "arguments": encode_arguments(tc["arguments"]),
+                    },
+                }
+                for tc in tool_calls
+            ]
+        return assistant_msg
+
+    return {"user": _openai_user, "assistant": assistant, "tool_result": _openai_tool_result}
+
+
+def to_openai_tools(tools: Sequence[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Convert tools to the OpenAI function-calling format."""
+    return [
+        {
+            "type": "function",
+            "function": {
+                "name": tool["name"],
+                "description": tool["description"],
+                "parameters": tool["input_schema"],
+            },
+        }
+        for tool in tools
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Gemini
+# ---------------------------------------------------------------------------
+
+# JSON Schema type -> Gemini (OpenAPI) schema type
+_GEMINI_TYPES = {
+    "string": "STRING",
+    "integer": "INTEGER",
+    "number": "NUMBER",
+    "boolean": "BOOLEAN",
+    "array": "ARRAY",
+    "object": "OBJECT",
+}
+
+
+def json_schema_to_gemini(schema: dict[str, Any]) -> dict[str, Any]:
+    """Convert JSON Schema to Gemini's schema format.
+
+    Gemini uses a subset of OpenAPI schema format. The walk uses an explicit
+    stack rather than recursion, so deeply nested tool schemas cost no
+    Python frames and can't hit the recursion limit.
+    """
+    root: dict[str, Any] = {}
+    stack: list[tuple[dict[str, Any], dict[str, Any]]] = [(schema, root)]
+
+    while stack:
+        source, target = stack.pop()
+
+        if "type" in source:
+            target["type"] = _GEMINI_TYPES.get(source["type"], "STRING")
+
+        if "description" in source:
+            target["description"] = source["description"]
+
+        if "enum" in source:
+            target["enum"] = source["enum"]
+
+        if "properties" in source:
+            properties: dict[str, Any] = {}
+            target["properties"] = properties
+            for name, subschema in source["properties"].items():
+                # Insert now so properties keep their order; filled when popped
+                converted: dict[str, Any] = {}
+                properties[name] = converted
+                stack.append((subschema, converted))
+
+        if "required" in source:
+            target["required"] = source["required"]
+
+        if "items" in source:
+            items: dict[str, Any] = {}
+            target["items"] = items
+            stack.append((source["items"], items))
+
+    return root
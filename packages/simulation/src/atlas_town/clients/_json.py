@@ -0,0 +1,55 @@
+"""Compact JSON helpers, backed by orjson when it is installed.
+
+Everything the clients serialize for the wire, the response cache or JSON
+logs goes through dumps()/loads(), so output is compact (no spaces) and,
+with ``sort_keys``, canonical whichever backend is in use. Install the
+``fast`` extra to get orjson.
+"""
+
+import json
+from collections.abc import Callable
+from typing import Any
+
+try:  # orjson is optional; it is several times faster than the stdlib
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None  # type: ignore[assignment]
+
+
+def dumps(
+    obj: Any, *, sort_keys: bool = False, default: Callable[[Any], Any] = str
+) -> str:
+    """Serialize ``obj`` to compact JSON text.
+
+    Args:
+        obj: Value to serialize.
+        sort_keys: Emit object keys in sorted order, for stable cache keys.
+        default: Called for values JSON can't represent; ``str`` by default.
+
+    Returns:
+        The JSON document.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=default, option=option).decode()
+    return json.dumps(
+        obj,
+        sort_keys=sort_keys,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=default,
+    )
+
+
+def loads(data: str | bytes) -> Any:
+    """Parse a JSON document.
+
+    Raises:
+        json.JSONDecodeError: If ``data`` is not valid JSON (orjson's error
+            subclasses it).
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
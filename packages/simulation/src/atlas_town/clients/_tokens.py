@@ -0,0 +1,10 @@
+"""Provider-independent token estimate shared by the clients."""
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate how many tokens ``text`` takes, without a tokenizer.
+
+    Assumes ~3 characters per token: English prose runs nearer 4, but JSON
+    and IDs tokenize denser, and overestimating is the safe side of a budget.
+    """
+    return len(text) // 3
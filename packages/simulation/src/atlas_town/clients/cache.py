@@ -0,0 +1,184 @@
+"""In-memory LRU + TTL cache for LLM responses.
+
+Many agents send byte-identical requests (same prompt, history and tools),
+so a deterministic request only needs one round-trip per TTL window.
+"""
+
+import asyncio
+import copy
+import hashlib
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Sequence
+from functools import lru_cache
+from typing import Any, Generic, TypeVar
+
+import structlog
+
+from atlas_town.clients._json import dumps
+from atlas_town.config import get_settings
+
+logger = structlog.get_logger(__name__)
+
+T = TypeVar("T")
+
+
+def make_cache_key(
+    model: str,
+    system_prompt: str,
+    messages: Sequence[dict[str, Any]],
+    tools: Sequence[dict[str, Any]] | None = None,
+    cache_key_extra: str | None = None,
+) -> str:
+    """Build a cache key for a generate() request.
+
+    The key is ``"<cache_key_extra>:<model>:<digest>"`` so that
+    ``ResponseCache.invalidate`` can drop everything under a prompt version
+    or model without knowing the individual requests.
+
+    Args:
+        model: Model name the request is sent to.
+        system_prompt: The system prompt.
+        messages: Conversation history in our neutral message format.
+        tools: Tool definitions, if any.
+        cache_key_extra: Caller-supplied namespace such as a prompt version.
+
+    Returns:
+        The cache key.
+    """
+    payload = dumps([system_prompt, messages, tools or ()], sort_keys=True)
+    return f"{cache_key_extra or ''}:{model}:{text_digest(payload)}"
+
+
+def text_digest(text: str) -> str:
+    """Return a short, collision-resistant hex digest of ``text``."""
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+class ResponseCache(Generic[T]):
+    """LRU cache whose entries also expire after ``ttl`` seconds.
+
+    get() and put() never await, so they are atomic on the event loop and
+    need no lock. get_or_fetch() additionally coalesces concurrent misses on
+    the same key into one fetch, which absorbs the burst of identical
+    requests when many agents start a tick together. Values are deep-copied
+    on the way in and out so callers can mutate a response without
+    corrupting the cached one.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 3600.0):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        # key -> (expires_at, value), least recently used first
+        self._entries: OrderedDict[str, tuple[float, T]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future[T]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> T | None:
+        """Return a copy of the cached value, or None on a miss or expiry."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return copy.deepcopy(value)
+
+    def put(self, key: str, value: T) -> None:
+        """Store a copy of ``value``, evicting the least recently used entry."""
+        if self._maxsize <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self._ttl, copy.deepcopy(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    async def get_or_fetch(
+        self, key: str, fetch: Callable[[], Awaitable[T]]
+    ) -> tuple[T, bool]:
+        """Return the cached value for ``key``, fetching it on a miss.
+
+        While a fetch is running, other callers for the same key wait for it
+        instead of starting their own; they also receive its exception if
+        it fails.
+
+        Args:
+            key: Cache key from make_cache_key().
+            fetch: Produces the value on a miss.
+
+        Returns:
+            Tuple of (value, fresh) where fresh is True only for the caller
+            whose fetch produced the value.
+        """
+        cached = self.get(key)
+        if cached is not None:
+            logger.debug("response_cache_hit", key=key)
+            return cached, False
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            logger.debug("response_coalesced", key=key)
+            # shield: cancelling one waiter must not cancel the shared fetch
+            value = await asyncio.shield(pending)
+            return copy.deepcopy(value), False
+
+        future: asyncio.Future[T] = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await fetch()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so a fetch with no waiters doesn't warn
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+        self.put(key, value)
+        # Waiters copy from their own snapshot; the caller may mutate value
+        future.set_result(copy.deepcopy(value))
+        return value, True
+
+    def invalidate(self, prefix: str = "") -> int:
+        """Drop entries whose key starts with ``prefix`` (all by default).
+
+        Args:
+            prefix: Key prefix, e.g. ``"prompt-v2:"`` to drop one prompt version.
+
+        Returns:
+            Number of entries removed.
+        """
+        if not prefix:
+            removed = len(self._entries)
+            self._entries.clear()
+        else:
+            stale = [key for key in self._entries if key.startswith(prefix)]
+            for key in stale:
+                del self._entries[key]
+            removed = len(stale)
+        if removed:
+            logger.debug("response_cache_invalidated", prefix=prefix, removed=removed)
+        return removed
+
+
+@lru_cache
+def get_response_cache() -> ResponseCache[Any]:
+    """Process-wide response cache shared by all LLM clients."""
+    settings = get_settings()
+    return ResponseCache(
+        maxsize=settings.llm_response_cache_size,
+        ttl=settings.llm_response_cache_ttl,
+    )
@@ -1,15 +1,52 @@
 """Claude (Anthropic) LLM client with function calling support."""
 
+import math
+from collections.abc import Callable, Sequence
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, cast
 
 import anthropic
 import structlog
 
+from atlas_town.clients._convert import (
+    HistoryConverter,
+    extend_anthropic_messages,
+    to_anthropic_messages,
+    to_anthropic_tools,
+)
+from atlas_town.clients._tokens import estimate_tokens
+from atlas_town.clients.cache import (
+    ResponseCache,
+    get_response_cache,
+    make_cache_key,
+    text_digest,
+)
 from atlas_town.config import get_settings
 
 logger = structlog.get_logger(__name__)
 
+# Marker telling Anthropic to cache the prompt prefix up to (and including) a block.
+EPHEMERAL_CACHE_CONTROL: dict[str, str] = {"type": "ephemeral"}
+
+# Called on the event loop with (tool name, arguments) as soon as a streamed
+# tool_use block completes
+ToolUseCallback = Callable[[str, dict[str, Any]], None]
+
+
+def _build_http_client() -> anthropic.DefaultAsyncHttpxClient:
+    """Build the pooled transport used when no http_client is injected."""
+    settings = get_settings()
+    # The SDK ships its own httpx flavour, so take Limits from it rather than httpx
+    limits_cls = type(anthropic.DEFAULT_CONNECTION_LIMITS)
+    return anthropic.DefaultAsyncHttpxClient(
+        http2=settings.llm_http2,
+        limits=limits_cls(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+            keepalive_expiry=settings.llm_keepalive_expiry,
+        ),
+    )
+
 
 @dataclass
 class ClaudeResponse:
@@ -24,97 +61,122 @@ class ClaudeResponse:
 class ClaudeClient:
     """Client for Anthropic's Claude API with tool use support."""
 
+    # generate() accepts on_tool_use and reports tool calls while streaming
+    streams_tool_calls = True
+
     def __init__(
         self,
         api_key: str | None = None,
         model: str | None = None,
         max_tokens: int | None = None,
         temperature: float | None = None,
+        prompt_caching: bool = True,
+        http_client: anthropic.DefaultAsyncHttpxClient | None = None,
+        response_cache: ResponseCache[ClaudeResponse] | None = None,
     ):
         settings = get_settings()
         self._api_key = api_key or settings.anthropic_api_key.get_secret_value()
         self._model = model or settings.claude_model
         self._max_tokens = max_tokens or settings.llm_max_tokens
         self._temperature = temperature or settings.llm_temperature
-
-        self._client = anthropic.Anthropic(api_key=self._api_key)
+        self._prompt_caching = prompt_caching
+        # Exact token counts by text digest; they never go stale
+        self._token_counts: ResponseCache[int] = ResponseCache(ttl=math.inf)
+        self._response_cache = (
+            response_cache if response_cache is not None else get_response_cache()
+        )
+        # id(tools) -> (tools, converted); holding tools keeps the id valid
+        self._prepared_tools: dict[
+            int, tuple[Sequence[dict[str, Any]], list[dict[str, Any]]]
+        ] = {}
+        self._history = HistoryConverter(extend_anthropic_messages)
+
+        # An injected http_client lets several SDK clients share one connection pool
+        if http_client is None:
+            http_client = _build_http_client()
+        self._http_client = http_client
+        # The SDK retries 429/5xx/connection errors with jittered exponential backoff
+        self._client = anthropic.AsyncAnthropic(
+            api_key=self._api_key,
+            http_client=http_client,
+            max_retries=settings.llm_max_retries,
+        )
         self._logger = logger.bind(client="claude", model=self._model)
 
     def _convert_tools_to_anthropic_format(
-        self, tools: list[dict[str, Any]]
+        self, tools: Sequence[dict[str, Any]]
     ) -> list[dict[str, Any]]:
-        """Convert our tool format to Anthropic's expected format.
-
-        Our format uses 'input_schema', Anthropic uses 'input_schema' too,
-        but we need to ensure the structure is correct.
-        """
-        anthropic_tools = []
-        for tool in tools:
-            anthropic_tools.append({
-                "name": tool["name"],
-                "description": tool["description"],
-                "input_schema": tool["input_schema"],
-            })
-        return anthropic_tools
+        """Convert our tool format to Anthropic's expected format."""
+        return to_anthropic_tools(tools)
 
     def _convert_messages_to_anthropic_format(
         self, messages: list[dict[str, Any]]
     ) -> list[dict[str, Any]]:
         """Convert conversation history to Anthropic's message format."""
-        anthropic_messages = []
+        return to_anthropic_messages(messages)
+
+    def _build_system_blocks(self, system_prompt: str) -> list[dict[str, Any]]:
+        """Wrap the system prompt in a text block marked as a cache breakpoint."""
+        return [
+            {
+                "type": "text",
+                "text": system_prompt,
+                "cache_control": EPHEMERAL_CACHE_CONTROL,
+            }
+        ]
+
+    def _prepare_tools(self, tools: Sequence[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Convert tools to Anthropic format, tagging the last one as cacheable.
+
+        Tagging the last tool caches the (static) tool schema. Frozen tool
+        collections (tuples) are converted once and the result reused for
+        every subsequent request (a shared client sees one per agent type).
+        """
+        memo = self._prepared_tools.get(id(tools))
+        if memo is not None and memo[0] is tools:
+            return memo[1]
+
+        anthropic_tools = self._convert_tools_to_anthropic_format(tools)
+        if self._prompt_caching and anthropic_tools:
+            anthropic_tools[-1] = {
+                **anthropic_tools[-1],
+                "cache_control": EPHEMERAL_CACHE_CONTROL,
+            }
+        if isinstance(tools, tuple):
+            self._prepared_tools[id(tools)] = (tools, anthropic_tools)
+        return anthropic_tools
 
-        for msg in messages:
-            if msg["role"] == "user":
-                anthropic_messages.append({
-                    "role": "user",
-                    "content": msg["content"],
-                })
-            elif msg["role"] == "assistant":
-                # Build content blocks for assistant message
-                content_blocks = []
-
-                # Add text content if present
-                if msg.get("content"):
-                    content_blocks.append({
-                        "type": "text",
-                        "text": msg["content"],
-                    })
-
-                # Add tool use blocks if present
-                for tool_call in msg.get("tool_calls", []):
-                    content_blocks.append({
-                        "type": "tool_use",
-                        "id": tool_call["id"],
-                        "name": tool_call["name"],
-                        "input": tool_call["arguments"],
-                    })
-
-                anthropic_messages.append({
-                    "role": "assistant",
-                    "content": content_blocks if content_blocks else msg.get("content", ""),
-                })
-            elif msg["role"] == "tool_result":
-                anthropic_messages.append({
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "tool_result",
-                            "tool_use_id": msg["tool_call_id"],
-                            "content": msg["content"],
-                        }
-                    ],
-                })
+    def _mark_history_breakpoint(self, messages: list[dict[str, Any]]) -> None:
+        """Mark the conversation prefix as cacheable.
 
-        return anthropic_messages
+        Anthropic caches everything up to a block carrying ``cache_control``;
+        tagging the final message caches the history so the next ReAct
+        iteration only prefills the new turn. The message list is freshly
+        built per request, so it is updated in place.
+        """
+        if not messages:
+            return
+        last = messages[-1]
+        content = last["content"]
+        if isinstance(content, str):
+            if not content:
+                return
+            content = [{"type": "text", "text": content}]
+        elif content:
+            content = list(content)
+        else:
+            return
+        content[-1] = {**content[-1], "cache_control": EPHEMERAL_CACHE_CONTROL}
+        messages[-1] = {**last, "content": content}
 
     def _parse_response(self, response: anthropic.types.Message) -> ClaudeResponse:
         """Parse Anthropic response into our format."""
-        content = ""
+        text_parts: list[str] = []
         tool_calls = []
 
         for block in response.content:
             if block.type == "text":
-                content = block.text
+                text_parts.append(block.text)
             elif block.type == "tool_use":
                 tool_calls.append({
                     "id": block.id,
@@ -123,20 +185,41 @@ class ClaudeClient:
                 })
 
         return ClaudeResponse(
-            content=content,
+            content="".join(text_parts),
             tool_calls=tool_calls,
             stop_reason=response.stop_reason or "end_turn",
             usage={
                 "input_tokens": response.usage.input_tokens,
                 "output_tokens": response.usage.output_tokens,
+                "cache_read_input_tokens": response.usage.cache_read_input_tokens or 0,
+                "cache_creation_input_tokens": response.usage.cache_creation_input_tokens or 0,
             },
         )
 
+    async def _stream_message(
+        self,
+        kwargs: dict[str, Any],
+        on_tool_use: ToolUseCallback,
+    ) -> anthropic.types.Message:
+        """Stream a message, reporting each tool_use block as it completes.
+
+        Callbacks run between stream events, so they can start async work
+        while the rest of the response is still arriving.
+        """
+        async with self._client.messages.stream(**kwargs) as stream:
+            async for event in stream:
+                if event.type == "content_block_stop" and event.content_block.type == "tool_use":
+                    block = event.content_block
+                    on_tool_use(block.name, cast(dict[str, Any], block.input))
+            return await stream.get_final_message()
+
     async def generate(
         self,
         system_prompt: str,
         messages: list[dict[str, Any]],
-        tools: list[dict[str, Any]] | None = None,
+        tools: Sequence[dict[str, Any]] | None = None,
+        on_tool_use: ToolUseCallback | None = None,
+        cache_key_extra: str | None = None,
     ) -> ClaudeResponse:
         """Generate a response from Claude.
 
@@ -144,6 +227,11 @@ class ClaudeClient:
             system_prompt: The system prompt defining agent behavior.
             messages: Conversation history as list of message dicts.
             tools: Optional list of tool definitions for function calling.
+            on_tool_use: Optional callback invoked for each
+                tool call as soon as it has been streamed, before the full
+                response is available.
+            cache_key_extra: Opts a sampled (temperature > 0) request into the
+                response cache under this namespace, e.g. a prompt version.
 
         Returns:
             ClaudeResponse with content, tool calls, and usage info.
@@ -154,14 +242,45 @@ class ClaudeClient:
             tool_count=len(tools) if tools else 0,
         )
 
+        if cache_key_extra is None and self._temperature != 0:
+            return await self._request(system_prompt, messages, tools, on_tool_use)
+
+        # Deterministic requests are answered from cache, and identical ones
+        # already in flight share a single API call
+        cache_key = make_cache_key(self._model, system_prompt, messages, tools, cache_key_extra)
+        parsed, fresh = await self._response_cache.get_or_fetch(
+            cache_key,
+            lambda: self._request(system_prompt, messages, tools, on_tool_use),
+        )
+        if not fresh and on_tool_use is not None:
+            for call in parsed.tool_calls:
+                on_tool_use(call["name"], call["arguments"])
+        return parsed
+
+    async def _request(
+        self,
+        system_prompt: str,
+        messages: list[dict[str, Any]],
+        tools: Sequence[dict[str, Any]] | None,
+        on_tool_use: ToolUseCallback | None,
+    ) -> ClaudeResponse:
+        """Send one request to the API and parse the response."""
         # Convert messages to Anthropic format
-        anthropic_messages = self._convert_messages_to_anthropic_format(messages)
+        anthropic_messages = await self._history.convert(messages)
+
+        anthropic_tools = self._prepare_tools(tools) if tools else []
+        if self._prompt_caching:
+            self._mark_history_breakpoint(anthropic_messages)
 
         # Build request kwargs
         kwargs: dict[str, Any] = {
             "model": self._model,
             "max_tokens": self._max_tokens,
-            "system": system_prompt,
+            "system": (
+                self._build_system_blocks(system_prompt)
+                if self._prompt_caching
+                else system_prompt
+            ),
             "messages": anthropic_messages,
         }
 
@@ -170,12 +289,14 @@ class ClaudeClient:
             kwargs["temperature"] = self._temperature
 
         # Add tools if provided
-        if tools:
-            kwargs["tools"] = self._convert_tools_to_anthropic_format(tools)
+        if anthropic_tools:
+            kwargs["tools"] = anthropic_tools
 
-        # Make the API call (synchronous, but we wrap in async interface)
         try:
-            response = self._client.messages.create(**kwargs)
+            if on_tool_use is not None:
+                response = await self._stream_message(kwargs, on_tool_use)
+            else:
+                response = await self._client.messages.create(**kwargs)
 
             parsed = self._parse_response(response)
 
@@ -185,6 +306,7 @@ class ClaudeClient:
                 tool_calls=len(parsed.tool_calls),
                 input_tokens=parsed.usage["input_tokens"],
                 output_tokens=parsed.usage["output_tokens"],
+                cache_read_tokens=parsed.usage["cache_read_input_tokens"],
             )
 
             return parsed
@@ -193,10 +315,46 @@ class ClaudeClient:
             self._logger.error("api_error", error=str(e))
             raise
 
+    @staticmethod
+    def is_transient_error(error: BaseException) -> bool:
+        """Whether ``error`` is worth retrying elsewhere (rate limit or outage)."""
+        if isinstance(error, anthropic.APIStatusError):
+            return error.status_code in (408, 429) or error.status_code >= 500
+        return isinstance(error, anthropic.APIConnectionError)
+
+    async def warmup(self) -> None:
+        """Open a pooled connection to the API ahead of the first request.
+
+        Sends an unauthenticated HEAD, so the TLS handshake happens now
+        rather than on the first agent turn; any response (typically 4xx)
+        will do. Failures are logged rather than raised.
+        """
+        try:
+            await self._http_client.head(str(self._client.base_url), timeout=10.0)
+            self._logger.info("connection_warmed")
+        except Exception as e:
+            self._logger.warning("connection_warmup_failed", error=str(e))
+
     def count_tokens(self, text: str) -> int:
         """Estimate token count for text.
 
-        Note: This is an approximation. For exact counts, use the API.
+        Note: This is an approximation. For exact counts, use
+        count_tokens_exact().
+        """
+        return estimate_tokens(text)
+
+    async def count_tokens_exact(self, text: str) -> int:
+        """Count the tokens of ``text`` as a user message, using the API.
+
+        Results are cached by content, so repeated budget checks on the same
+        prompt cost one request.
         """
-        # Rough approximation: ~4 characters per token for English
-        return len(text) // 4
+
+        async def fetch() -> int:
+            result = await self._client.messages.count_tokens(
+                model=self._model, messages=[{"role": "user", "content": text}]
+            )
+            return result.input_tokens
+
+        count, _ = await self._token_counts.get_or_fetch(text_digest(text), fetch)
+        return count
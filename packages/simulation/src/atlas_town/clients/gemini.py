@@ -3,19 +3,107 @@
 Uses the new google-genai SDK (v1.0+) for both text generation and image generation.
 """
 
-from collections.abc import Callable
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections.abc import Callable, Sequence
 from dataclasses import dataclass
-from typing import Any, cast
+from typing import TYPE_CHECKING, Any, cast
 
+import httpx
 import structlog
 from google import genai
+from google.genai import errors as genai_errors
 from google.genai import types
 
+from atlas_town.clients._convert import HistoryConverter, json_schema_to_gemini
+from atlas_town.clients._tokens import estimate_tokens
+from atlas_town.clients.cache import (
+    ResponseCache,
+    get_response_cache,
+    make_cache_key,
+    text_digest,
+)
 from atlas_town.config import get_settings
 
+if TYPE_CHECKING:
+    from atlas_town.clients.claude import ToolUseCallback
+
 logger = structlog.get_logger(__name__)
 
 
+def _build_http_client() -> httpx.AsyncClient:
+    """Build the pooled transport used when no http_client is injected."""
+    settings = get_settings()
+    return httpx.AsyncClient(
+        http2=settings.llm_http2,
+        limits=httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+            keepalive_expiry=settings.llm_keepalive_expiry,
+        ),
+    )
+
+
+# Gemini finish reason -> our stop_reason
+_STOP_REASONS = {
+    "STOP": "end_turn",
+    "MAX_TOKENS": "max_tokens",
+    "SAFETY": "content_filter",
+    "RECITATION": "content_filter",
+    "OTHER": "tool_use",
+}
+
+
+def _user_content(msg: dict[str, Any]) -> types.Content:
+    return types.Content(role="user", parts=[types.Part(text=msg["content"])])
+
+
+def _model_content(msg: dict[str, Any]) -> types.Content:
+    content = msg.get("content")
+    parts = [types.Part(text=content)] if content else []
+    parts.extend(
+        types.Part(
+            function_call=types.FunctionCall(
+                name=tool_call["name"], args=tool_call["arguments"]
+            )
+        )
+        for tool_call in msg.get("tool_calls", ())
+    )
+    return types.Content(role="model", parts=parts)
+
+
+def _function_response_content(msg: dict[str, Any]) -> types.Content:
+    return types.Content(
+        role="user",
+        parts=[
+            types.Part(
+                function_response=types.FunctionResponse(
+                    name=msg.get("tool_name", "function"),
+                    response={"result": msg["content"]},
+                )
+            )
+        ],
+    )
+
+
+# Neutral role -> Gemini content; unknown roles are dropped
+_MESSAGE_CONVERTERS: dict[str, Callable[[dict[str, Any]], types.Content]] = {
+    "user": _user_content,
+    "assistant": _model_content,
+    "tool_result": _function_response_content,
+}
+
+
+def _extend_contents(contents: list[types.Content], messages: Sequence[dict[str, Any]]) -> None:
+    converters = _MESSAGE_CONVERTERS
+    contents.extend(
+        converters[msg["role"]](msg) for msg in messages if msg["role"] in converters
+    )
+
+
 @dataclass
 class GeminiResponse:
     """Response from Gemini API."""
@@ -33,65 +121,61 @@ class GeminiClient:
     both Gemini text models and Imagen/Nano Banana image models.
     """
 
+    # generate() accepts on_tool_use and reports tool calls while streaming
+    streams_tool_calls = True
+
     def __init__(
         self,
         api_key: str | None = None,
         model: str | None = None,
         max_tokens: int | None = None,
         temperature: float | None = None,
+        http_client: httpx.AsyncClient | None = None,
+        response_cache: ResponseCache[GeminiResponse] | None = None,
     ):
         settings = get_settings()
         self._api_key = api_key or settings.google_api_key.get_secret_value()
         self._model_name = model or settings.gemini_model
         self._max_tokens = max_tokens or settings.llm_max_tokens
         self._temperature = temperature or settings.llm_temperature
+        # id(tools) -> (tools, converted); holding tools keeps the id valid
+        self._prepared_tools: dict[int, tuple[Sequence[dict[str, Any]], list[types.Tool]]] = {}
+        self._history = HistoryConverter(_extend_contents)
+        self._context_cache_ttl = settings.gemini_context_cache_ttl
+        # (system prompt, id(tools)) -> (expires_at, task resolving to the
+        # cache name, or None when the prefix can't be cached)
+        self._context_caches: dict[
+            tuple[str, int], tuple[float, asyncio.Task[str | None]]
+        ] = {}
+        # Exact token counts by text digest; they never go stale
+        self._token_counts: ResponseCache[int] = ResponseCache(ttl=math.inf)
+        self._response_cache = (
+            response_cache if response_cache is not None else get_response_cache()
+        )
 
-        # Initialize the new SDK client
-        self._client = genai.Client(api_key=self._api_key)
+        # Initialize the new SDK client; passing our own httpx client pins the
+        # async path to httpx (not aiohttp) and sizes its connection pool
+        if http_client is None:
+            http_client = _build_http_client()
+        self._client = genai.Client(
+            api_key=self._api_key,
+            http_options=types.HttpOptions(
+                httpx_async_client=http_client,
+                # The SDK doesn't retry unless asked; 429/5xx back off with jitter
+                retry_options=types.HttpRetryOptions(
+                    attempts=settings.llm_max_retries + 1, initial_delay=0.5, max_delay=8.0
+                ),
+            ),
+        )
 
         self._logger = logger.bind(client="gemini", model=self._model_name)
 
     def _convert_json_schema_to_gemini(self, schema: dict[str, Any]) -> dict[str, Any]:
-        """Convert JSON Schema to Gemini's schema format.
-
-        Gemini uses a subset of OpenAPI schema format.
-        """
-        gemini_schema: dict[str, Any] = {}
-
-        if "type" in schema:
-            # Map JSON Schema types to Gemini types
-            type_map = {
-                "string": "STRING",
-                "integer": "INTEGER",
-                "number": "NUMBER",
-                "boolean": "BOOLEAN",
-                "array": "ARRAY",
-                "object": "OBJECT",
-            }
-            gemini_schema["type"] = type_map.get(schema["type"], "STRING")
-
-        if "description" in schema:
-            gemini_schema["description"] = schema["description"]
-
-        if "enum" in schema:
-            gemini_schema["enum"] = schema["enum"]
-
-        if "properties" in schema:
-            gemini_schema["properties"] = {
-                k: self._convert_json_schema_to_gemini(v)
-                for k, v in schema["properties"].items()
-            }
-
-        if "required" in schema:
-            gemini_schema["required"] = schema["required"]
-
-        if "items" in schema:
-            gemini_schema["items"] = self._convert_json_schema_to_gemini(schema["items"])
-
-        return gemini_schema
+        """Convert JSON Schema to Gemini's schema format."""
+        return json_schema_to_gemini(schema)
 
     def _convert_tools_to_gemini_format(
-        self, tools: list[dict[str, Any]]
+        self, tools: Sequence[dict[str, Any]]
     ) -> list[types.Tool]:
         """Convert our tool format to Gemini's expected format."""
         function_declarations = []
@@ -99,7 +183,7 @@ class GeminiClient:
         for tool in tools:
             # Convert the input schema
             parameters = types.Schema.model_validate(
-                self._convert_json_schema_to_gemini(tool["input_schema"])
+                json_schema_to_gemini(tool["input_schema"])
             )
 
             func_decl = types.FunctionDeclaration(
@@ -111,71 +195,46 @@ class GeminiClient:
 
         return [types.Tool(function_declarations=function_declarations)]
 
+    def _prepare_tools(self, tools: Sequence[dict[str, Any]]) -> list[types.Tool]:
+        """Convert tools to Gemini format, reusing the result for frozen tools.
+
+        Schema conversion and pydantic validation are the costly part of
+        building a request. Frozen tool collections (tuples) are converted
+        once and the result reused for every subsequent request (a shared
+        client sees one per agent type).
+        """
+        memo = self._prepared_tools.get(id(tools))
+        if memo is not None and memo[0] is tools:
+            return memo[1]
+
+        gemini_tools = self._convert_tools_to_gemini_format(tools)
+        if isinstance(tools, tuple):
+            self._prepared_tools[id(tools)] = (tools, gemini_tools)
+        return gemini_tools
+
     def _convert_messages_to_gemini_format(
         self, messages: list[dict[str, Any]]
     ) -> list[types.Content]:
         """Convert conversation history to Gemini's content format."""
-        gemini_contents = []
-
-        for msg in messages:
-            if msg["role"] == "user":
-                gemini_contents.append(
-                    types.Content(
-                        role="user",
-                        parts=[types.Part(text=msg["content"])],
-                    )
-                )
-            elif msg["role"] == "assistant":
-                parts = []
-
-                # Add text content if present
-                if msg.get("content"):
-                    parts.append(types.Part(text=msg["content"]))
-
-                # Add function calls if present
-                for tool_call in msg.get("tool_calls", []):
-                    parts.append(
-                        types.Part(
-                            function_call=types.FunctionCall(
-                                name=tool_call["name"],
-                                args=tool_call["arguments"],
-                            )
-                        )
-                    )
-
-                gemini_contents.append(
-                    types.Content(role="model", parts=parts)
-                )
-            elif msg["role"] == "tool_result":
-                gemini_contents.append(
-                    types.Content(
-                        role="user",
-                        parts=[
-                            types.Part(
-                                function_response=types.FunctionResponse(
-                                    name=msg.get("tool_name", "function"),
-                                    response={"result": msg["content"]},
-                                )
-                            )
-                        ],
-                    )
-                )
-
-        return gemini_contents
+        contents: list[types.Content] = []
+        _extend_contents(contents, messages)
+        return contents
 
-    def _parse_response(self, response: Any) -> GeminiResponse:
+    def _parse_response(self, response: types.GenerateContentResponse) -> GeminiResponse:
         """Parse Gemini response into our format."""
-        content = ""
+        text_parts: list[str] = []
         tool_calls: list[dict[str, Any]] = []
+        stop_reason = "end_turn"
 
         # Get the first candidate's content
         if response.candidates:
             candidate = response.candidates[0]
+            parts = candidate.content.parts if candidate.content else None
 
-            for part in candidate.content.parts:
-                if hasattr(part, "text") and part.text:
-                    content = part.text
-                elif hasattr(part, "function_call") and part.function_call:
+            for part in parts or ():
+                if part.text:
+                    text_parts.append(part.text)
+                elif part.function_call:
                     fc = part.function_call
                     tool_calls.append({
                         "id": f"call_{fc.name}_{len(tool_calls)}",
@@ -183,44 +242,76 @@ class GeminiClient:
                         "arguments": dict(fc.args) if fc.args else {},
                     })
 
-            # Map finish reasons
-            finish_reason = candidate.finish_reason
-            # New SDK uses string enums
-            stop_reason_map = {
-                "STOP": "end_turn",
-                "MAX_TOKENS": "max_tokens",
-                "SAFETY": "content_filter",
-                "RECITATION": "content_filter",
-                "OTHER": "tool_use",
-            }
-            stop_reason = stop_reason_map.get(str(finish_reason), "end_turn")
-
-            # If we have tool calls, override stop reason
             if tool_calls:
                 stop_reason = "tool_use"
+            elif candidate.finish_reason is not None:
+                stop_reason = _STOP_REASONS.get(candidate.finish_reason.value, "end_turn")
 
         # Get usage metadata if available
-        usage = {"input_tokens": 0, "output_tokens": 0}
-        if hasattr(response, "usage_metadata") and response.usage_metadata:
-            usage["input_tokens"] = (
-                getattr(response.usage_metadata, "prompt_token_count", 0) or 0
-            )
-            usage["output_tokens"] = (
-                getattr(response.usage_metadata, "candidates_token_count", 0) or 0
-            )
+        usage = {"input_tokens": 0, "output_tokens": 0, "cache_read_input_tokens": 0}
+        metadata = response.usage_metadata
+        if metadata:
+            usage["input_tokens"] = metadata.prompt_token_count or 0
+            usage["output_tokens"] = metadata.candidates_token_count or 0
+            # Prompt tokens served from Gemini's implicit context cache
+            usage["cache_read_input_tokens"] = metadata.cached_content_token_count or 0
 
         return GeminiResponse(
-            content=content,
+            content="".join(text_parts),
             tool_calls=tool_calls,
             stop_reason=stop_reason,
             usage=usage,
         )
 
+    async def _cached_content(
+        self, system_prompt: str, tools: Sequence[dict[str, Any]] | None
+    ) -> str | None:
+        """Return the name of a context cache holding this prompt and tools.
+
+        The system prompt and tool schema are the same on every turn of an
+        agent, so with GEMINI_CONTEXT_CACHE_TTL set they are uploaded once
+        and later requests reference them (billed at the cached rate). Only
+        frozen tool tuples are cached, since they are keyed by identity.
+        Concurrent first requests share one creation; the cache is renewed
+        shortly before it expires.
+        """
+        if self._context_cache_ttl <= 0 or (tools is not None and not isinstance(tools, tuple)):
+            return None
+        key = (system_prompt, id(tools))
+        now = time.monotonic()
+        entry = self._context_caches.get(key)
+        if entry is None or entry[0] <= now:
+            task = asyncio.ensure_future(self._create_context_cache(system_prompt, tools))
+            # Renew a minute early so no request references an expired cache
+            expires_at = now + max(self._context_cache_ttl - 60, self._context_cache_ttl / 2)
+            entry = (expires_at, task)
+            self._context_caches[key] = entry
+        return await asyncio.shield(entry[1])
+
+    async def _create_context_cache(
+        self, system_prompt: str, tools: Sequence[dict[str, Any]] | None
+    ) -> str | None:
+        config = types.CreateCachedContentConfig(
+            system_instruction=system_prompt, ttl=f"{self._context_cache_ttl}s"
+        )
+        if tools:
+            config.tools = self._prepare_tools(tools)
+        try:
+            cache = await self._client.aio.caches.create(model=self._model_name, config=config)
+        except Exception as e:
+            # e.g. the prefix is below the model's minimum cacheable size
+            self._logger.warning("context_cache_unavailable", error=str(e))
+            return None
+        self._logger.info("context_cache_created", cache=cache.name)
+        return cache.name
+
     async def generate(
         self,
         system_prompt: str,
         messages: list[dict[str, Any]],
-        tools: list[dict[str, Any]] | None = None,
+        tools: Sequence[dict[str, Any]] | None = None,
+        on_tool_use: ToolUseCallback | None = None,
+        cache_key_extra: str | None = None,
     ) -> GeminiResponse:
         """Generate a response from Gemini.
 
@@ -228,6 +319,11 @@ class GeminiClient:
             system_prompt: The system prompt defining agent behavior.
             messages: Conversation history as list of message dicts.
             tools: Optional list of tool definitions for function calling.
+            on_tool_use: Optional callback invoked for each function call as
+                soon as its chunk is streamed, before the full response is
+                available.
+            cache_key_extra: Opts a sampled (temperature > 0) request into the
+                response cache under this namespace, e.g. a prompt version.
 
         Returns:
             GeminiResponse with content, tool calls, and usage info.
@@ -238,31 +334,107 @@ class GeminiClient:
             tool_count=len(tools) if tools else 0,
         )
 
+        if cache_key_extra is None and self._temperature != 0:
+            return await self._request(system_prompt, messages, tools, on_tool_use)
+
+        # Deterministic requests are answered from cache, and identical ones
+        # already in flight share a single API call
+        cache_key = make_cache_key(
+            self._model_name, system_prompt, messages, tools, cache_key_extra
+        )
+        parsed, fresh = await self._response_cache.get_or_fetch(
+            cache_key,
+            lambda: self._request(system_prompt, messages, tools, on_tool_use),
+        )
+        if not fresh and on_tool_use is not None:
+            for call in parsed.tool_calls:
+                on_tool_use(call["name"], call["arguments"])
+        return parsed
+
+    async def _stream_content(
+        self,
+        contents: list[Any],
+        config: types.GenerateContentConfig,
+        on_tool_use: ToolUseCallback,
+    ) -> types.GenerateContentResponse:
+        """Stream a response, reporting each function call as it arrives.
+
+        Gemini sends every function call whole within one chunk. The chunks
+        are folded back into a single response (text joined, calls in order,
+        finish reason and usage from the last chunk) for _parse_response.
+        """
+        text: list[str] = []
+        calls: list[types.Part] = []
+        last: types.GenerateContentResponse | None = None
+        stream = await self._client.aio.models.generate_content_stream(
+            model=self._model_name, contents=contents, config=config
+        )
+        async for chunk in stream:
+            last = chunk
+            if not chunk.candidates or chunk.candidates[0].content is None:
+                continue
+            for part in chunk.candidates[0].content.parts or ():
+                if part.function_call:
+                    calls.append(part)
+                    fc = part.function_call
+                    on_tool_use(fc.name or "", dict(fc.args) if fc.args else {})
+                elif part.text:
+                    text.append(part.text)
+
+        parts = [types.Part(text="".join(text))] if text else []
+        parts.extend(calls)
+        finish_reason = None
+        if last is not None and last.candidates:
+            finish_reason = last.candidates[0].finish_reason
+        return types.GenerateContentResponse(
+            candidates=[
+                types.Candidate(
+                    content=types.Content(role="model", parts=parts),
+                    finish_reason=finish_reason,
+                )
+            ],
+            usage_metadata=last.usage_metadata if last is not None else None,
+        )
+
+    async def _request(
+        self,
+        system_prompt: str,
+        messages: list[dict[str, Any]],
+        tools: Sequence[dict[str, Any]] | None,
+        on_tool_use: ToolUseCallback | None,
+    ) -> GeminiResponse:
+        """Send one request to the API and parse the response."""
         # Build configuration
         config = types.GenerateContentConfig(
             max_output_tokens=self._max_tokens,
             temperature=self._temperature,
-            system_instruction=system_prompt,
         )
 
-        # Add tools if provided
-        if tools:
-            config.tools = cast(
-                list[types.Tool | Callable[..., Any]],
-                self._convert_tools_to_gemini_format(tools),
-            )
+        # The prompt and tools travel either by cache reference or inline
+        cached_content = await self._cached_content(system_prompt, tools)
+        if cached_content is not None:
+            config.cached_content = cached_content
+        else:
+            config.system_instruction = system_prompt
+            if tools:
+                config.tools = cast(
+                    list[types.Tool | Callable[..., Any]], self._prepare_tools(tools)
+                )
 
         # Convert messages to Gemini format
-        gemini_contents = self._convert_messages_to_gemini_format(messages)
+        gemini_contents = await self._history.convert(messages)
         contents_payload = cast(list[Any], gemini_contents)
 
         try:
-            # Generate response using new SDK
-            response = self._client.models.generate_content(
-                model=self._model_name,
-                contents=contents_payload,
-                config=config,
-            )
+            # The aio surface awaits the request instead of blocking the event loop
+            if on_tool_use is not None:
+                response = await self._stream_content(contents_payload, config, on_tool_use)
+            else:
+                response = await self._client.aio.models.generate_content(
+                    model=self._model_name,
+                    contents=contents_payload,
+                    config=config,
+                )
 
             parsed = self._parse_response(response)
 
@@ -272,6 +444,7 @@ class GeminiClient:
                 tool_calls=len(parsed.tool_calls),
                 input_tokens=parsed.usage["input_tokens"],
                 output_tokens=parsed.usage["output_tokens"],
+                cache_read_tokens=parsed.usage["cache_read_input_tokens"],
             )
 
             return parsed
@@ -280,10 +453,45 @@ class GeminiClient:
             self._logger.error("api_error", error=str(e))
             raise
 
+    @staticmethod
+    def is_transient_error(error: BaseException) -> bool:
+        """Whether ``error`` is worth retrying elsewhere (rate limit or outage)."""
+        if isinstance(error, genai_errors.ServerError | httpx.TransportError):
+            return True
+        return isinstance(error, genai_errors.ClientError) and error.code in (408, 429)
+
+    async def warmup(self) -> None:
+        """Open a pooled connection to the API ahead of the first request.
+
+        Lists a single model, which is free and goes through the same client
+        as generate(). Failures are logged rather than raised.
+        """
+        try:
+            await self._client.aio.models.list(config={"page_size": 1})
+            self._logger.info("connection_warmed")
+        except Exception as e:
+            self._logger.warning("connection_warmup_failed", error=str(e))
+
     def count_tokens(self, text: str) -> int:
         """Estimate token count for text.
 
-        Note: This is an approximation.
+        Note: This is an approximation. For exact counts, use
+        count_tokens_exact().
         """
-        # Rough approximation: ~4 characters per token
-        return len(text) // 4
+        return estimate_tokens(text)
+
+    async def count_tokens_exact(self, text: str) -> int:
+        """Count the tokens of ``text`` using the API.
+
+        Results are cached by content, so repeated budget checks on the same
+        prompt cost one request.
+        """
+
+        async def fetch() -> int:
+            result = await self._client.aio.models.count_tokens(
+                model=self._model_name, contents=text
+            )
+            return result.total_tokens or 0
+
+        count, _ = await self._token_counts.get_or_fetch(text_digest(text), fetch)
+        return count
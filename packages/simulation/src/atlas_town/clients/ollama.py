@@ -1,18 +1,83 @@
 """Ollama LLM client with function calling support for local models."""
 
+from __future__ import annotations
+
+import asyncio
+import contextlib
 import json
+from collections.abc import Sequence
 from dataclasses import dataclass
-from typing import Any
+from functools import partial
+from typing import TYPE_CHECKING, Any
 
 import httpx
 import structlog
 
+from atlas_town.clients._convert import (
+    HistoryConverter,
+    extend_openai_messages,
+    to_openai_messages,
+    to_openai_tools,
+)
+from atlas_town.clients._json import dumps, loads
+from atlas_town.clients._tokens import estimate_tokens
+from atlas_town.clients.cache import ResponseCache, get_response_cache, make_cache_key
 from atlas_town.config import get_settings
 
+if TYPE_CHECKING:
+    from atlas_town.clients.claude import ToolUseCallback
+
 logger = structlog.get_logger(__name__)
 
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Ollama done_reason -> our stop_reason, when the turn has no tool calls
+_STOP_REASONS = {
+    "stop": "end_turn",
+    "length": "max_tokens",
+}
+
+
+def _build_http_client() -> httpx.AsyncClient:
+    """Build the pooled transport used when no http_client is injected.
+
+    Local generation can take minutes, but a server that isn't running should
+    fail fast, hence the short connect timeout.
+    """
+    settings = get_settings()
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(120.0, connect=5.0),
+        http2=settings.llm_http2,
+        limits=httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+            keepalive_expiry=settings.llm_keepalive_expiry,
+        ),
+    )
+
+
+def _tool_arguments(function: dict[str, Any]) -> Any:
+    """Return a tool call's arguments, which may arrive as a dict or JSON string."""
+    arguments = function.get("arguments", {})
+    if isinstance(arguments, str):
+        try:
+            return loads(arguments)
+        except json.JSONDecodeError:
+            return {}
+    return arguments
+
+
+def _parse_tool_call(tc: dict[str, Any], index: int) -> dict[str, Any]:
+    """Convert one Ollama tool call, numbering it if the server gave no id."""
+    func = tc.get("function", {})
+    return {
+        "id": tc.get("id") or f"call_{index}",
+        "name": func.get("name", ""),
+        "arguments": _tool_arguments(func),
+    }
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class OllamaResponse:
     """Response from Ollama API."""
 
@@ -30,132 +95,103 @@ class OllamaClient:
     for cloud APIs.
     """
 
+    # generate() accepts on_tool_use and reports tool calls while streaming
+    streams_tool_calls = True
+
     def __init__(
         self,
         base_url: str | None = None,
         model: str | None = None,
         max_tokens: int | None = None,
         temperature: float | None = None,
+        keep_alive: str = "30m",
+        http_client: httpx.AsyncClient | None = None,
+        max_parallel: int | None = None,
+        response_cache: ResponseCache[OllamaResponse] | None = None,
     ):
         settings = get_settings()
         self._base_url = (base_url or settings.ollama_base_url).rstrip("/")
         self._model = model or settings.ollama_model
         self._max_tokens = max_tokens or settings.llm_max_tokens
         self._temperature = temperature or settings.llm_temperature
+        # Keep the model (and its cached prompt prefix) loaded between calls
+        self._keep_alive = keep_alive
+        self._response_cache = (
+            response_cache if response_cache is not None else get_response_cache()
+        )
+        # Ollama batches up to OLLAMA_NUM_PARALLEL requests and queues the
+        # rest; holding the excess here keeps queued time out of the read
+        # timeout and lets one burst of agent turns fill every server slot
+        if max_parallel is None:
+            max_parallel = settings.ollama_num_parallel
+        self._slots: contextlib.AbstractAsyncContextManager[Any] = (
+            asyncio.Semaphore(max_parallel) if max_parallel > 0 else contextlib.nullcontext()
+        )
 
-        self._client = httpx.AsyncClient(timeout=120.0)  # Local models can be slow
+        # Local models can be slow, hence the long default timeout
+        self._client = http_client or _build_http_client()
         self._logger = logger.bind(client="ollama", model=self._model)
+        self._history = HistoryConverter(
+            partial(
+                extend_openai_messages,
+                # Ollama wants argument dicts and always-present content
+                arguments_as_json=False,
+                require_content=True,
+            )
+        )
+        # id(tools) -> (tools, converted); holding tools keeps the id valid
+        self._prepared_tools: dict[
+            int, tuple[Sequence[dict[str, Any]], list[dict[str, Any]]]
+        ] = {}
 
     def _convert_tools_to_ollama_format(
-        self, tools: list[dict[str, Any]]
+        self, tools: Sequence[dict[str, Any]]
     ) -> list[dict[str, Any]]:
-        """Convert our tool format to Ollama's expected format.
-
-        Ollama uses OpenAI-compatible tool format:
-        {
-            "type": "function",
-            "function": {
-                "name": "...",
-                "description": "...",
-                "parameters": {...}  # JSON Schema
-            }
-        }
+        """Convert our tool format to OpenAI-compatible function format."""
+        return to_openai_tools(tools)
+
+    def _prepare_tools(self, tools: Sequence[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Convert tools to Ollama format, memoizing frozen collections.
+
+        Tuples are converted once and the result reused for every subsequent
+        request (a shared client sees one per agent type); lists may change
+        in place, so they are converted afresh.
         """
-        ollama_tools = []
-        for tool in tools:
-            ollama_tools.append({
-                "type": "function",
-                "function": {
-                    "name": tool["name"],
-                    "description": tool["description"],
-                    "parameters": tool["input_schema"],
-                },
-            })
-        return ollama_tools
+        memo = self._prepared_tools.get(id(tools))
+        if memo is not None and memo[0] is tools:
+            return memo[1]
+
+        converted = self._convert_tools_to_ollama_format(tools)
+        if isinstance(tools, tuple):
+            self._prepared_tools[id(tools)] = (tools, converted)
+        return converted
 
     def _convert_messages_to_ollama_format(
         self, system_prompt: str, messages: list[dict[str, Any]]
     ) -> list[dict[str, Any]]:
         """Convert conversation history to Ollama's message format."""
-        ollama_messages = [{"role": "system", "content": system_prompt}]
-
-        for msg in messages:
-            if msg["role"] == "user":
-                ollama_messages.append({
-                    "role": "user",
-                    "content": msg["content"],
-                })
-            elif msg["role"] == "assistant":
-                assistant_msg: dict[str, Any] = {
-                    "role": "assistant",
-                    # Ollama requires content to always be present
-                    "content": msg.get("content") or "",
-                }
-
-                # Add tool calls if present
-                if msg.get("tool_calls"):
-                    assistant_msg["tool_calls"] = [
-                        {
-                            "id": tc["id"],
-                            "type": "function",
-                            "function": {
-                                "name": tc["name"],
-                                # Ollama expects arguments as a dict, not JSON string
-                                "arguments": (
-                                    tc["arguments"]
-                                    if isinstance(tc["arguments"], dict)
-                                    else json.loads(tc["arguments"])
-                                ),
-                            },
-                        }
-                        for tc in msg["tool_calls"]
-                    ]
-
-                ollama_messages.append(assistant_msg)
-            elif msg["role"] == "tool_result":
-                ollama_messages.append({
-                    "role": "tool",
-                    "tool_call_id": msg["tool_call_id"],
-                    "content": msg["content"],
-                })
-
-        return ollama_messages
+        return to_openai_messages(
+            system_prompt,
+            messages,
+            # Ollama wants argument dicts and always-present content
+            arguments_as_json=False,
+            require_content=True,
+        )
 
     def _parse_response(self, response_data: dict[str, Any]) -> OllamaResponse:
         """Parse Ollama response into our format."""
         message = response_data.get("message", {})
         content = message.get("content", "")
-        tool_calls: list[dict[str, Any]] = []
-
-        # Parse tool calls if present
-        if message.get("tool_calls"):
-            for tc in message["tool_calls"]:
-                func = tc.get("function", {})
-                arguments = func.get("arguments", {})
-
-                # Arguments might be a string or dict
-                if isinstance(arguments, str):
-                    try:
-                        arguments = json.loads(arguments)
-                    except json.JSONDecodeError:
-                        arguments = {}
-
-                tool_calls.append({
-                    "id": tc.get("id", f"call_{len(tool_calls)}"),
-                    "name": func.get("name", ""),
-                    "arguments": arguments,
-                })
+        # Parse tool calls if present; Ollama often omits the call id
+        tool_calls = [
+            _parse_tool_call(tc, i) for i, tc in enumerate(message.get("tool_calls") or ())
+        ]
 
         # Determine stop reason
-        done_reason = response_data.get("done_reason", "")
         if tool_calls:
             stop_reason = "tool_use"
-        elif done_reason == "stop":
-            stop_reason = "end_turn"
-        elif done_reason == "length":
-            stop_reason = "max_tokens"
         else:
-            stop_reason = "end_turn"
+            stop_reason = _STOP_REASONS.get(response_data.get("done_reason", ""), "end_turn")
 
         # Extract usage from response
         usage = {
@@ -170,11 +206,52 @@ class OllamaClient:
             usage=usage,
         )
 
+    async def _stream_chat(self, body: bytes, on_tool_use: ToolUseCallback) -> dict[str, Any]:
+        """Stream a chat response, reporting each tool call as it arrives.
+
+        Ollama streams NDJSON: content deltas, tool calls whole within a
+        chunk, then a ``done`` line carrying the stop reason and token
+        counts. The lines are folded back into the non-streamed response
+        shape for _parse_response.
+        """
+        content: list[str] = []
+        tool_calls: list[dict[str, Any]] = []
+        final: dict[str, Any] = {}
+        async with self._client.stream(
+            "POST", f"{self._base_url}/api/chat", content=body, headers=_JSON_HEADERS
+        ) as response:
+            if response.is_error:
+                # Read the body so the error handler can log it
+                await response.aread()
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                chunk = loads(line)
+                if "error" in chunk:
+                    raise httpx.RemoteProtocolError(
+                        f"Ollama aborted the stream: {chunk['error']}", request=response.request
+                    )
+                message = chunk.get("message") or {}
+                if message.get("content"):
+                    content.append(message["content"])
+                for tc in message.get("tool_calls") or ():
+                    tool_calls.append(tc)
+                    func = tc.get("function", {})
+                    on_tool_use(func.get("name", ""), _tool_arguments(func))
+                if chunk.get("done"):
+                    final = chunk
+                    break
+        message = {"role": "assistant", "content": "".join(content), "tool_calls": tool_calls}
+        return {**final, "message": message}
+
     async def generate(
         self,
         system_prompt: str,
         messages: list[dict[str, Any]],
-        tools: list[dict[str, Any]] | None = None,
+        tools: Sequence[dict[str, Any]] | None = None,
+        on_tool_use: ToolUseCallback | None = None,
+        cache_key_extra: str | None = None,
     ) -> OllamaResponse:
         """Generate a response from the local Ollama model.
 
@@ -182,6 +259,10 @@ class OllamaClient:
             system_prompt: The system prompt defining agent behavior.
             messages: Conversation history as list of message dicts.
             tools: Optional list of tool definitions for function calling.
+            on_tool_use: Optional callback invoked for each tool call as soon
+                as it is streamed, before the response completes.
+            cache_key_extra: Opts a sampled (temperature > 0) request into the
+                response cache under this namespace, e.g. a prompt version.
 
         Returns:
             OllamaResponse with content, tool calls, and usage info.
@@ -192,14 +273,44 @@ class OllamaClient:
             tool_count=len(tools) if tools else 0,
         )
 
+        if cache_key_extra is None and self._temperature != 0:
+            return await self._request(system_prompt, messages, tools, on_tool_use)
+
+        # Deterministic requests are answered from cache, and identical ones
+        # already in flight share a single request
+        cache_key = make_cache_key(
+            f"{self._base_url}:{self._model}", system_prompt, messages, tools, cache_key_extra
+        )
+        parsed, fresh = await self._response_cache.get_or_fetch(
+            cache_key,
+            lambda: self._request(system_prompt, messages, tools, on_tool_use),
+        )
+        if not fresh and on_tool_use is not None:
+            for call in parsed.tool_calls:
+                on_tool_use(call["name"], call["arguments"])
+        return parsed
+
+    async def _request(
+        self,
+        system_prompt: str,
+        messages: list[dict[str, Any]],
+        tools: Sequence[dict[str, Any]] | None,
+        on_tool_use: ToolUseCallback | None,
+    ) -> OllamaResponse:
+        """Send one request to the server and parse the response."""
         # Convert messages to Ollama format
-        ollama_messages = self._convert_messages_to_ollama_format(system_prompt, messages)
+        ollama_messages = [
+            {"role": "system", "content": system_prompt},
+            *await self._history.convert(messages),
+        ]
 
         # Build request payload
         payload: dict[str, Any] = {
             "model": self._model,
             "messages": ollama_messages,
-            "stream": False,
+            # Streaming only pays off when tool calls can be acted on early
+            "stream": on_tool_use is not None,
+            "keep_alive": self._keep_alive,
             "options": {
                 "num_predict": self._max_tokens,
                 "temperature": self._temperature,
@@ -208,16 +319,22 @@ class OllamaClient:
 
         # Add tools if provided
         if tools:
-            payload["tools"] = self._convert_tools_to_ollama_format(tools)
+            payload["tools"] = self._prepare_tools(tools)
 
         # Make the API call
         try:
-            response = await self._client.post(
-                f"{self._base_url}/api/chat",
-                json=payload,
-            )
-            response.raise_for_status()
-            response_data = response.json()
+            # The payload carries the whole history, so encode and decode it
+            # with _json (orjson when installed) rather than httpx's stdlib json
+            body = dumps(payload).encode()
+            async with self._slots:
+                if on_tool_use is not None:
+                    response_data = await self._stream_chat(body, on_tool_use)
+                else:
+                    response = await self._client.post(
+                        f"{self._base_url}/api/chat", content=body, headers=_JSON_HEADERS
+                    )
+                    response.raise_for_status()
+                    response_data = loads(response.content)
 
             parsed = self._parse_response(response_data)
 
@@ -234,7 +351,7 @@ class OllamaClient:
         except httpx.HTTPStatusError as e:
             # Try to get error details from response body
             try:
-                error_body = e.response.json()
+                error_body = loads(e.response.content)
                 self._logger.error(
                     "api_error",
                     status=e.response.status_code,
@@ -248,6 +365,14 @@ class OllamaClient:
             self._logger.error("connection_error", error=str(e))
             raise
 
+    @staticmethod
+    def is_transient_error(error: BaseException) -> bool:
+        """Whether ``error`` is worth retrying elsewhere (overload or outage)."""
+        if isinstance(error, httpx.HTTPStatusError):
+            status = error.response.status_code
+            return status in (408, 429) or status >= 500
+        return isinstance(error, httpx.TransportError)
+
     async def close(self) -> None:
         """Close the HTTP client."""
         await self._client.aclose()
@@ -257,5 +382,4 @@ class OllamaClient:
 
         Note: This is an approximation. Local models may tokenize differently.
         """
-        # Rough approximation: ~4 characters per token for English
-        return len(text) // 4
+        return estimate_tokens(text)
@@ -1,18 +1,62 @@
 """OpenAI GPT client with function calling support."""
 
-import json
+from collections.abc import Sequence
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any
 
 import openai
 import structlog
 
+from atlas_town.clients._convert import (
+    HistoryConverter,
+    extend_openai_messages,
+    to_openai_messages,
+    to_openai_tools,
+)
+from atlas_town.clients._json import loads
+from atlas_town.clients._tokens import estimate_tokens
+from atlas_town.clients.cache import ResponseCache, get_response_cache, make_cache_key
 from atlas_town.config import get_settings
 
 logger = structlog.get_logger(__name__)
 
+# OpenAI finish reason -> our stop_reason
+_STOP_REASONS = {
+    "stop": "end_turn",
+    "tool_calls": "tool_use",
+    "length": "max_tokens",
+    "content_filter": "content_filter",
+}
 
-@dataclass
+try:  # tiktoken is optional (the "tokenizer" extra); without it counts are estimated
+    import tiktoken
+except ImportError:  # pragma: no cover - depends on the environment
+    tiktoken = None  # type: ignore[assignment, unused-ignore]
+
+
+@lru_cache
+def _encoding_for(model: str) -> Any | None:
+    """Return the tiktoken encoding for ``model``, or None if unavailable.
+
+    Loading an encoding reads (and on first use downloads) its BPE ranks,
+    so each model's encoding is built once per process.
+    """
+    if tiktoken is None:
+        return None
+    try:
+        name = tiktoken.encoding_name_for_model(model)
+    except KeyError:
+        # Unknown or newer model name: use the current GPT encoding
+        name = "o200k_base"
+    try:
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        logger.warning("tiktoken_unavailable", model=model, error=str(e))
+        return None
+
+
+@dataclass(frozen=True, slots=True)
 class OpenAIResponse:
     """Response from OpenAI API."""
 
@@ -28,6 +72,9 @@ class OpenAIClient:
     Also supports OpenAI-compatible APIs like LM Studio via custom base_url.
     """
 
+    # generate() accepts prompt_cache_key, so one client serves every agent
+    accepts_prompt_cache_key = True
+
     def __init__(
         self,
         api_key: str | None = None,
@@ -35,6 +82,8 @@ class OpenAIClient:
         model: str | None = None,
         max_tokens: int | None = None,
         temperature: float | None = None,
+        http_client: openai.DefaultAsyncHttpxClient | None = None,
+        response_cache: ResponseCache[OpenAIResponse] | None = None,
     ):
         settings = get_settings()
         self._api_key = api_key or settings.openai_api_key.get_secret_value()
@@ -42,85 +91,81 @@ class OpenAIClient:
         self._model = model or settings.gpt_model
         self._max_tokens = max_tokens or settings.llm_max_tokens
         self._temperature = temperature or settings.llm_temperature
+        # Request kwargs shared by every call; generate() adds messages and tools
+        self._request_options = self._build_request_options()
+        self._response_cache = (
+            response_cache if response_cache is not None else get_response_cache()
+        )
+        # LM Studio serves arbitrary local models, so its cache entries are
+        # namespaced by server as well as model name
+        self._cache_model = f"{self._base_url}:{self._model}" if self._base_url else self._model
 
         # Create client with optional custom base_url (for LM Studio, etc.)
-        client_kwargs: dict[str, Any] = {"api_key": self._api_key}
+        # The SDK retries 429/5xx/connection errors with jittered exponential backoff
+        client_kwargs: dict[str, Any] = {
+            "api_key": self._api_key,
+            "max_retries": settings.llm_max_retries,
+        }
         if self._base_url:
             client_kwargs["base_url"] = self._base_url
+        if http_client is not None:
+            client_kwargs["http_client"] = http_client
 
-        self._client = openai.OpenAI(**client_kwargs)
+        self._client = openai.AsyncOpenAI(**client_kwargs)
         client_name = "lm_studio" if self._base_url else "openai"
         self._logger = logger.bind(client=client_name, model=self._model)
+        self._history = HistoryConverter(extend_openai_messages)
+        # id(tools) -> (tools, converted); holding tools keeps the id valid
+        self._prepared_tools: dict[
+            int, tuple[Sequence[dict[str, Any]], list[dict[str, Any]]]
+        ] = {}
+
+    def _build_request_options(self) -> dict[str, Any]:
+        """Build the request parameters that depend only on the client's settings.
+
+        GPT-5+ models use max_completion_tokens instead of max_tokens, and
+        gpt-5-nano only supports the default temperature (1). The model is
+        fixed for the client's lifetime, so this is decided once.
+        """
+        is_gpt5_plus = self._model.startswith("gpt-5") or self._model.startswith("o3")
+        is_nano = "nano" in self._model
+        options: dict[str, Any] = {"model": self._model}
+        # Only set temperature if model supports it
+        if not is_nano:
+            options["temperature"] = self._temperature
+        if is_gpt5_plus:
+            options["max_completion_tokens"] = self._max_tokens
+        else:
+            options["max_tokens"] = self._max_tokens
+        return options
 
     def _convert_tools_to_openai_format(
-        self, tools: list[dict[str, Any]]
+        self, tools: Sequence[dict[str, Any]]
     ) -> list[dict[str, Any]]:
-        """Convert our tool format to OpenAI's expected format.
-
-        OpenAI expects:
-        {
-            "type": "function",
-            "function": {
-                "name": "...",
-                "description": "...",
-                "parameters": {...}  # JSON Schema
-            }
-        }
+        """Convert our tool format to OpenAI's function format."""
+        return to_openai_tools(tools)
+
+    def _prepare_tools(self, tools: Sequence[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Convert tools to OpenAI format, memoizing frozen collections.
+
+        Tuples are converted once and the result reused for every subsequent
+        request (a shared client sees one per agent type); lists may change
+        in place, so they are converted afresh.
         """
-        openai_tools = []
-        for tool in tools:
-            openai_tools.append({
-                "type": "function",
-                "function": {
-                    "name": tool["name"],
-                    "description": tool["description"],
-                    "parameters": tool["input_schema"],
-                },
-            })
-        return openai_tools
+        memo = self._prepared_tools.get(id(tools))
+        if memo is not None and memo[0] is tools:
+            return memo[1]
+
+        converted = self._convert_tools_to_openai_format(tools)
+        if isinstance(tools, tuple):
+            self._prepared_tools[id(tools)] = (tools, converted)
+        return converted
 
     def _convert_messages_to_openai_format(
         self, system_prompt: str, messages: list[dict[str, Any]]
     ) -> list[dict[str, Any]]:
         """Convert conversation history to OpenAI's message format."""
-        openai_messages = [{"role": "system", "content": system_prompt}]
-
-        for msg in messages:
-            if msg["role"] == "user":
-                openai_messages.append({
-                    "role": "user",
-                    "content": msg["content"],
-                })
-            elif msg["role"] == "assistant":
-                assistant_msg: dict[str, Any] = {"role": "assistant"}
-
-                # Add content if present
-                if msg.get("content"):
-                    assistant_msg["content"] = msg["content"]
-
-                # Add tool calls if present
-                if msg.get("tool_calls"):
-                    assistant_msg["tool_calls"] = [
-                        {
-                            "id": tc["id"],
-                            "type": "function",
-                            "function": {
-                                "name": tc["name"],
-                                "arguments": json.dumps(tc["arguments"]),
-                            },
-                        }
-                        for tc in msg["tool_calls"]
-                    ]
-
-                openai_messages.append(assistant_msg)
-            elif msg["role"] == "tool_result":
-                openai_messages.append({
-                    "role": "tool",
-                    "tool_call_id": msg["tool_call_id"],
-                    "content": msg["content"],
-                })
-
-        return openai_messages
+        return to_openai_messages(system_prompt, messages)
 
     def _parse_response(
         self, response: openai.types.chat.ChatCompletion
@@ -128,44 +173,38 @@ class OpenAIClient:
         """Parse OpenAI response into our format."""
         message = response.choices[0].message
         content = message.content or ""
-        tool_calls = []
-
-        if message.tool_calls:
-            for tc in message.tool_calls:
-                function = getattr(tc, "function", None)
-                if function is None:
-                    continue
-                tool_calls.append({
-                    "id": tc.id,
-                    "name": function.name,
-                    "arguments": json.loads(function.arguments),
-                })
-
-        # Map OpenAI finish reasons to our format
+        # Custom tool calls carry no function and aren't ours to dispatch
+        tool_calls = [
+            {"id": tc.id, "name": function.name, "arguments": loads(function.arguments)}
+            for tc in message.tool_calls or ()
+            if (function := getattr(tc, "function", None)) is not None
+        ]
+
         finish_reason = response.choices[0].finish_reason
-        stop_reason_map = {
-            "stop": "end_turn",
-            "tool_calls": "tool_use",
-            "length": "max_tokens",
-            "content_filter": "content_filter",
-        }
-        stop_reason = stop_reason_map.get(finish_reason or "stop", "end_turn")
+        stop_reason = _STOP_REASONS.get(finish_reason or "stop", "end_turn")
+
+        usage = {"input_tokens": 0, "output_tokens": 0, "cache_read_input_tokens": 0}
+        if response.usage:
+            usage["input_tokens"] = response.usage.prompt_tokens
+            usage["output_tokens"] = response.usage.completion_tokens
+            # Prompt tokens served from OpenAI's automatic prefix cache
+            details = response.usage.prompt_tokens_details
+            usage["cache_read_input_tokens"] = (details.cached_tokens or 0) if details else 0
 
         return OpenAIResponse(
             content=content,
             tool_calls=tool_calls,
             stop_reason=stop_reason,
-            usage={
-                "input_tokens": response.usage.prompt_tokens if response.usage else 0,
-                "output_tokens": response.usage.completion_tokens if response.usage else 0,
-            },
+            usage=usage,
         )
 
     async def generate(
         self,
         system_prompt: str,
         messages: list[dict[str, Any]],
-        tools: list[dict[str, Any]] | None = None,
+        tools: Sequence[dict[str, Any]] | None = None,
+        cache_key_extra: str | None = None,
+        prompt_cache_key: str | None = None,
     ) -> OpenAIResponse:
         """Generate a response from GPT.
 
@@ -173,6 +212,10 @@ class OpenAIClient:
             system_prompt: The system prompt defining agent behavior.
             messages: Conversation history as list of message dicts.
             tools: Optional list of tool definitions for function calling.
+            cache_key_extra: Opts a sampled (temperature > 0) request into the
+                response cache under this namespace, e.g. a prompt version.
+            prompt_cache_key: Routes requests sharing a prompt prefix to the
+                same OpenAI prompt cache, e.g. one key per agent.
 
         Returns:
             OpenAIResponse with content, tool calls, and usage info.
@@ -183,35 +226,45 @@ class OpenAIClient:
             tool_count=len(tools) if tools else 0,
         )
 
+        if cache_key_extra is None and self._temperature != 0:
+            return await self._request(system_prompt, messages, tools, prompt_cache_key)
+
+        # Deterministic requests are answered from cache, and identical ones
+        # already in flight share a single API call
+        cache_key = make_cache_key(
+            self._cache_model, system_prompt, messages, tools, cache_key_extra
+        )
+        parsed, _ = await self._response_cache.get_or_fetch(
+            cache_key, lambda: self._request(system_prompt, messages, tools, prompt_cache_key)
+        )
+        return parsed
+
+    async def _request(
+        self,
+        system_prompt: str,
+        messages: list[dict[str, Any]],
+        tools: Sequence[dict[str, Any]] | None,
+        prompt_cache_key: str | None,
+    ) -> OpenAIResponse:
+        """Send one request to the API and parse the response."""
         # Convert messages to OpenAI format
-        openai_messages = self._convert_messages_to_openai_format(system_prompt, messages)
+        openai_messages = [
+            {"role": "system", "content": system_prompt},
+            *await self._history.convert(messages),
+        ]
 
         # Build request kwargs
-        # Note: GPT-5+ models use max_completion_tokens instead of max_tokens
-        # and gpt-5-nano only supports default temperature (1)
-        is_gpt5_plus = self._model.startswith("gpt-5") or self._model.startswith("o3")
-        is_nano = "nano" in self._model
-        kwargs: dict[str, Any] = {
-            "model": self._model,
-            "messages": openai_messages,
-        }
-        # Only set temperature if model supports it
-        if not is_nano:
-            kwargs["temperature"] = self._temperature
-        # GPT-5+ uses max_completion_tokens
-        if is_gpt5_plus:
-            kwargs["max_completion_tokens"] = self._max_tokens
-        else:
-            kwargs["max_tokens"] = self._max_tokens
+        kwargs: dict[str, Any] = {**self._request_options, "messages": openai_messages}
+        if prompt_cache_key:
+            kwargs["prompt_cache_key"] = prompt_cache_key
 
         # Add tools if provided
         if tools:
-            kwargs["tools"] = self._convert_tools_to_openai_format(tools)
+            kwargs["tools"] = self._prepare_tools(tools)
             kwargs["tool_choice"] = "auto"
 
-        # Make the API call (synchronous client, but we wrap in async interface)
         try:
-            response = self._client.chat.completions.create(**kwargs)
+            response = await self._client.chat.completions.create(**kwargs)
 
             parsed = self._parse_response(response)
 
@@ -221,6 +274,7 @@ class OpenAIClient:
                 tool_calls=len(parsed.tool_calls),
                 input_tokens=parsed.usage["input_tokens"],
                 output_tokens=parsed.usage["output_tokens"],
+                cache_read_tokens=parsed.usage["cache_read_input_tokens"],
             )
 
             return parsed
@@ -229,10 +283,24 @@ class OpenAIClient:
             self._logger.error("api_error", error=str(e))
             raise
 
+    @staticmethod
+    def is_transient_error(error: BaseException) -> bool:
+        """Whether ``error`` is worth retrying elsewhere (rate limit or outage)."""
+        if isinstance(error, openai.APIStatusError):
+            return error.status_code in (408, 429) or error.status_code >= 500
+        return isinstance(error, openai.APIConnectionError)
+
+    async def close(self) -> None:
+        """Close the HTTP client."""
+        await self._client.close()
+
     def count_tokens(self, text: str) -> int:
-        """Estimate token count for text.
+        """Count tokens in text.
 
-        Note: This is an approximation. For exact counts, use tiktoken.
+        Exact when tiktoken is installed (the "tokenizer" extra) and the model
+        is an OpenAI one; otherwise an approximation.
         """
-        # Rough approximation: ~4 characters per token for English
-        return len(text) // 4
+        encoding = _encoding_for(self._model) if not self._base_url else None
+        if encoding is not None:
+            return len(encoding.encode(text, disallowed_special=()))
+        return estimate_tokens(text)
@@ -0,0 +1,145 @@
+"""Failover between LLM providers.
+
+Each client already retries transient errors itself. RouterLLMClient takes
+over once the primary gives up, replaying the same neutral-format request
+against a fallback provider so a rate-limited provider doesn't stall a tick.
+"""
+
+from collections.abc import Callable, Sequence
+from typing import Any, Protocol
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+class LLMResponse(Protocol):
+    """Fields shared by every client's response dataclass.
+
+    Read-only, so frozen response dataclasses satisfy it too.
+    """
+
+    @property
+    def content(self) -> str: ...
+
+    @property
+    def tool_calls(self) -> list[dict[str, Any]]: ...
+
+    @property
+    def stop_reason(self) -> str: ...
+
+    @property
+    def usage(self) -> dict[str, int]: ...
+
+
+class SupportsGenerate(Protocol):
+    """The part of the client interface the router relies on."""
+
+    async def generate(
+        self,
+        system_prompt: str,
+        messages: list[dict[str, Any]],
+        tools: Sequence[dict[str, Any]] | None = None,
+    ) -> LLMResponse: ...
+
+    def count_tokens(self, text: str) -> int: ...
+
+
+def _with_cache_key(
+    client: SupportsGenerate, extra: dict[str, Any], prompt_cache_key: str | None
+) -> dict[str, Any]:
+    """Add ``prompt_cache_key`` to a client's generate() kwargs if it takes one."""
+    if prompt_cache_key and getattr(client, "accepts_prompt_cache_key", False):
+        return {**extra, "prompt_cache_key": prompt_cache_key}
+    return extra
+
+
+class RouterLLMClient:
+    """Sends requests to ``primary``, falling back on transient failures.
+
+    An error is transient if the primary's ``is_transient_error`` says so
+    (rate limits, 5xx, connection failures), so a primary without one is
+    refused rather than wrapped; anything else, such as a bad
+    request, is raised as-is since the fallback would fail the same way.
+    Messages and tools are passed in the neutral format, so each client
+    converts them for its own provider.
+    """
+
+    # generate() accepts prompt_cache_key and passes it to clients that take it
+    accepts_prompt_cache_key = True
+
+    def __init__(self, primary: SupportsGenerate, fallback: SupportsGenerate):
+        is_transient: Callable[[BaseException], bool] | None = getattr(
+            primary, "is_transient_error", None
+        )
+        if is_transient is None:
+            # Without it no error would ever reach the fallback
+            raise TypeError(f"{type(primary).__name__} cannot classify transient errors")
+        self._primary = primary
+        self._fallback = fallback
+        self._is_transient = is_transient
+        self._logger = logger.bind(
+            primary=type(primary).__name__, fallback=type(fallback).__name__
+        )
+
+    @property
+    def streams_tool_calls(self) -> bool:
+        """Tool calls are reported early only if both clients can stream them."""
+        return bool(
+            getattr(self._primary, "streams_tool_calls", False)
+            and getattr(self._fallback, "streams_tool_calls", False)
+        )
+
+    async def generate(
+        self,
+        system_prompt: str,
+        messages: list[dict[str, Any]],
+        tools: Sequence[dict[str, Any]] | None = None,
+        on_tool_use: Callable[[str, dict[str, Any]], None] | None = None,
+        prompt_cache_key: str | None = None,
+    ) -> LLMResponse:
+        """Generate with the primary client, or the fallback if it is unavailable.
+
+        Args:
+            system_prompt: The system prompt defining agent behavior.
+            messages: Conversation history as list of message dicts.
+            tools: Optional list of tool definitions for function calling.
+            on_tool_use: Optional callback for each tool call; only passed
+                when streams_tool_calls is True, like for the other clients.
+                A primary that fails mid-stream may already have reported
+                some calls, so the callback must tolerate repeats.
+            prompt_cache_key: Optional prompt cache routing key, passed only
+                to clients whose ``accepts_prompt_cache_key`` is set.
+
+        Returns:
+            The response from whichever client answered.
+        """
+        extra: dict[str, Any] = {} if on_tool_use is None else {"on_tool_use": on_tool_use}
+        try:
+            return await self._primary.generate(
+                system_prompt,
+                messages,
+                tools,
+                **_with_cache_key(self._primary, extra, prompt_cache_key),
+            )
+        except Exception as e:
+            if not self._is_transient(e):
+                raise
+            self._logger.warning("llm_fallback", error=str(e))
+        return await self._fallback.generate(
+            system_prompt,
+            messages,
+            tools,
+            **_with_cache_key(self._fallback, extra, prompt_cache_key),
+        )
+
+    async def warmup(self) -> None:
+        """Warm up both clients' connections."""
+        for client in (self._primary, self._fallback):
+            warmup = getattr(client, "warmup", None)
+            if warmup is not None:
+                await warmup()
+
+    def count_tokens(self, text: str) -> int:
+        """Estimate token count with the primary client's heuristic."""
+        return self._primary.count_tokens(text)
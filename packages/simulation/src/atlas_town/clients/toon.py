@@ -0,0 +1,68 @@
+"""Compact tabular ("TOON") encoding for list-of-record payloads.
+
+JSON repeats every field name on every row, which is most of the tokens in
+a typical list_invoices or list_bank_transactions result. A table with one
+header line carries the same data in roughly half the tokens:
+
+    #toon result[2]: id|number|total
+    7f3c...|INV-0001|125.00
+    9a1e...|INV-0002|80.50
+
+Only text the model reads is encoded this way; tool_use arguments the API
+parses stay JSON.
+"""
+
+from collections.abc import Sequence
+from typing import Any
+
+from atlas_town.clients._json import dumps
+
+TOON_PREFIX = "#toon"
+
+# Appended to the system prompt of agents that receive tool results
+TOON_FORMAT_NOTE = """## Tool Result Format
+Lists of records in tool results may appear as tables: a header line
+`#toon <field>[<rows>]: a|b|c` names the columns, then each line is one record
+with values separated by `|` (an empty value means null; `\\|` is a literal
+pipe)."""
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("|", "\\|").replace("\n", "\\n")
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, str):
+        return _escape(value)
+    if isinstance(value, int | float):
+        return str(value)
+    return _escape(dumps(value))
+
+
+def encode_toon(rows: Any, label: str = "") -> str | None:
+    """Encode a list of same-shaped dicts as a TOON table.
+
+    Args:
+        rows: Candidate records.
+        label: Field name the rows came from, shown in the header.
+
+    Returns:
+        The table, or None when ``rows`` is not at least two dicts sharing
+        the same keys in the same order (the caller should fall back to JSON).
+    """
+    if not isinstance(rows, Sequence) or isinstance(rows, str) or len(rows) < 2:
+        return None
+    first = rows[0]
+    if not isinstance(first, dict) or not first:
+        return None
+    columns = tuple(first)
+    lines = [f"{TOON_PREFIX} {label}[{len(rows)}]: {'|'.join(_escape(str(c)) for c in columns)}"]
+    for row in rows:
+        if not isinstance(row, dict) or tuple(row) != columns:
+            return None
+        lines.append("|".join(_cell(value) for value in row.values()))
+    return "\n".join(lines)
@@ -6,6 +6,7 @@ from typing import Literal, cast
 
 import structlog
 
+from atlas_town.clients._json import dumps
 from atlas_town.config.settings import get_settings
 
 
@@ -33,7 +34,7 @@ def configure_logging(
     # Choose processors based on format
     renderer: structlog.types.Processor
     if log_format == "json":
-        renderer = structlog.processors.JSONRenderer()
+        renderer = structlog.processors.JSONRenderer(serializer=dumps)
     else:
         renderer = structlog.dev.ConsoleRenderer(
             colors=True,
@@ -55,7 +56,10 @@ def configure_logging(
 
     structlog.configure(
         processors=shared_processors + [renderer],
-        wrapper_class=structlog.stdlib.BoundLogger,
+        # Calls below the configured level return immediately, before any
+        # event dict is built or processor runs; filter_by_level above still
+        # honours stricter per-module stdlib levels
+        wrapper_class=structlog.make_filtering_bound_logger(getattr(logging, log_level)),
         context_class=dict,
         logger_factory=structlog.stdlib.LoggerFactory(),
         cache_logger_on_first_use=True,
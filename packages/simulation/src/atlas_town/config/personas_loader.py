@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import sys
 from datetime import date
 from decimal import Decimal
 from functools import lru_cache
@@ -427,7 +428,9 @@ def load_persona_industries() -> dict[str, str]:
         industry = data.get("industry")
         if not industry:
             continue
-        industries_by_persona[path.stem] = str(industry)
+        # Interned so lookups into the literal-keyed archetype tables
+        # (CUSTOMER_ARCHETYPES, VENDOR_ARCHETYPES) match on identity
+        industries_by_persona[path.stem] = sys.intern(str(industry))
 
     return industries_by_persona
 
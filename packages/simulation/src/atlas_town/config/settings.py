@@ -5,7 +5,7 @@ from decimal import Decimal
 from functools import lru_cache
 from typing import Literal
 
-from pydantic import Field, SecretStr
+from pydantic import Field, SecretStr, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -105,6 +105,8 @@ class FlatSettings(BaseSettings):
         env_file=".env",
         env_file_encoding="utf-8",
         extra="ignore",
+        # get_settings() hands one instance to every client in the process
+        frozen=True,
     )
 
     # Atlas API
@@ -133,6 +135,9 @@ class FlatSettings(BaseSettings):
         default="http://localhost:11434", validation_alias="OLLAMA_BASE_URL"
     )
     ollama_model: str = Field(default="qwen3:30b", validation_alias="OLLAMA_MODEL")
+    # Requests the Ollama server works on at once; match the server's own
+    # OLLAMA_NUM_PARALLEL (0 sends every request immediately)
+    ollama_num_parallel: int = Field(default=4, validation_alias="OLLAMA_NUM_PARALLEL")
 
     # LM Studio settings (OpenAI-compatible API)
     lm_studio_base_url: str = Field(
@@ -149,6 +154,38 @@ class FlatSettings(BaseSettings):
     llm_max_tokens: int = Field(default=4096, validation_alias="LLM_MAX_TOKENS")
     llm_temperature: float = Field(default=0.7, validation_alias="LLM_TEMPERATURE")
 
+    # Transient (429/5xx/connection) errors are retried with jittered
+    # exponential backoff, then optionally rerouted to a fallback provider
+    llm_max_retries: int = Field(default=4, validation_alias="LLM_MAX_RETRIES")
+    llm_fallback_provider: Literal["claude", "openai", "gemini", "ollama", "lm_studio"] | None = (
+        Field(default=None, validation_alias="LLM_FALLBACK_PROVIDER")
+    )
+
+    # HTTP connection pool shared by each cloud LLM client (HTTP/2 needs httpx[http2])
+    llm_http2: bool = Field(default=False, validation_alias="LLM_HTTP2")
+    llm_max_connections: int = Field(default=256, validation_alias="LLM_MAX_CONNECTIONS")
+    llm_max_keepalive_connections: int = Field(
+        default=64, validation_alias="LLM_MAX_KEEPALIVE_CONNECTIONS"
+    )
+    llm_keepalive_expiry: float = Field(default=30.0, validation_alias="LLM_KEEPALIVE_EXPIRY")
+
+    # Gemini explicit context cache for each (system prompt, tools) prefix;
+    # 0 disables it (implicit caching still applies)
+    gemini_context_cache_ttl: int = Field(
+        default=0, validation_alias="GEMINI_CONTEXT_CACHE_TTL"
+    )
+
+    # Response cache for deterministic (temperature 0) or explicitly keyed requests
+    llm_response_cache_size: int = Field(
+        default=10_000, validation_alias="LLM_RESPONSE_CACHE_SIZE"
+    )
+    llm_response_cache_ttl: float = Field(
+        default=3600.0, validation_alias="LLM_RESPONSE_CACHE_TTL"
+    )
+
+    # Agent tool execution
+    tool_concurrency_limit: int = Field(default=4, validation_alias="TOOL_CONCURRENCY_LIMIT")
+
     # WebSocket
     ws_host: str = Field(default="0.0.0.0", validation_alias="WS_HOST")
     ws_port: int = Field(default=8765, validation_alias="WS_PORT")
@@ -173,6 +210,12 @@ class FlatSettings(BaseSettings):
         default=date(2024, 1, 1), validation_alias="INFLATION_START_DATE"
     )
 
+    @field_validator("llm_fallback_provider", mode="before")
+    @classmethod
+    def _blank_fallback_is_none(cls, value: object) -> object:
+        """Treat an empty LLM_FALLBACK_PROVIDER as "no fallback"."""
+        return None if value == "" else value
+
 
 @lru_cache
 def get_settings() -> FlatSettings:
@@ -27,7 +27,7 @@ from datetime import date, timedelta
 from decimal import Decimal
 from enum import Enum
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 from uuid import UUID, uuid4
 
 import structlog
@@ -42,13 +42,12 @@ from atlas_town.agents import (
     CustomerAgent,
     OwnerAgent,
     VendorAgent,
-    create_all_owners,
+    create_all_owners_async,
     create_customers_for_industry,
     create_vendors_for_industry,
 )
 from atlas_town.agents.vendor import VENDOR_ARCHETYPES, VendorType
 from atlas_town.b2b import B2BCoordinator, B2BPlannedPair, build_b2b_note
-from atlas_town.clients import ClaudeClient, GeminiClient, OpenAIClient
 from atlas_town.config import get_settings
 from atlas_town.config.personas_loader import (
     load_persona_payroll_configs,
@@ -81,6 +80,9 @@ from atlas_town.transactions import (
     create_transaction_generator,
 )
 
+if TYPE_CHECKING:
+    from atlas_town.clients import ClaudeClient, GeminiClient, OpenAIClient
+
 logger = structlog.get_logger(__name__)
 
 
@@ -273,7 +275,11 @@ class Orchestrator:
 
         # Only create LLM agents if not in FAST mode
         if self._mode != SimulationMode.FAST:
-            self._create_agents()
+            await self._create_agents()
+            if self._parse_bool(os.getenv("SIM_LLM_WARMUP")):
+                await self._warm_up_llm_clients()
+                if self._accountant:
+                    await self._accountant.warmup()
         else:
             self._logger.info("skipping_agent_creation", reason="fast_mode")
 
@@ -710,7 +716,7 @@ class Orchestrator:
             return
 
         for org_id, ctx in self._organizations.items():
-            profiles = VENDOR_ARCHETYPES.get(ctx.industry, [])
+            profiles = VENDOR_ARCHETYPES.get(ctx.industry, ())
             vendor_names = [
                 profile.name
                 for profile in profiles
@@ -733,7 +739,7 @@ class Orchestrator:
             for vendor_name in vendor_names:
                 await self._ensure_vendor_present(vendors, vendor_name)
 
-    def _create_agents(self) -> None:
+    async def _create_agents(self) -> None:
         """Create all agent instances."""
         # Create accountant (Sarah)
         self._accountant = AccountantAgent()
@@ -741,7 +747,7 @@ class Orchestrator:
             self._accountant.set_tool_executor(self._tool_executor)
 
         # Create owners for each organization
-        self._owners = create_all_owners(self._org_by_owner)
+        self._owners = await create_all_owners_async(self._org_by_owner)
 
         # Assign owners to organizations and create customers/vendors
         for _org_id, ctx in self._organizations.items():
@@ -759,6 +765,22 @@ class Orchestrator:
             owners=list(self._owners.keys()),
         )
 
+    async def _warm_up_llm_clients(self) -> None:
+        """Open connections for every shared LLM client the agents use."""
+        agents: list[Any] = [self._accountant, *self._owners.values()]
+        clients = {
+            id(client): client
+            for agent in agents
+            if agent is not None
+            and (client := getattr(agent, "_llm_client", None)) is not None
+        }
+        warmups = [
+            warmup()
+            for client in clients.values()
+            if (warmup := getattr(client, "warmup", None)) is not None
+        ]
+        await asyncio.gather(*warmups)
+
     def _register_phase_handlers(self) -> None:
         """Register handlers for each simulation phase."""
         self._scheduler.register_phase_handler(
@@ -1017,7 +1039,7 @@ class Orchestrator:
         multiplier = float(self._inflation.annual_increase_multiplier())
 
         for org_id, ctx in self._organizations.items():
-            profiles = VENDOR_ARCHETYPES.get(ctx.industry, [])
+            profiles = VENDOR_ARCHETYPES.get(ctx.industry, ())
             if not profiles:
                 continue
 
@@ -1034,9 +1056,7 @@ class Orchestrator:
                 if agent is not None:
                     agent_id = agent.id
                     agent_name = agent.name
-                    agent.profile.typical_amount = round(
-                        agent.profile.typical_amount * multiplier, 2
-                    )
+                    agent.apply_price_increase(multiplier)
                 else:
                     agent_id = UUID(int=0)
                     agent_name = profile.name
@@ -2183,7 +2203,7 @@ class Orchestrator:
         if await self._b2b_pair_already_recorded(pair.pair_id):
             self._b2b_pairs_created.add(pair.pair_id)
             if self._b2b_coordinator:
-                self._b2b_coordinator.mark_pair_seen(pair.pair_id)
+                self._b2b_coordinator.mark_pair_seen(pair.pair_id, sim_date)
             return False
 
         seller_customers = customers_by_key.get(pair.seller_key, [])
@@ -2221,7 +2241,7 @@ class Orchestrator:
         if await self._b2b_pair_already_recorded(pair.pair_id):
             self._b2b_pairs_created.add(pair.pair_id)
             if self._b2b_coordinator:
-                self._b2b_coordinator.mark_pair_seen(pair.pair_id)
+                self._b2b_coordinator.mark_pair_seen(pair.pair_id, sim_date)
             return False
 
         buyer_vendors = vendors_by_key.get(pair.buyer_key, [])
@@ -2308,7 +2328,7 @@ class Orchestrator:
 
         self._b2b_pairs_created.add(pair.pair_id)
         if self._b2b_coordinator:
-            self._b2b_coordinator.mark_pair_seen(pair.pair_id)
+            self._b2b_coordinator.mark_pair_seen(pair.pair_id, sim_date)
         return True
 
     async def _generate_international_invoices(
@@ -2511,6 +2531,7 @@ class Orchestrator:
             customers_by_key[owner_key] = await self._api_client.list_customers()
             vendors_by_key[owner_key] = await self._api_client.list_vendors()
 
+        self._b2b_coordinator.prune_seen_before(sim_date)
         planned_pairs = self._b2b_coordinator.plan_pairs(sim_date, customers_by_key)
         results: list[dict[str, Any]] = []
 
@@ -3,6 +3,7 @@
 import asyncio
 import csv
 import io
+from collections.abc import Callable
 from datetime import UTC, date, datetime, timedelta
 from decimal import Decimal, InvalidOperation
 from typing import Any, cast
@@ -67,6 +68,8 @@ class AtlasAPIClient:
         self._current_org_id: UUID | None = None
         self._current_company_id: UUID | None = None
         self._organizations: list[dict[str, Any]] = []
+        # Called with the organization after each request that may change data
+        self._write_listeners: list[Callable[[UUID | None], None]] = []
 
         self._client: httpx.AsyncClient | None = None
         self._lock = asyncio.Lock()
@@ -216,6 +219,19 @@ class AtlasAPIClient:
         logger.info("switched_organization", org_id=str(org_id))
         return data
 
+    def add_write_listener(self, listener: Callable[[UUID | None], None]) -> None:
+        """Register ``listener`` to be called after every mutating request.
+
+        It receives the organization the request was made in, and is called
+        whether or not the request succeeded, since a failed write may still
+        have been applied.
+        """
+        self._write_listeners.append(listener)
+
+    def _notify_write(self, org_id: UUID | None) -> None:
+        for listener in self._write_listeners:
+            listener(org_id)
+
     @property
     def current_org_id(self) -> UUID | None:
         """Get current organization ID."""
@@ -460,23 +476,39 @@ class AtlasAPIClient:
         params: dict[str, Any] | None = None,
     ) -> dict[str, Any] | list[dict[str, Any]]:
         """Make POST request."""
-        return await self._request("POST", path, params=params, json=json)
+        org_id = self._current_org_id
+        try:
+            return await self._request("POST", path, params=params, json=json)
+        finally:
+            self._notify_write(org_id)
 
     async def put(
         self, path: str, json: dict[str, Any] | None = None
     ) -> dict[str, Any] | list[dict[str, Any]]:
         """Make PUT request."""
-        return await self._request("PUT", path, json=json)
+        org_id = self._current_org_id
+        try:
+            return await self._request("PUT", path, json=json)
+        finally:
+            self._notify_write(org_id)
 
     async def patch(
         self, path: str, json: dict[str, Any] | None = None
     ) -> dict[str, Any] | list[dict[str, Any]]:
         """Make PATCH request."""
-        return await self._request("PATCH", path, json=json)
+        org_id = self._current_org_id
+        try:
+            return await self._request("PATCH", path, json=json)
+        finally:
+            self._notify_write(org_id)
 
     async def delete(self, path: str) -> dict[str, Any] | list[dict[str, Any]]:
         """Make DELETE request."""
-        return await self._request("DELETE", path)
+        org_id = self._current_org_id
+        try:
+            return await self._request("DELETE", path)
+        finally:
+            self._notify_write(org_id)
 
     # === Customer Endpoints ===
 
@@ -1315,12 +1347,16 @@ class AtlasAPIClient:
         """Import a bank statement file into a bank account."""
         files = {"file": (filename, csv_content, "text/csv")}
         data = {"file_format": file_format} if file_format else None
-        result = await self._request_with_files(
-            "POST",
-            f"/api/v1/bank-accounts/{bank_account_id}/import",
-            data=data,
-            files=files,
-        )
+        org_id = self._current_org_id
+        try:
+            result = await self._request_with_files(
+                "POST",
+                f"/api/v1/bank-accounts/{bank_account_id}/import",
+                data=data,
+                files=files,
+            )
+        finally:
+            self._notify_write(org_id)
         return result if isinstance(result, dict) else {}
 
     async def import_bank_statement_rows(
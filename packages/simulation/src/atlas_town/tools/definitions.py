@@ -1034,8 +1034,10 @@ SWITCH_ORGANIZATION_TOOL: dict[str, Any] = {
 }
 
 # === Tool Collections ===
+# Frozen at import: agents pass the same tuple every turn, so LLM clients can
+# convert and cache each collection once instead of per request.
 
-ACCOUNTANT_TOOLS: list[dict[str, Any]] = [
+ACCOUNTANT_TOOLS: tuple[dict[str, Any], ...] = (
     # Organization
     SWITCH_ORGANIZATION_TOOL,
     # Customers & Vendors
@@ -1084,9 +1086,9 @@ ACCOUNTANT_TOOLS: list[dict[str, Any]] = [
     LIST_BANK_TRANSACTIONS_TOOL,
     CATEGORIZE_BANK_TRANSACTION_TOOL,
     MATCH_BANK_TRANSACTION_TOOL,
-]
+)
 
-OWNER_TOOLS: list[dict[str, Any]] = [
+OWNER_TOOLS: tuple[dict[str, Any], ...] = (
     # Read-only access to their business
     LIST_CUSTOMERS_TOOL,
     GET_CUSTOMER_TOOL,
@@ -1101,7 +1103,7 @@ OWNER_TOOLS: list[dict[str, Any]] = [
     GET_BALANCE_SHEET_TOOL,
     GET_AR_AGING_TOOL,
     GET_AP_AGING_TOOL,
-]
+)
 
 # All available tools
-ALL_TOOLS: list[dict[str, Any]] = ACCOUNTANT_TOOLS
+ALL_TOOLS: tuple[dict[str, Any], ...] = ACCOUNTANT_TOOLS
@@ -1,5 +1,9 @@
 """Tool executor that bridges LLM tool calls to Atlas API."""
 
+import asyncio
+import copy
+import json
+import time
 from datetime import date
 from typing import Any
 from uuid import UUID
@@ -10,6 +14,36 @@ from atlas_town.tools.atlas_api import AtlasAPIClient, AtlasAPIError
 
 logger = structlog.get_logger(__name__)
 
+# Tools with no side effects whose results can be shared between callers
+READ_ONLY_TOOLS = frozenset({
+    "list_customers",
+    "get_customer",
+    "list_vendors",
+    "get_vendor",
+    "list_invoices",
+    "get_invoice",
+    "list_bills",
+    "get_bill",
+    "list_payments",
+    "list_accounts",
+    "get_account_balance",
+    "list_journal_entries",
+    "get_trial_balance",
+    "get_profit_loss",
+    "get_balance_sheet",
+    "get_cash_flow",
+    "get_ar_aging",
+    "get_ap_aging",
+    "list_bank_accounts",
+    "list_bank_transactions",
+    "list_tax_years",
+    "list_quarterly_estimates",
+})
+
+# Seconds a read-only tool result is reused before hitting the API again
+DEFAULT_READ_CACHE_TTL = 30.0
+_READ_CACHE_PRUNE_SIZE = 256
+
 
 class ToolExecutionError(Exception):
     """Error during tool execution."""
@@ -21,10 +55,23 @@ class ToolExecutionError(Exception):
 
 
 class ToolExecutor:
-    """Executes LLM tool calls against the Atlas API."""
+    """Executes LLM tool calls against the Atlas API.
+
+    Read-only tools are served from a short-lived single-flight cache keyed by
+    organization, tool name and arguments: identical calls made while one is
+    in flight share its result, and any write the client makes to an
+    organization, through this executor or not, drops that organization's
+    cached reads. Callers get their own copy of each result.
+    """
 
-    def __init__(self, client: AtlasAPIClient):
+    def __init__(self, client: AtlasAPIClient, read_cache_ttl: float = DEFAULT_READ_CACHE_TTL):
         self.client = client
+        self._read_cache_ttl = read_cache_ttl
+        self._read_cache: dict[
+            tuple[str, str, str], tuple[float, asyncio.Task[dict[str, Any]]]
+        ] = {}
+        self._prefetches: set[asyncio.Task[dict[str, Any]]] = set()
+        client.add_write_listener(self._on_client_write)
         self._tool_handlers: dict[str, Any] = {
             # Organization
             "switch_organization": self._switch_organization,
@@ -85,6 +132,74 @@ class ToolExecutor:
         if not handler:
             raise ToolExecutionError(tool_name, f"Unknown tool: {tool_name}")
 
+        if tool_name in READ_ONLY_TOOLS and self._read_cache_ttl > 0:
+            return await self._execute_cached(tool_name, arguments)
+
+        return await self._execute_handler(tool_name, arguments)
+
+    def prefetch(self, tool_name: str, arguments: dict[str, Any]) -> bool:
+        """Start a read-only tool call in the background.
+
+        A later identical execute() joins the in-flight call instead of
+        issuing its own request. Must be called from the event loop.
+
+        Returns:
+            True if a prefetch was started; False for tools that can't be cached.
+        """
+        if tool_name not in READ_ONLY_TOOLS or self._read_cache_ttl <= 0:
+            return False
+        task = asyncio.ensure_future(self._execute_cached(tool_name, arguments))
+        self._prefetches.add(task)
+        task.add_done_callback(self._prefetches.discard)
+        return True
+
+    def invalidate_read_cache(self, org_key: str | None = None) -> None:
+        """Drop cached read-only results for one organization, or for all."""
+        if org_key is None:
+            self._read_cache.clear()
+            return
+        for key in [k for k in self._read_cache if k[0] == org_key]:
+            del self._read_cache[key]
+
+    def _on_client_write(self, org_id: UUID | None) -> None:
+        self.invalidate_read_cache(str(org_id))
+
+    def _org_key(self) -> str:
+        return str(self.client.current_org_id)
+
+    async def _execute_cached(
+        self, tool_name: str, arguments: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Execute a read-only tool, sharing results between identical calls."""
+        key = (
+            self._org_key(),
+            tool_name,
+            json.dumps(arguments, sort_keys=True, default=str),
+        )
+        now = time.monotonic()
+        cached = self._read_cache.get(key)
+        if cached is not None and cached[0] > now:
+            logger.debug("tool_cache_hit", tool=tool_name)
+            return copy.deepcopy(await asyncio.shield(cached[1]))
+
+        if len(self._read_cache) >= _READ_CACHE_PRUNE_SIZE:
+            for stale in [k for k, (expires, _) in self._read_cache.items() if expires <= now]:
+                del self._read_cache[stale]
+
+        task = asyncio.ensure_future(self._execute_handler(tool_name, arguments))
+        self._read_cache[key] = (now + self._read_cache_ttl, task)
+        result = await asyncio.shield(task)
+        if not result.get("success") and self._read_cache.get(key, (0.0, None))[1] is task:
+            # Don't keep serving failures
+            del self._read_cache[key]
+        return copy.deepcopy(result)
+
+    async def _execute_handler(
+        self, tool_name: str, arguments: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Run the handler for a tool, converting API errors to results."""
+        handler = self._tool_handlers[tool_name]
+
         logger.info("executing_tool", tool=tool_name, args=arguments)
 
         try:
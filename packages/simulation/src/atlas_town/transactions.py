@@ -1100,7 +1100,7 @@ class PayrollGenerator:
     def _build_1099_eligible_names(self) -> dict[str, set[str]]:
         eligible: dict[str, set[str]] = {}
         for business_key, industry in self._industries_by_business.items():
-            profiles = VENDOR_ARCHETYPES.get(industry, [])
+            profiles = VENDOR_ARCHETYPES.get(industry, ())
             names = {
                 profile.name.strip().lower()
                 for profile in profiles
@@ -4,9 +4,17 @@ from unittest.mock import AsyncMock, MagicMock
 from uuid import uuid4
 
 import pytest
+import structlog
 
 from atlas_town.agents.accountant import AccountantAgent
-from atlas_town.agents.base import AgentAction, AgentMessage, AgentState, BaseAgent
+from atlas_town.agents.base import (
+    AgentAction,
+    AgentMessage,
+    AgentObservation,
+    AgentState,
+    BaseAgent,
+    format_tool_result,
+)
 
 
 class ConcreteAgent(BaseAgent):
@@ -73,6 +81,86 @@ class TestBaseAgent:
         assert agent.conversation_history[0].role == "tool_result"
         assert agent.conversation_history[0].tool_call_id == "call_123"
 
+    @pytest.mark.asyncio
+    async def test_observe_answers_pending_tool_calls_in_order(self):
+        """Test observations are matched to outstanding tool call ids."""
+        agent = ConcreteAgent()
+        agent.add_assistant_message(
+            "Checking",
+            tool_calls=[
+                {"id": "call_1", "name": "a", "arguments": {}},
+                {"id": "call_2", "name": "b", "arguments": {}},
+            ],
+        )
+
+        await agent.observe(AgentObservation(action_id=uuid4(), success=True, result="one"))
+        await agent.observe(AgentObservation(action_id=uuid4(), success=True, result="two"))
+        await agent.observe(AgentObservation(action_id=uuid4(), success=True, result="extra"))
+
+        tool_results = [m for m in agent.conversation_history if m.role == "tool_result"]
+        assert [(m.tool_call_id, m.content) for m in tool_results] == [
+            ("call_1", "one"),
+            ("call_2", "two"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_history_compacts_past_limit(self):
+        """Test old messages are folded into a summary once over the limit."""
+        agent = ConcreteAgent(max_history_messages=6, keep_recent_messages=1)
+        for i in range(3):
+            agent.add_user_message(f"question {i}")
+            agent.add_assistant_message(f"answer {i}")
+
+        await agent.think("latest question")
+
+        history = agent.conversation_history
+        assert history[0].content.startswith("[Summary of earlier conversation]")
+        assert "question 0" in history[0].content
+        assert [m.content for m in history[1:]] == ["latest question"]
+
+    @pytest.mark.parametrize(("max_history", "keep_recent"), [(6, 0), (6, 6), (None, 0)])
+    def test_invalid_history_window_rejected(self, max_history, keep_recent):
+        """Test the retained window must be non-empty and below the limit."""
+        with pytest.raises(ValueError):
+            ConcreteAgent(max_history_messages=max_history, keep_recent_messages=keep_recent)
+
+    def test_tool_result_serialized_as_json(self):
+        """Test non-string tool results are stored as compact JSON."""
+        agent = ConcreteAgent()
+        agent.add_tool_result("call_123", {"success": True, "result": [{"id": "a"}]})
+
+        assert agent.conversation_history[0].content == '{"success":true,"result":[{"id":"a"}]}'
+
+    def test_record_lists_serialized_as_table(self):
+        """Test lists of same-shaped records drop the repeated field names."""
+        rows = [{"id": 1, "memo": "a|b", "paid": True}, {"id": 2, "memo": None, "paid": False}]
+
+        text = format_tool_result({"success": True, "result": rows})
+
+        assert text == '{"success":true}\n#toon result[2]: id|memo|paid\n1|a\\|b|true\n2||false'
+        assert format_tool_result(rows).startswith("#toon [2]: id|memo|paid\n")
+
+    def test_oversized_tool_result_keeps_leading_rows(self):
+        """Test large record lists are truncated by rows with a marker."""
+        rows = [{"id": i, "memo": "x" * 50} for i in range(100)]
+
+        text = format_tool_result({"success": True, "result": rows}, max_chars=1000)
+
+        assert len(text) < 1100
+        assert text.startswith('{"success":true}\n#toon result[100]: id|memo\n0|xxx')
+        assert text.endswith("rows]")
+        assert "[...truncated" in text
+
+    def test_oversized_mixed_rows_truncated_as_json(self):
+        """Test lists that are not tabular keep JSON row truncation."""
+        rows = [{"id": i, "memo": "x" * 50} if i % 2 else {"id": i} for i in range(100)]
+
+        text = format_tool_result({"success": True, "result": rows}, max_chars=1000)
+
+        assert len(text) < 1100
+        assert text.startswith('{"success":true,"result":[{"id":0},')
+        assert text.endswith("rows]")
+
     def test_set_organization(self):
         """Test setting organization context."""
         agent = ConcreteAgent()
@@ -91,6 +179,70 @@ class TestBaseAgent:
         assert len(agent.conversation_history) == 0
         assert len(agent.action_history) == 0
 
+    def test_history_view_is_live_and_snapshot_is_not(self):
+        """Test conversation_history tracks updates while snapshots stay fixed."""
+        agent = ConcreteAgent()
+        agent.add_user_message("First")
+        view = agent.conversation_history
+        snapshot = agent.snapshot_history()
+
+        agent.add_assistant_message("Second")
+
+        assert [m.content for m in view] == ["First", "Second"]
+        assert [m.content for m in snapshot] == ["First"]
+
+    @pytest.mark.asyncio
+    async def test_formatted_messages_track_history(self):
+        """Test the LLM message list stays in step with the history."""
+        agent = ConcreteAgent(max_history_messages=3, keep_recent_messages=1)
+        agent.add_user_message("Q1")
+        agent.add_assistant_message("", tool_calls=[{"id": "c1", "name": "t"}])
+        agent.add_tool_result("c1", "done")
+        formatted = agent._format_messages_for_llm()
+
+        assert [m["role"] for m in formatted] == ["user", "assistant", "tool_result"]
+        assert formatted[2]["tool_call_id"] == "c1"
+
+        await agent.think("Q2")
+
+        assert agent._format_messages_for_llm() is formatted
+        assert formatted[0]["content"].startswith("[Summary of earlier conversation]")
+        assert [m["content"] for m in formatted] == [
+            m.content for m in agent.conversation_history
+        ]
+
+    def test_dump_state_appends_only_new_messages(self, tmp_path):
+        """Test incremental saves round-trip through load_state()."""
+        path = tmp_path / "sarah.jsonl.gz"
+        agent = ConcreteAgent()
+        agent.add_user_message("First")
+        agent.add_assistant_message("Reply", tool_calls=[{"id": "c1", "name": "t"}])
+
+        assert agent.dump_state(path) == 2
+        agent.add_tool_result("c1", {"ok": True})
+        assert agent.dump_state(path) == 1
+        assert agent.dump_state(path) == 0
+
+        restored = ConcreteAgent()
+        restored.load_state(path)
+
+        assert restored.snapshot_history() == agent.snapshot_history()
+
+    def test_dump_state_rewrites_after_clear(self, tmp_path):
+        """Test the file is rewritten once earlier messages are gone."""
+        path = tmp_path / "sarah.jsonl.gz"
+        agent = ConcreteAgent()
+        agent.add_user_message("Old")
+        agent.dump_state(path)
+        agent.clear_history()
+        agent.add_user_message("New")
+
+        agent.dump_state(path)
+        restored = ConcreteAgent()
+        restored.load_state(path)
+
+        assert [m.content for m in restored.conversation_history] == ["New"]
+
     def test_get_context_summary(self):
         """Test getting agent context summary."""
         agent = ConcreteAgent(name="Test Agent")
@@ -116,6 +268,37 @@ class TestBaseAgent:
         assert len(agent.action_history) == 1  # Action recorded
         assert action.action_type == "message"
 
+    def test_log_context_binds_agent_identity(self):
+        """Test that log_context() scopes agent fields to the block."""
+        agent = ConcreteAgent()
+
+        with agent.log_context():
+            bound = structlog.contextvars.get_contextvars()
+            assert bound["agent_id"] == str(agent.id)
+            assert bound["agent_name"] == agent.name
+
+        assert "agent_id" not in structlog.contextvars.get_contextvars()
+
+    def test_logs_outside_tasks_carry_agent_identity(self):
+        """Test the instance logger is bound, so calls outside a task are attributed."""
+        agent = ConcreteAgent()
+
+        with structlog.testing.capture_logs() as logs:
+            agent.set_organization(uuid4())
+
+        assert logs[0]["event"] == "organization_set"
+        assert logs[0]["agent_id"] == str(agent.id)
+        assert logs[0]["agent_name"] == agent.name
+
+    def test_logger_bound_on_first_use(self):
+        """Test constructing an agent doesn't bind a logger until it logs."""
+        agent = ConcreteAgent()
+        assert "_logger" not in vars(agent)
+
+        agent.set_organization(uuid4())
+
+        assert vars(agent)["_logger"] is agent._logger
+
 
 class TestAccountantAgent:
     """Tests for AccountantAgent."""
@@ -151,6 +334,10 @@ class TestAccountantAgent:
         assert "create_payment" in tool_names
         assert "get_trial_balance" in tool_names
 
+    def test_accountants_share_llm_client(self):
+        """Test accountants reuse one client (and connection pool) per provider."""
+        assert AccountantAgent()._llm_client is AccountantAgent()._llm_client
+
     def test_set_tool_executor(self):
         """Test setting tool executor."""
         agent = AccountantAgent()
@@ -180,6 +367,144 @@ class TestAccountantAgent:
         mock_executor.execute.assert_called_once_with("list_customers", {"limit": 10})
         assert result["success"] is True
 
+    @pytest.mark.asyncio
+    async def test_run_task_executes_all_tool_calls_from_one_turn(self):
+        """Test that every tool call in a turn is executed and answered."""
+        agent = AccountantAgent()
+        mock_executor = MagicMock()
+        mock_executor.execute = AsyncMock(return_value={"success": True, "result": []})
+        agent.set_tool_executor(mock_executor)
+
+        tool_calls = [
+            {"id": "call_1", "name": "list_invoices", "arguments": {}},
+            {"id": "call_2", "name": "list_bills", "arguments": {"limit": 5}},
+        ]
+        agent._llm_client = MagicMock()
+        agent._llm_client.generate = AsyncMock(
+            side_effect=[
+                MagicMock(content="", tool_calls=tool_calls, stop_reason="tool_use"),
+                MagicMock(content="All done", tool_calls=[], stop_reason="end_turn"),
+            ]
+        )
+
+        response = await agent.run_task("Review open items")
+
+        assert response == "All done"
+        assert mock_executor.execute.await_count == 2
+        tool_results = [m for m in agent.conversation_history if m.role == "tool_result"]
+        assert [m.tool_call_id for m in tool_results] == ["call_1", "call_2"]
+
+    def test_tool_prefetcher_stops_after_order_dependent_tool(self):
+        """Test reads after switch_organization in a turn are not prefetched."""
+        agent = AccountantAgent(llm_client=MagicMock())
+        executor = MagicMock()
+        executor.prefetch.return_value = True
+        prefetch = agent._make_tool_prefetcher(executor)
+
+        prefetch("list_customers", {})
+        prefetch("switch_organization", {"org_id": "org-2"})
+        prefetch("list_invoices", {})
+
+        executor.prefetch.assert_called_once_with("list_customers", {})
+
+    @pytest.mark.asyncio
+    async def test_process_invoice_reuses_result_for_identical_request(self):
+        """Test a repeated invoice request skips the LLM loop."""
+        agent = AccountantAgent()
+        agent.run_task = AsyncMock(side_effect=self._invoice_task(agent, success=True))
+        items = [
+            {"description": "Consulting", "quantity": 5, "unit_price": "100.00"},
+            {"description": "Support", "quantity": 2, "unit_price": "50.00"},
+        ]
+
+        first = await agent.process_invoice("cust-1", items)
+        first["result"] = "changed by caller"
+        second = await agent.process_invoice("cust-1", list(reversed(items)))
+        await agent.process_invoice("cust-2", items)
+
+        assert second["status"] == "success"
+        assert "inv-1" in second["result"]
+        assert agent.run_task.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_process_invoice_retries_failed_create(self):
+        """Test an invoice the API refused to create isn't cached."""
+        agent = AccountantAgent()
+        agent.run_task = AsyncMock(side_effect=self._invoice_task(agent, success=False))
+        items = [{"description": "Consulting", "quantity": 1, "unit_price": "100.00"}]
+
+        first = await agent.process_invoice("cust-1", items)
+        await agent.process_invoice("cust-1", items)
+
+        assert first["status"] == "success"
+        assert agent.run_task.await_count == 2
+
+    @staticmethod
+    def _invoice_task(agent, success):
+        """Build a run_task stand-in that calls create_invoice once."""
+
+        async def run_task(task):
+            call = {"id": "call_1", "name": "create_invoice", "arguments": {}}
+            agent.add_assistant_message("", tool_calls=[call])
+            if success:
+                agent.add_tool_result("call_1", {"success": True, "result": {"id": "inv-1"}})
+            else:
+                agent.add_tool_result("call_1", {"success": False, "error": "Bad customer"})
+            return "Done"
+
+        return run_task
+
+    @pytest.mark.asyncio
+    async def test_process_invoice_ignores_earlier_tasks_results(self):
+        """Test a run with no tool result isn't credited with an old one or cached."""
+        agent = AccountantAgent()
+        agent.add_tool_result("call_0", {"id": "inv-from-earlier-task"})
+        agent.run_task = AsyncMock(return_value="I couldn't find that customer")
+        items = [{"description": "Consulting", "quantity": 1, "unit_price": "100.00"}]
+
+        first = await agent.process_invoice("cust-1", items)
+        await agent.process_invoice("cust-1", items)
+
+        assert first == {"status": "completed"}
+        assert agent.run_task.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_warmup_sends_prefix_without_touching_history(self):
+        """Test warmup issues one LLM call and leaves history empty."""
+        agent = AccountantAgent()
+        agent._llm_client = MagicMock()
+        agent._llm_client.generate = AsyncMock()
+
+        await agent.warmup()
+
+        call = agent._llm_client.generate.call_args
+        assert call.kwargs["system_prompt"] == agent._get_system_prompt()
+        assert call.kwargs["tools"] == agent._get_tools()
+        assert agent.conversation_history == []
+
+    @pytest.mark.asyncio
+    async def test_run_tasks_batch_runs_each_org_with_its_executor(self):
+        """Test batched tasks use per-org executors and report each result."""
+        agent = AccountantAgent()
+        agent._llm_client = MagicMock()
+        agent._llm_client.generate = AsyncMock(
+            return_value=MagicMock(content="Books closed", tool_calls=[], stop_reason="end_turn")
+        )
+        org_a, org_b = uuid4(), uuid4()
+        executors = {org_a: MagicMock(), org_b: MagicMock()}
+        finished = []
+
+        results = await agent.run_tasks_batch(
+            [(org_a, "Close the books"), (org_b, "Close the books")],
+            tool_executors=executors,
+            on_result=lambda org_id, response: finished.append(org_id),
+        )
+
+        assert results == ["Books closed", "Books closed"]
+        assert set(finished) == {org_a, org_b}
+        assert agent._llm_client.generate.await_count == 2
+        assert agent.conversation_history == []
+
     def test_format_items(self):
         """Test formatting line items for prompts."""
         agent = AccountantAgent()
@@ -207,6 +532,17 @@ class TestAgentDataClasses:
         assert msg.tool_calls == []
         assert msg.timestamp is not None
 
+    def test_agent_message_timestamp_is_utc_datetime(self):
+        """Test the lazily derived timestamp matches the creation time."""
+        from datetime import UTC, datetime
+
+        before = datetime.now(UTC)
+        msg = AgentMessage(role="user", content="Hello")
+        after = datetime.now(UTC)
+
+        assert msg.timestamp.tzinfo is UTC
+        assert before.replace(microsecond=0) <= msg.timestamp <= after
+
     def test_agent_action_creation(self):
         """Test AgentAction creation."""
         agent_id = uuid4()
@@ -229,3 +565,11 @@ class TestAgentDataClasses:
         assert AgentState.ACTING.value == "acting"
         assert AgentState.WAITING.value == "waiting"
         assert AgentState.ERROR.value == "error"
+
+    def test_agent_records_use_slots(self):
+        """Test history records don't carry a per-instance __dict__."""
+        msg = AgentMessage(role="user", content="Hello")
+
+        assert not hasattr(msg, "__dict__")
+        with pytest.raises(AttributeError):
+            msg.extra = "not allowed"  # type: ignore[attr-defined]
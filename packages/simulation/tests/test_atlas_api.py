@@ -294,3 +294,108 @@ class TestToolDefinitions:
             assert "description" in tool, "Tool must have a description"
             assert "input_schema" in tool, "Tool must have input_schema"
             assert tool["input_schema"]["type"] == "object"
+
+
+class TestToolExecutorReadCache:
+    """Tests for ToolExecutor read-only result sharing."""
+
+    @staticmethod
+    def _make_executor():
+        from atlas_town.tools.executor import ToolExecutor
+
+        api = MagicMock()
+        api.current_org_id = UUID("22222222-2222-2222-2222-222222222222")
+        api.list_customers = AsyncMock(return_value=[{"id": "c1"}])
+        api.create_customer = AsyncMock(return_value={"id": "c2"})
+        return ToolExecutor(api), api
+
+    @pytest.mark.asyncio
+    async def test_repeated_reads_hit_api_once(self):
+        """Test identical read-only calls share a single API request."""
+        import asyncio
+
+        executor, api = self._make_executor()
+
+        results = await asyncio.gather(
+            executor.execute("list_customers", {"limit": 10}),
+            executor.execute("list_customers", {"limit": 10}),
+        )
+        again = await executor.execute("list_customers", {"limit": 10})
+
+        assert api.list_customers.await_count == 1
+        assert results[0] == results[1] == again
+
+    @staticmethod
+    def _make_client_executor():
+        """Build an executor over a real client whose HTTP layer is mocked."""
+        from atlas_town.tools.executor import ToolExecutor
+
+        api = AtlasAPIClient(access_token="token")
+        api._current_org_id = UUID("22222222-2222-2222-2222-222222222222")
+        api._request = AsyncMock(return_value=[{"id": "c1"}])
+        return ToolExecutor(api), api
+
+    @staticmethod
+    def _get_count(request: AsyncMock) -> int:
+        return sum(1 for call in request.await_args_list if call.args[0] == "GET")
+
+    @pytest.mark.asyncio
+    async def test_write_invalidates_org_reads(self):
+        """Test a write tool drops cached reads for the organization."""
+        executor, api = self._make_client_executor()
+
+        await executor.execute("list_customers", {})
+        await executor.execute("create_customer", {"name": "New"})
+        await executor.execute("list_customers", {})
+
+        assert self._get_count(api._request) == 2
+
+    @pytest.mark.asyncio
+    async def test_direct_client_write_invalidates_org_reads(self):
+        """Test writes made on the client outside the executor drop cached reads."""
+        executor, api = self._make_client_executor()
+
+        await executor.execute("list_customers", {})
+        await api.create_invoice({"customer_id": "c1"})
+        await executor.execute("list_customers", {})
+
+        assert self._get_count(api._request) == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_write_still_invalidates(self):
+        """Test a write that raised may have been applied, so reads are dropped."""
+        executor, api = self._make_client_executor()
+        await executor.execute("list_customers", {})
+
+        api._request.side_effect = AtlasAPIError("API error: 500", status_code=500)
+        with pytest.raises(AtlasAPIError):
+            await api.create_invoice({"customer_id": "c1"})
+        api._request.side_effect = None
+        await executor.execute("list_customers", {})
+
+        assert self._get_count(api._request) == 2
+
+    @pytest.mark.asyncio
+    async def test_callers_get_their_own_result(self):
+        """Test mutating one caller's result doesn't change what others see."""
+        executor, api = self._make_executor()
+
+        first = await executor.execute("list_customers", {})
+        first["result"].append({"id": "injected"})
+        second = await executor.execute("list_customers", {})
+
+        assert api.list_customers.await_count == 1
+        assert second == {"success": True, "result": [{"id": "c1"}]}
+
+    @pytest.mark.asyncio
+    async def test_prefetch_is_joined_by_execute(self):
+        """Test a prefetched read is reused by the matching execute()."""
+        executor, api = self._make_executor()
+
+        assert executor.prefetch("list_customers", {"limit": 5}) is True
+        assert executor.prefetch("create_customer", {"name": "New"}) is False
+        result = await executor.execute("list_customers", {"limit": 5})
+
+        assert api.list_customers.await_count == 1
+        assert result == {"success": True, "result": [{"id": "c1"}]}
+        api.create_customer.assert_not_awaited()
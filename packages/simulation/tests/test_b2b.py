@@ -7,7 +7,19 @@ from uuid import uuid4
 
 import pytest
 
-from atlas_town.b2b import B2BCoordinator, B2BPlannedPair
+from atlas_town.b2b import (
+    B2B_NAMESPACE,
+    B2BCoordinator,
+    B2BFrequency,
+    B2BPairSpec,
+    B2BPlannedPair,
+    B2BRelationship,
+    _b2b_uuid5,
+    _DueSchedule,
+    _triangular_from_seed,
+    load_business_credentials,
+)
+from atlas_town.economics import InflationModel
 from atlas_town.orchestrator import Orchestrator, OrganizationContext
 
 
@@ -41,6 +53,7 @@ class TestB2BCoordinator:
         assert pair.buyer_key == "tony"
         assert pair.amount > 0
         assert pair.due_date == date(2025, 2, 9)
+        assert pair.description == "B2B services - Craig's Landscaping to Tony's Pizzeria"
 
     def test_dedupe_after_mark_seen(self):
         seller = _make_org("craig", "Craig's Landscaping")
@@ -62,6 +75,202 @@ class TestB2BCoordinator:
         assert planned_again == []
 
 
+    def test_prune_forgets_only_earlier_dated_marks(self):
+        seller = _make_org("craig", "Craig's Landscaping")
+        buyer = _make_org("tony", "Tony's Pizzeria")
+        coordinator = B2BCoordinator(
+            orgs_by_key={"craig": seller, "tony": buyer}, configs={}, org_reference={}
+        )
+        customers = {"craig": [{"id": "1", "display_name": "Tony's Pizzeria"}], "tony": []}
+        jan, feb = date(2025, 1, 10), date(2025, 2, 10)
+        coordinator.mark_pair_seen(coordinator.plan_pairs(jan, customers)[0].pair_id, jan)
+        coordinator.mark_pair_seen(coordinator.plan_pairs(feb, customers)[0].pair_id, feb)
+
+        coordinator.prune_seen_before(feb)
+
+        assert coordinator.plan_pairs(jan, customers)
+        assert coordinator.plan_pairs(feb, customers) == []
+
+    def test_planned_pairs_hash_by_pair_id(self):
+        seller = _make_org("craig", "Craig's Landscaping")
+        buyer = _make_org("tony", "Tony's Pizzeria")
+        coordinator = B2BCoordinator(
+            orgs_by_key={"craig": seller, "tony": buyer}, configs={}, org_reference={}
+        )
+        customers = {"craig": [{"id": str(uuid4()), "display_name": "Tony's Pizzeria"}]}
+
+        first = coordinator.plan_pairs(date(2025, 1, 10), customers)[0]
+        again = coordinator.plan_pairs(date(2025, 1, 10), customers)[0]
+
+        assert first == again
+        assert {first, again} == {first}
+
+    def test_reuses_schedule_until_customers_change(self):
+        seller = _make_org("craig", "Craig's Landscaping")
+        buyer = _make_org("tony", "Tony's Pizzeria")
+        coordinator = B2BCoordinator(
+            orgs_by_key={"craig": seller, "tony": buyer}, configs={}, org_reference={}
+        )
+        customers = {"craig": [{"id": "1", "display_name": "Tony's Pizzeria"}], "tony": []}
+
+        assert coordinator.plan_pairs(date(2025, 1, 10), customers)
+        schedule = coordinator._schedule
+        fresh = {"craig": [{"id": "2", "display_name": "Tony's Pizzeria"}], "tony": []}
+        assert coordinator.plan_pairs(date(2025, 2, 10), fresh)
+        assert coordinator._schedule is schedule
+
+        assert coordinator.plan_pairs(date(2025, 3, 10), {"craig": [], "tony": []}) == []
+        assert coordinator._schedule is not schedule
+
+    def test_invalidate_pair_specs_picks_up_renamed_org(self):
+        seller = _make_org("craig", "Craig's Landscaping")
+        buyer = _make_org("tony", "Tony's Pizzeria")
+        coordinator = B2BCoordinator(
+            orgs_by_key={"craig": seller, "tony": buyer}, configs={}, org_reference={}
+        )
+        customers = {"craig": [{"id": "1", "display_name": "Tony's Trattoria"}], "tony": []}
+        assert coordinator.plan_pairs(date(2025, 1, 10), customers) == []
+
+        buyer.name = "Tony's Trattoria"
+        assert coordinator.plan_pairs(date(2025, 2, 10), customers) == []
+        coordinator.invalidate_pair_specs()
+
+        assert coordinator.plan_pairs(date(2025, 3, 10), customers)
+
+
+    def test_plan_pairs_range_covers_each_due_date(self):
+        seller = _make_org("craig", "Craig's Landscaping")
+        buyer = _make_org("tony", "Tony's Pizzeria")
+        coordinator = B2BCoordinator(
+            orgs_by_key={"craig": seller, "tony": buyer}, configs={}, org_reference={}
+        )
+        customers = {"craig": [{"id": "1", "display_name": "Tony's Pizzeria"}], "tony": []}
+
+        planned = coordinator.plan_pairs_range(date(2025, 1, 1), date(2025, 3, 31), customers)
+
+        assert [p.pair_id for p in planned] == [
+            p.pair_id
+            for day in (date(2025, 1, 10), date(2025, 2, 10), date(2025, 3, 10))
+            for p in coordinator.plan_pairs(day, customers)
+        ]
+
+    def test_triangular_from_seed_stays_in_range(self):
+        samples = [_triangular_from_seed(seed * 7919, 250.0, 2500.0, 925.0) for seed in range(500)]
+
+        assert all(250.0 <= x <= 2500.0 for x in samples)
+        assert _triangular_from_seed(123, 10.0, 10.0, 10.0) == 10.0
+
+    def test_business_credentials_read_once(self):
+        assert load_business_credentials() is load_business_credentials()
+
+    def test_customer_names_match_ignoring_case_spacing_and_apostrophes(self):
+        match = B2BCoordinator._customers_match_org
+
+        assert match([{"display_name": "TONYS  pizzeria"}], "Tony's Pizzeria")
+        assert match([{"name": "Tony's Pizzeria LLC"}], "Tony's Pizzeria")
+        assert not match([{"display_name": ""}], "Tony's Pizzeria")
+        assert not match([{"display_name": "Tony's Pizzeria"}], None)
+
+    def test_accepts_string_org_ids(self):
+        seller = _make_org("craig", "Craig's Landscaping")
+        buyer = _make_org("tony", "Tony's Pizzeria")
+        seller_id = seller.id
+        seller.id = str(seller_id)  # type: ignore[assignment]
+        coordinator = B2BCoordinator(
+            orgs_by_key={"craig": seller, "tony": buyer}, configs={}, org_reference={}
+        )
+        customers = {"craig": [{"id": "1", "display_name": "Tony's Pizzeria"}], "tony": []}
+
+        (pair,) = coordinator.plan_pairs(date(2025, 1, 10), customers)
+
+        assert pair.seller_org_id == seller_id
+        assert pair.buyer_org_id is buyer.id
+
+    def test_amount_is_deterministic_per_pair_and_date(self):
+        orgs = {
+            "craig": _make_org("craig", "Craig's Landscaping"),
+            "tony": _make_org("tony", "Tony's Pizzeria"),
+        }
+        customers = {"craig": [{"id": "1", "display_name": "Tony's Pizzeria"}], "tony": []}
+
+        def plan(day: date) -> B2BPlannedPair:
+            coordinator = B2BCoordinator(orgs_by_key=orgs, configs={}, org_reference={})
+            return coordinator.plan_pairs(day, customers)[0]
+
+        assert plan(date(2025, 1, 10)).amount == plan(date(2025, 1, 10)).amount
+        assert plan(date(2025, 1, 10)).pair_id != plan(date(2025, 2, 10)).pair_id
+
+    def test_config_values_normalized_at_parse_time(self):
+        coordinator = B2BCoordinator(
+            orgs_by_key={},
+            configs={
+                "craig": {
+                    "counterparties": [
+                        {"org_key": "tony", "relationship": " Seller ", "frequency": "WEEKLY"},
+                        {"org_key": "maya", "relationship": "buyer", "frequency": "yearly"},
+                    ]
+                }
+            },
+            org_reference={},
+        )
+
+        first, second = coordinator._configs["craig"].counterparties
+        assert (first.relationship, first.frequency) == (
+            B2BRelationship.VENDOR,
+            B2BFrequency.WEEKLY,
+        )
+        assert (second.relationship, second.frequency) == (
+            B2BRelationship.CUSTOMER,
+            B2BFrequency.MONTHLY,
+        )
+
+    def test_amounts_round_to_nickels(self):
+        orgs = {
+            "craig": _make_org("craig", "Craig's Landscaping"),
+            "tony": _make_org("tony", "Tony's Pizzeria"),
+        }
+        coordinator = B2BCoordinator(
+            orgs_by_key=orgs,
+            configs={},
+            org_reference={},
+            inflation=InflationModel(annual_rate=Decimal("0"), start_date=date(2025, 1, 1)),
+        )
+        customers = {"craig": [{"id": "1", "display_name": "Tony's Pizzeria"}], "tony": []}
+
+        pairs = coordinator.plan_pairs_range(date(2025, 1, 1), date(2025, 12, 31), customers)
+
+        assert len(pairs) == 12
+        assert all(p.amount % Decimal("0.05") == 0 for p in pairs)
+        assert all(p.amount.as_tuple().exponent == -2 for p in pairs)
+
+    def test_b2b_uuid5_matches_stdlib(self):
+        from uuid import uuid5
+
+        name = f"{uuid4()}:{uuid4()}:2025-01-10"
+
+        assert _b2b_uuid5(name) == uuid5(B2B_NAMESPACE, name)
+
+class TestDueSchedule:
+    def test_buckets_by_frequency(self):
+        daily = B2BPairSpec("a", "b", frequency="daily")
+        weekly = B2BPairSpec("a", "c", frequency="Weekly")
+        monthly = B2BPairSpec("b", "c", day_of_month=15)
+        quarterly = B2BPairSpec("c", "a", frequency="quarterly", day_of_month=15)
+        schedule = _DueSchedule.build([daily, weekly, monthly, quarterly])
+
+        assert schedule.due_on(date(2025, 1, 15)) == [daily, monthly, quarterly]
+        assert schedule.due_on(date(2025, 2, 15)) == [daily, monthly]
+        assert schedule.due_on(date(2025, 2, 17)) == [daily, weekly]  # Monday
+
+    def test_late_days_fall_on_month_end(self):
+        spec = B2BPairSpec("a", "b", day_of_month=31)
+        schedule = _DueSchedule.build([spec])
+
+        assert schedule.due_on(date(2025, 2, 28)) == [spec]
+        assert schedule.due_on(date(2024, 2, 28)) == []
+        assert schedule.due_on(date(2024, 2, 29)) == [spec]
+        assert schedule.due_on(date(2025, 1, 30)) == []
+
 class TestOrchestratorB2B:
     @pytest.mark.asyncio
     async def test_process_b2b_creates_records(self):
@@ -1,7 +1,10 @@
 """Tests for Claude LLM client."""
 
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
+import pytest
+
+from atlas_town.clients.cache import ResponseCache
 from atlas_town.clients.claude import ClaudeClient, ClaudeResponse
 
 
@@ -29,6 +32,24 @@ class TestClaudeClient:
         assert client._max_tokens == 2048
         assert client._temperature == 0.5
 
+    def test_default_transport_uses_configured_pool(self):
+        """Test the SDK gets a pooled http client sized from settings."""
+        client = ClaudeClient(api_key="test-key")
+
+        http_client = client._client._client
+        pool = http_client._transport._pool
+        assert pool._max_connections == 256
+        assert pool._max_keepalive_connections == 64
+
+    def test_injected_http_client_is_used(self):
+        """Test a shared http client is passed through to the SDK."""
+        import anthropic
+
+        shared = anthropic.DefaultAsyncHttpxClient()
+        client = ClaudeClient(api_key="test-key", http_client=shared)
+
+        assert client._client._client is shared
+
     def test_convert_tools_to_anthropic_format(self):
         """Test tool format conversion."""
         client = ClaudeClient()
@@ -115,6 +136,19 @@ class TestClaudeClient:
         assert content[0]["tool_use_id"] == "call_123"
         assert content[0]["content"] == '{"customers": []}'
 
+    def test_consecutive_tool_results_share_one_user_message(self):
+        """Test results for a multi-tool turn are sent back together."""
+        client = ClaudeClient()
+        messages = [
+            {"role": "tool_result", "content": "a", "tool_call_id": "call_1"},
+            {"role": "tool_result", "content": "b", "tool_call_id": "call_2"},
+        ]
+
+        converted = client._convert_messages_to_anthropic_format(messages)
+
+        assert len(converted) == 1
+        assert [b["tool_use_id"] for b in converted[0]["content"]] == ["call_1", "call_2"]
+
     def test_parse_text_response(self):
         """Test parsing text-only response."""
         client = ClaudeClient()
@@ -123,7 +157,12 @@ class TestClaudeClient:
         mock_response = MagicMock()
         mock_response.content = [MagicMock(type="text", text="Hello there")]
         mock_response.stop_reason = "end_turn"
-        mock_response.usage = MagicMock(input_tokens=10, output_tokens=5)
+        mock_response.usage = MagicMock(
+            input_tokens=10,
+            output_tokens=5,
+            cache_read_input_tokens=None,
+            cache_creation_input_tokens=None,
+        )
 
         parsed = client._parse_response(mock_response)
 
@@ -133,6 +172,24 @@ class TestClaudeClient:
         assert parsed.usage["input_tokens"] == 10
         assert parsed.usage["output_tokens"] == 5
 
+    def test_parse_joins_multiple_text_blocks(self):
+        """Test text split across blocks (e.g. around a tool call) is kept."""
+        client = ClaudeClient()
+        mock_response = MagicMock()
+        mock_response.content = [
+            MagicMock(type="text", text="First, "),
+            MagicMock(type="text", text="then more."),
+        ]
+        mock_response.stop_reason = "end_turn"
+        mock_response.usage = MagicMock(
+            input_tokens=1,
+            output_tokens=1,
+            cache_read_input_tokens=None,
+            cache_creation_input_tokens=None,
+        )
+
+        assert client._parse_response(mock_response).content == "First, then more."
+
     def test_parse_tool_use_response(self):
         """Test parsing response with tool calls."""
         client = ClaudeClient()
@@ -147,7 +204,12 @@ class TestClaudeClient:
         mock_response = MagicMock()
         mock_response.content = [tool_block]
         mock_response.stop_reason = "tool_use"
-        mock_response.usage = MagicMock(input_tokens=20, output_tokens=15)
+        mock_response.usage = MagicMock(
+            input_tokens=20,
+            output_tokens=15,
+            cache_read_input_tokens=0,
+            cache_creation_input_tokens=0,
+        )
 
         parsed = client._parse_response(mock_response)
 
@@ -157,15 +219,173 @@ class TestClaudeClient:
         assert parsed.tool_calls[0]["arguments"] == {"limit": 10}
         assert parsed.stop_reason == "tool_use"
 
+    def test_cache_breakpoints_on_tools_and_last_message(self):
+        """Test prompt-caching markers on the tool schema and history prefix."""
+        client = ClaudeClient()
+        tools = client._prepare_tools([
+            {"name": "a", "description": "A", "input_schema": {"type": "object"}},
+            {"name": "b", "description": "B", "input_schema": {"type": "object"}},
+        ])
+        messages = client._convert_messages_to_anthropic_format([
+            {"role": "user", "content": "First"},
+            {"role": "assistant", "content": "Reply"},
+            {"role": "user", "content": "Second"},
+        ])
+
+        client._mark_history_breakpoint(messages)
+
+        assert "cache_control" not in tools[0]
+        assert tools[-1]["cache_control"] == {"type": "ephemeral"}
+        assert messages[0]["content"] == "First"
+        assert messages[-1]["content"] == [
+            {"type": "text", "text": "Second", "cache_control": {"type": "ephemeral"}}
+        ]
+
+    def test_frozen_tools_converted_once(self):
+        """Test a frozen tool tuple is converted once and reused."""
+        from atlas_town.tools.definitions import ACCOUNTANT_TOOLS
+
+        client = ClaudeClient()
+
+        first = client._prepare_tools(ACCOUNTANT_TOOLS)
+        second = client._prepare_tools(ACCOUNTANT_TOOLS)
+
+        assert first is second
+        assert len(first) == len(ACCOUNTANT_TOOLS)
+
+    def test_system_prompt_sent_as_cached_block(self):
+        """Test the system prompt is wrapped in a cacheable text block."""
+        client = ClaudeClient()
+
+        blocks = client._build_system_blocks("You are Sarah")
+
+        assert blocks == [
+            {"type": "text", "text": "You are Sarah", "cache_control": {"type": "ephemeral"}}
+        ]
+
+    @pytest.mark.asyncio
+    async def test_streamed_tool_calls_reported_before_response(self):
+        """Test on_tool_use fires for each tool_use block while streaming."""
+        client = ClaudeClient()
+        tool_block = MagicMock(type="tool_use", id="call_1", input={"limit": 5})
+        tool_block.name = "list_customers"
+        final = MagicMock(
+            content=[tool_block],
+            stop_reason="tool_use",
+            usage=MagicMock(
+                input_tokens=10,
+                output_tokens=5,
+                cache_read_input_tokens=0,
+                cache_creation_input_tokens=0,
+            ),
+        )
+        stream = MagicMock()
+        stream.__aiter__.return_value = [
+            MagicMock(type="content_block_start"),
+            MagicMock(type="content_block_stop", content_block=tool_block),
+        ]
+        stream.get_final_message = AsyncMock(return_value=final)
+        client._client = MagicMock()
+        client._client.messages.create = AsyncMock()
+        client._client.messages.stream.return_value.__aenter__.return_value = stream
+        seen: list[tuple[str, dict]] = []
+
+        response = await client.generate(
+            system_prompt="You are Sarah",
+            messages=[{"role": "user", "content": "List customers"}],
+            tools=[{"name": "list_customers", "description": "L", "input_schema": {}}],
+            on_tool_use=lambda name, args: seen.append((name, args)),
+        )
+
+        assert seen == [("list_customers", {"limit": 5})]
+        assert response.tool_calls[0]["name"] == "list_customers"
+        client._client.messages.create.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_generate_awaits_async_sdk(self):
+        """Test non-streaming requests await the async SDK client."""
+        client = ClaudeClient()
+        final = MagicMock(
+            content=[MagicMock(type="text", text="Hi")],
+            stop_reason="end_turn",
+            usage=MagicMock(
+                input_tokens=3,
+                output_tokens=1,
+                cache_read_input_tokens=0,
+                cache_creation_input_tokens=0,
+            ),
+        )
+        client._client = MagicMock()
+        client._client.messages.create = AsyncMock(return_value=final)
+
+        response = await client.generate("You are Sarah", [{"role": "user", "content": "Hi"}])
+
+        assert response.content == "Hi"
+        client._client.messages.create.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_opted_in_requests_served_from_response_cache(self):
+        """Test an identical keyed request skips the API on the second call."""
+        client = ClaudeClient(response_cache=ResponseCache())
+        final = MagicMock(
+            content=[MagicMock(type="text", text="Hi")],
+            stop_reason="end_turn",
+            usage=MagicMock(
+                input_tokens=3,
+                output_tokens=1,
+                cache_read_input_tokens=0,
+                cache_creation_input_tokens=0,
+            ),
+        )
+        client._client = MagicMock()
+        client._client.messages.create = AsyncMock(return_value=final)
+        messages = [{"role": "user", "content": "Hi"}]
+
+        first = await client.generate("You are Sarah", messages, cache_key_extra="v1")
+        first.content = "mutated"
+        second = await client.generate("You are Sarah", messages, cache_key_extra="v1")
+        await client.generate("You are Sarah", messages)
+
+        assert second.content == "Hi"
+        # The un-keyed request samples at temperature > 0, so it is not cached
+        assert client._client.messages.create.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_warmup_opens_connection_and_swallows_errors(self):
+        """Test warmup sends a HEAD through the pooled client and never raises."""
+        client = ClaudeClient()
+        client._http_client = MagicMock()
+        client._http_client.head = AsyncMock(side_effect=OSError("offline"))
+
+        await client.warmup()
+
+        url = client._http_client.head.await_args.args[0]
+        assert url == str(client._client.base_url)
+
     def test_count_tokens_approximation(self):
         """Test token counting approximation."""
         client = ClaudeClient()
 
-        # ~4 chars per token for English
+        # ~3 chars per token, rounding toward overestimates
         text = "Hello world, this is a test."  # 28 chars
         count = client.count_tokens(text)
 
-        assert count == 7  # 28 // 4
+        assert count == 9  # 28 // 3
+
+    @pytest.mark.asyncio
+    async def test_count_tokens_exact_cached_per_text(self):
+        """Test exact counts come from the API once per distinct text."""
+        client = ClaudeClient()
+        client._client = MagicMock()
+        client._client.messages.count_tokens = AsyncMock(
+            return_value=MagicMock(input_tokens=11)
+        )
+
+        first = await client.count_tokens_exact("Hello world")
+        second = await client.count_tokens_exact("Hello world")
+
+        assert first == second == 11
+        client._client.messages.count_tokens.assert_awaited_once()
 
 
 class TestClaudeResponse:
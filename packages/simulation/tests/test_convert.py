@@ -0,0 +1,189 @@
+"""Tests for the provider-neutral message and tool converters."""
+
+import threading
+
+import pytest
+
+from atlas_town.clients._convert import (
+    OFF_LOOP_MESSAGE_THRESHOLD,
+    HistoryConverter,
+    convert_history,
+    extend_anthropic_messages,
+    json_schema_to_gemini,
+    to_anthropic_messages,
+    to_openai_messages,
+    to_openai_tools,
+)
+
+HISTORY = [
+    {"role": "user", "content": "Pay the bill"},
+    {
+        "role": "assistant",
+        "content": "",
+        "tool_calls": [
+            {"id": "c1", "name": "get_bill", "arguments": {"id": "b1"}},
+            {"id": "c2", "name": "list_accounts", "arguments": {}},
+        ],
+    },
+    {"role": "tool_result", "tool_call_id": "c1", "content": "{}"},
+    {"role": "tool_result", "tool_call_id": "c2", "content": "[]"},
+    {"role": "user", "content": "Thanks"},
+]
+
+
+class TestConverters:
+    """Tests for the shared converter functions."""
+
+    def test_gemini_schema_keeps_nesting_and_order(self):
+        """Test nested objects and arrays convert with property order intact."""
+        schema = {
+            "type": "object",
+            "properties": {
+                "lines": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "amount": {"type": "number"},
+                            "memo": {"type": "string", "description": "Note"},
+                        },
+                        "required": ["amount"],
+                    },
+                },
+                "status": {"type": "string", "enum": ["draft", "sent"]},
+                "extra": {"type": "null"},
+            },
+        }
+
+        converted = json_schema_to_gemini(schema)
+
+        assert list(converted["properties"]) == ["lines", "status", "extra"]
+        line = converted["properties"]["lines"]["items"]
+        assert line == {
+            "type": "OBJECT",
+            "properties": {
+                "amount": {"type": "NUMBER"},
+                "memo": {"type": "STRING", "description": "Note"},
+            },
+            "required": ["amount"],
+        }
+        assert converted["properties"]["status"]["enum"] == ["draft", "sent"]
+        assert converted["properties"]["extra"] == {"type": "STRING"}
+
+    def test_gemini_schema_handles_deep_nesting(self):
+        """Test nesting deeper than the recursion limit converts."""
+        schema: dict = {"type": "string"}
+        for _ in range(2000):
+            schema = {"type": "array", "items": schema}
+
+        converted = json_schema_to_gemini(schema)
+
+        for _ in range(2000):
+            assert converted["type"] == "ARRAY"
+            converted = converted["items"]
+        assert converted == {"type": "STRING"}
+
+    def test_anthropic_merges_tool_results_of_one_turn(self):
+        """Test consecutive results share a user message and later turns don't."""
+        converted = to_anthropic_messages(HISTORY)
+
+        assert [m["role"] for m in converted] == ["user", "assistant", "user", "user"]
+        assert [b["tool_use_id"] for b in converted[2]["content"]] == ["c1", "c2"]
+        assert converted[3] == {"role": "user", "content": "Thanks"}
+
+    def test_openai_variant_encodes_arguments_and_omits_empty_content(self):
+        """Test the OpenAI flavour sends JSON-string arguments."""
+        converted = to_openai_messages("sys", HISTORY)
+
+        assistant = converted[2]
+        assert "content" not in assistant
+        assert assistant["tool_calls"][0]["function"]["arguments"] == '{"id":"b1"}'
+        assert converted[3] == {"role": "tool", "tool_call_id": "c1", "content": "{}"}
+
+    def test_ollama_variant_keeps_argument_dicts_and_content(self):
+        """Test the Ollama flavour passes dicts and always sets content."""
+        converted = to_openai_messages(
+            "sys", HISTORY, arguments_as_json=False, require_content=True
+        )
+
+        assistant = converted[2]
+        assert assistant["content"] == ""
+        assert assistant["tool_calls"][0]["function"]["arguments"] == {"id": "b1"}
+
+    def test_openai_tools(self):
+        """Test tools map input_schema to function parameters."""
+        tools = [{"name": "t", "description": "d", "input_schema": {"type": "object"}}]
+
+        assert to_openai_tools(tools) == [
+            {
+                "type": "function",
+                "function": {"name": "t", "description": "d", "parameters": {"type": "object"}},
+            }
+        ]
+
+    @pytest.mark.asyncio
+    async def test_only_long_histories_convert_off_the_loop(self):
+        """Test conversion moves to a worker thread past the threshold."""
+
+        def current_thread(_messages):
+            return threading.current_thread()
+
+        short = [{"role": "user", "content": "hi"}]
+        long = short * (OFF_LOOP_MESSAGE_THRESHOLD + 1)
+
+        assert await convert_history(short, current_thread, short) is threading.current_thread()
+        assert await convert_history(long, current_thread, long) is not threading.current_thread()
+
+
+class TestHistoryConverter:
+    """Tests for incremental history conversion."""
+
+    @pytest.mark.asyncio
+    async def test_appended_messages_are_converted_alone(self):
+        """Test only the new tail is converted and the result matches a full run."""
+        converted_counts = []
+
+        def extend(out, messages):
+            converted_counts.append(len(messages))
+            extend_anthropic_messages(out, messages)
+
+        converter = HistoryConverter(extend)
+        # Split between the two results of one turn, so they must still merge
+        history = HISTORY[:3]
+
+        await converter.convert(history)
+        history.extend(HISTORY[3:])
+        converted = await converter.convert(history)
+
+        assert converted_counts == [3, 2]
+        assert converted == to_anthropic_messages(HISTORY)
+
+    @pytest.mark.asyncio
+    async def test_compacted_history_is_converted_again(self):
+        """Test replacing earlier messages in place forces a full conversion."""
+        converted_counts = []
+
+        def extend(out, messages):
+            converted_counts.append(len(messages))
+            extend_anthropic_messages(out, messages)
+
+        converter = HistoryConverter(extend)
+        history = list(HISTORY)
+        await converter.convert(history)
+
+        history[:3] = [{"role": "user", "content": "Summary"}]
+        converted = await converter.convert(history)
+
+        assert converted_counts == [5, 3]
+        assert converted == to_anthropic_messages(history)
+
+    @pytest.mark.asyncio
+    async def test_callers_get_their_own_list(self):
+        """Test modifying a returned list doesn't leak into later results."""
+        converter = HistoryConverter(extend_anthropic_messages)
+        history = list(HISTORY)
+
+        first = await converter.convert(history)
+        first[-1] = {"role": "user", "content": "changed"}
+
+        assert await converter.convert(history) == to_anthropic_messages(HISTORY)
@@ -1,5 +1,9 @@
 """Tests for customer and vendor agent implementations."""
 
+import dataclasses
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
 
 from atlas_town.agents.customer import (
     CUSTOMER_ARCHETYPES,
@@ -7,11 +11,14 @@ from atlas_town.agents.customer import (
     CustomerProfile,
     CustomerType,
     create_customers_for_industry,
+    get_archetype_columns,
+    simulate_payments,
 )
 from atlas_town.agents.vendor import (
     VENDOR_ARCHETYPES,
     VendorAgent,
     VendorProfile,
+    VendorSchedule,
     VendorType,
     create_vendors_for_industry,
 )
@@ -28,7 +35,7 @@ class TestCustomerProfile:
             payment_reliability=0.9,
             average_order_value=100.0,
             order_frequency="weekly",
-            preferred_services=["service_a", "service_b"],
+            preferred_services=("service_a", "service_b"),
             payment_method="credit_card",
         )
 
@@ -36,6 +43,14 @@ class TestCustomerProfile:
         assert profile.customer_type == CustomerType.RESIDENTIAL
         assert profile.payment_reliability == 0.9
 
+    def test_profiles_are_immutable_and_hashable(self):
+        """Test archetype profiles can be used as cache keys."""
+        profile = CUSTOMER_ARCHETYPES["landscaping"][0]
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            profile.name = "Changed"  # type: ignore[misc]
+        assert {profile: 1}[profile] == 1
+
     def test_customer_type_values(self):
         """Test CustomerType enum values."""
         assert CustomerType.RESIDENTIAL.value == "residential"
@@ -70,10 +85,32 @@ class TestCustomerArchetypes:
                 assert profile.average_order_value > 0
                 assert profile.order_frequency in ["daily", "weekly", "monthly", "occasional"]
 
+    def test_archetypes_are_read_only(self):
+        """Test that the archetype table can't be modified in place."""
+        with pytest.raises(TypeError):
+            CUSTOMER_ARCHETYPES["landscaping"] = ()  # type: ignore[index]
+        assert isinstance(CUSTOMER_ARCHETYPES["landscaping"], tuple)
+
+    def test_create_customers_for_unknown_industry(self):
+        """Test that an unknown industry yields no customers."""
+        assert create_customers_for_industry("unknown") == []
+
 
 class TestCustomerAgent:
     """Tests for CustomerAgent class."""
 
+    def test_log_context_includes_customer_fields(self):
+        """Test customer details are bound per block rather than per instance."""
+        import structlog
+
+        agent = CustomerAgent(CUSTOMER_ARCHETYPES["landscaping"][0], "landscaping")
+
+        with agent.log_context():
+            bound = structlog.contextvars.get_contextvars()
+            assert bound["agent_id"] == str(agent.id)
+            assert bound["customer_type"] == "residential"
+            assert bound["industry"] == "landscaping"
+
     def test_customer_initialization(self):
         """Test customer agent initializes correctly."""
         profile = CUSTOMER_ARCHETYPES["restaurant"][0]
@@ -86,9 +123,11 @@ class TestCustomerAgent:
         """Test that customers don't have tools."""
         profile = CUSTOMER_ARCHETYPES["landscaping"][0]
         agent = CustomerAgent(profile=profile, business_industry="landscaping")
+        other = CustomerAgent(profile=profile, business_industry="landscaping")
 
         tools = agent._get_tools()
-        assert tools == []
+        assert len(tools) == 0
+        assert tools is other._get_tools()
 
     def test_customer_system_prompt_includes_profile(self):
         """Test system prompt includes profile details."""
@@ -99,6 +138,32 @@ class TestCustomerAgent:
         assert profile.name in prompt
         assert str(profile.average_order_value) in prompt
 
+    @pytest.mark.asyncio
+    async def test_purchase_requests_batch_keeps_agent_order(self):
+        """Test batched purchase requests come back in agent order."""
+        agents = create_customers_for_industry("restaurant")
+        for agent in agents:
+            agent._llm_client = MagicMock()
+            agent._llm_client.generate = AsyncMock(
+                return_value=MagicMock(content=f"order from {agent.name}", tool_calls=[])
+            )
+
+        requests = await CustomerAgent.generate_purchase_requests_batch(agents)
+
+        assert [r["request"] for r in requests] == [f"order from {a.name}" for a in agents]
+
+    def test_will_pay_on_time_uses_injected_rng(self):
+        """Test a seeded generator makes payment outcomes reproducible."""
+        import random
+
+        profile = CUSTOMER_ARCHETYPES["healthcare"][2]
+        first = CustomerAgent(profile, "healthcare", rng=random.Random(7))
+        second = CustomerAgent(profile, "healthcare", rng=random.Random(7))
+
+        assert [first.will_pay_on_time() for _ in range(20)] == [
+            second.will_pay_on_time() for _ in range(20)
+        ]
+
     def test_will_pay_on_time_respects_reliability(self):
         """Test payment reliability affects behavior."""
         # High reliability customer
@@ -108,7 +173,7 @@ class TestCustomerAgent:
             payment_reliability=1.0,  # Always pays
             average_order_value=100.0,
             order_frequency="monthly",
-            preferred_services=["service"],
+            preferred_services=("service",),
             payment_method="check",
         )
         high_agent = CustomerAgent(profile=high_profile, business_industry="test")
@@ -118,6 +183,67 @@ class TestCustomerAgent:
             assert high_agent.will_pay_on_time() is True
 
 
+class TestSimulatePayments:
+    """Tests for bulk payment simulation."""
+
+    def test_shape_and_certain_outcomes(self):
+        """Test one row per trial and fixed outcomes at 0/1 reliability."""
+        import random
+
+        always = dataclasses.replace(
+            CUSTOMER_ARCHETYPES["restaurant"][0], payment_reliability=1.0
+        )
+        never = dataclasses.replace(always, payment_reliability=0.0)
+
+        outcomes = simulate_payments([always, never], n_trials=50, rng=random.Random(1))
+
+        assert len(outcomes) == 50
+        assert all(row == [True, False] for row in outcomes)
+
+    def test_simulate_payments_matches_per_agent_draws(self):
+        """Test batch simulation consumes draws in the same order as agents do."""
+        import random
+
+        profiles = CUSTOMER_ARCHETYPES["healthcare"]
+        batch = simulate_payments(profiles, n_trials=20, rng=random.Random(7))
+
+        rng = random.Random(7)
+        agents = [CustomerAgent(p, "healthcare", rng=rng) for p in profiles]
+        per_agent = [[a.will_pay_on_time() for a in agents] for _ in range(20)]
+
+        assert batch == per_agent
+
+
+class TestArchetypeColumns:
+    """Tests for the column-wise archetype view."""
+
+    def test_columns_match_profiles(self):
+        """Test each column lines up with the archetype table."""
+        profiles = CUSTOMER_ARCHETYPES["technology"]
+        columns = get_archetype_columns("technology")
+
+        assert columns.reliability == tuple(p.payment_reliability for p in profiles)
+        assert columns.avg_value == tuple(p.average_order_value for p in profiles)
+        assert columns.frequency == tuple(p.order_frequency for p in profiles)
+
+    def test_unknown_industry_is_empty(self):
+        """Test an unknown industry yields empty columns."""
+        assert get_archetype_columns("unknown").reliability == ()
+        assert get_archetype_columns("unknown").avg_value == ()
+
+
+class TestArchetypeKeys:
+    """Tests for archetype table keys."""
+
+    def test_persona_industries_share_archetype_key_objects(self):
+        """Test YAML-loaded industries are the same objects as the table keys."""
+        from atlas_town.config.personas_loader import load_persona_industries
+
+        keys = {k: k for k in CUSTOMER_ARCHETYPES}
+        for industry in load_persona_industries().values():
+            assert keys[industry] is industry
+
+
 class TestCreateCustomersForIndustry:
     """Tests for customer factory function."""
 
@@ -128,6 +254,15 @@ class TestCreateCustomersForIndustry:
         assert len(customers) > 0
         assert all(isinstance(c, CustomerAgent) for c in customers)
 
+    def test_customers_share_client_and_rendered_prompts(self):
+        """Test repeated customer creation reuses the client and prompt strings."""
+        first = create_customers_for_industry("restaurant")
+        second = create_customers_for_industry("restaurant")
+
+        assert len({id(c._llm_client) for c in first + second}) == 1
+        for a, b in zip(first, second, strict=True):
+            assert a._get_system_prompt() is b._get_system_prompt()
+
     def test_returns_empty_for_unknown_industry(self):
         """Test factory returns empty list for unknown industry."""
         customers = create_customers_for_industry("unknown_industry")
@@ -199,13 +334,73 @@ class TestVendorAgent:
         assert agent.name == profile.name
         assert agent.profile == profile
 
+    def test_vendor_construction_skips_logger_bind(self, monkeypatch):
+        """Test vendors bind their logger on first log, not in __init__."""
+        from atlas_town.agents import base
+
+        monkeypatch.setattr(base, "logger", MagicMock())
+        agent = VendorAgent(VENDOR_ARCHETYPES["technology"][0], "technology")
+        assert "_logger" not in vars(agent)
+        base.logger.bind.assert_not_called()
+
+        agent._logger.info("probe")
+        base.logger.bind.assert_called_once_with(**agent._log_fields())
+
+    def test_vendor_log_fields_are_bound(self):
+        """Test vendor details tag the agent's own logs and its log_context()."""
+        import structlog
+
+        agent = VendorAgent(VENDOR_ARCHETYPES["technology"][0], "technology")
+        with structlog.testing.capture_logs() as logs:
+            agent._logger.info("probe")
+        assert logs[0]["vendor_type"] == "recurring"
+        assert logs[0]["agent_id"] == str(agent.id)
+
+        with agent.log_context():
+            bound = structlog.contextvars.get_contextvars()
+            assert bound["vendor_type"] == "recurring"
+            assert bound["category"] == "cloud_hosting"
+        assert "vendor_type" not in structlog.contextvars.get_contextvars()
+
+    def test_profile_keys_are_interned(self):
+        """Test runtime-built profiles share storage for repeated keys."""
+        parts = ["month", "ly"]
+        profile = VendorProfile(
+            name="Runtime Vendor",
+            vendor_type=VendorType.RECURRING,
+            category="".join(["soft", "ware"]),
+            typical_amount=10.0,
+            billing_frequency="".join(parts),
+            payment_terms=30,
+            description="Built at runtime",
+        )
+
+        assert profile.billing_frequency is VENDOR_ARCHETYPES["technology"][0].billing_frequency
+        assert profile.category is VENDOR_ARCHETYPES["restaurant"][3].category
+
+    def test_vendors_share_llm_client(self):
+        """Test vendors reuse one pooled client instead of building their own."""
+        first, second = create_vendors_for_industry("restaurant")[:2]
+
+        assert first._llm_client is second._llm_client
+
+    def test_price_increase_leaves_archetype_unchanged(self):
+        """Test a price increase only affects the agent that received it."""
+        profile = VENDOR_ARCHETYPES["landscaping"][0]
+        agent = VendorAgent(profile=profile, business_industry="landscaping")
+
+        agent.apply_price_increase(1.1)
+
+        assert agent.profile.typical_amount == round(profile.typical_amount * 1.1, 2)
+        assert VENDOR_ARCHETYPES["landscaping"][0].typical_amount == profile.typical_amount
+
     def test_vendor_has_no_tools(self):
         """Test that vendors don't have tools."""
         profile = VENDOR_ARCHETYPES["technology"][0]
         agent = VendorAgent(profile=profile, business_industry="technology")
 
         tools = agent._get_tools()
-        assert tools == []
+        assert len(tools) == 0
 
     def test_vendor_system_prompt_includes_profile(self):
         """Test system prompt includes profile details."""
@@ -233,6 +428,62 @@ class TestVendorAgent:
         for day in range(1, 32):
             assert agent.should_send_bill_today(day) is True
 
+    def test_monthly_vendor_bills_once_on_stable_day(self):
+        """Test monthly vendors bill on one day derived from their name."""
+        import zlib
+
+        profile = next(
+            p for p in VENDOR_ARCHETYPES["landscaping"] if p.billing_frequency == "monthly"
+        )
+        agent = VendorAgent(profile=profile, business_industry="landscaping")
+
+        billing_days = [d for d in range(1, 32) if agent.should_send_bill_today(d)]
+
+        assert billing_days == [zlib.crc32(profile.name.encode()) % 28 + 1]
+
+
+class TestVendorSchedule:
+    """Tests for batch vendor billing schedules."""
+
+    def test_due_on_matches_per_vendor_checks(self):
+        """Test the schedule agrees with should_send_bill_today for every day."""
+        import random
+
+        agent_rng = random.Random(3)
+        vendors = [
+            VendorAgent(profile, industry, rng=agent_rng)
+            for industry, profiles in VENDOR_ARCHETYPES.items()
+            for profile in profiles
+        ]
+        schedule = VendorSchedule.from_vendors(vendors)
+
+        batch_rng = random.Random(3)
+        for day in range(1, 32):
+            expected = [v for v in vendors if v.should_send_bill_today(day)]
+            assert schedule.due_on(day, batch_rng) == expected
+
+    def test_fixed_schedules_are_compiled_per_day(self):
+        """Test non-random vendors are resolved up front for every day."""
+        vendors = [
+            vendor
+            for industry in VENDOR_ARCHETYPES
+            for vendor in create_vendors_for_industry(industry)
+        ]
+
+        schedule = VendorSchedule.from_vendors(vendors)
+
+        assert sorted(schedule.by_day) == list(range(1, 32))
+        assert {vendors[i].profile.billing_frequency for i in schedule.as_needed} == {
+            "as_needed"
+        }
+        for day in range(1, 32):
+            expected = [
+                v
+                for v in vendors
+                if v.profile.billing_frequency != "as_needed" and v.should_send_bill_today(day)
+            ]
+            assert [vendors[i] for i in schedule.by_day[day]] == expected
+
 
 class TestCreateVendorsForIndustry:
     """Tests for vendor factory function."""
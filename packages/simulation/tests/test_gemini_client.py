@@ -0,0 +1,210 @@
+"""Tests for Gemini LLM client."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from google.genai import types
+
+from atlas_town.clients.gemini import GeminiClient
+
+
+class TestGeminiClient:
+    """Tests for GeminiClient."""
+
+    def test_convert_json_schema_to_gemini(self):
+        """Test nested JSON Schema is mapped to Gemini's types."""
+        client = GeminiClient()
+        schema = {
+            "type": "object",
+            "properties": {
+                "ids": {"type": "array", "items": {"type": "string"}},
+                "kind": {"type": "string", "enum": ["a", "b"]},
+            },
+            "required": ["ids"],
+        }
+
+        converted = client._convert_json_schema_to_gemini(schema)
+
+        assert converted == {
+            "type": "OBJECT",
+            "properties": {
+                "ids": {"type": "ARRAY", "items": {"type": "STRING"}},
+                "kind": {"type": "STRING", "enum": ["a", "b"]},
+            },
+            "required": ["ids"],
+        }
+
+    def test_frozen_tools_converted_once(self):
+        """Test a frozen tool tuple is converted once and reused."""
+        from atlas_town.tools.definitions import ACCOUNTANT_TOOLS
+
+        client = GeminiClient()
+
+        first = client._prepare_tools(ACCOUNTANT_TOOLS)
+        second = client._prepare_tools(ACCOUNTANT_TOOLS)
+
+        assert first is second
+        declarations = first[0].function_declarations or []
+        assert len(declarations) == len(ACCOUNTANT_TOOLS)
+
+    def test_mutable_tool_lists_not_memoized(self):
+        """Test lists are converted afresh since they may change in place."""
+        tools = [{"name": "t", "description": "d", "input_schema": {"type": "object"}}]
+        client = GeminiClient()
+
+        assert client._prepare_tools(tools) is not client._prepare_tools(tools)
+
+    def test_convert_messages_to_gemini_format(self):
+        """Test each neutral role maps to Gemini content."""
+        client = GeminiClient()
+        messages = [
+            {"role": "user", "content": "List customers"},
+            {
+                "role": "assistant",
+                "content": "Checking.",
+                "tool_calls": [{"id": "c1", "name": "list_customers", "arguments": {}}],
+            },
+            {"role": "tool_result", "tool_call_id": "c1", "content": "[]"},
+            {"role": "system", "content": "ignored"},
+        ]
+
+        contents = client._convert_messages_to_gemini_format(messages)
+
+        assert [c.role for c in contents] == ["user", "model", "user"]
+        model_parts = contents[1].parts or []
+        assert model_parts[0].text == "Checking."
+        assert model_parts[1].function_call is not None
+        assert model_parts[1].function_call.name == "list_customers"
+        result_parts = contents[2].parts or []
+        assert result_parts[0].function_response is not None
+        assert result_parts[0].function_response.response == {"result": "[]"}
+
+    @pytest.mark.asyncio
+    async def test_streamed_function_calls_reported_before_response(self):
+        """Test on_tool_use fires per streamed call and chunks are folded."""
+        client = GeminiClient()
+        chunks = [
+            types.GenerateContentResponse(
+                candidates=[
+                    types.Candidate(
+                        content=types.Content(
+                            role="model",
+                            parts=[types.Part(text="Let me "), types.Part(text="check.")],
+                        )
+                    )
+                ]
+            ),
+            types.GenerateContentResponse(
+                candidates=[
+                    types.Candidate(
+                        content=types.Content(
+                            role="model",
+                            parts=[
+                                types.Part(
+                                    function_call=types.FunctionCall(
+                                        name="list_customers", args={"limit": 5}
+                                    )
+                                )
+                            ],
+                        ),
+                        finish_reason=types.FinishReason.STOP,
+                    )
+                ],
+                usage_metadata=types.GenerateContentResponseUsageMetadata(
+                    prompt_token_count=12, candidates_token_count=4
+                ),
+            ),
+        ]
+
+        async def stream():
+            for chunk in chunks:
+                yield chunk
+
+        client._client = MagicMock()
+        client._client.aio.models.generate_content_stream = AsyncMock(return_value=stream())
+        seen = []
+
+        response = await client.generate(
+            "You are Sarah",
+            [{"role": "user", "content": "Hi"}],
+            on_tool_use=lambda name, args: seen.append((name, args)),
+        )
+
+        assert seen == [("list_customers", {"limit": 5})]
+        assert response.content == "Let me check."
+        assert response.tool_calls[0]["name"] == "list_customers"
+        assert response.stop_reason == "tool_use"
+        assert response.usage["input_tokens"] == 12
+        client._client.aio.models.generate_content.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_warmup_lists_one_model(self):
+        """Test warmup makes one cheap request through the SDK client."""
+        client = GeminiClient()
+        client._client = MagicMock()
+        client._client.aio.models.list = AsyncMock()
+
+        await client.warmup()
+
+        client._client.aio.models.list.assert_awaited_once_with(config={"page_size": 1})
+
+    def test_parse_maps_finish_reason_and_joins_text(self):
+        """Test finish reasons map by value and all text parts are kept."""
+        client = GeminiClient()
+        response = types.GenerateContentResponse(
+            candidates=[
+                types.Candidate(
+                    content=types.Content(
+                        role="model", parts=[types.Part(text="a"), types.Part(text="b")]
+                    ),
+                    finish_reason=types.FinishReason.MAX_TOKENS,
+                )
+            ]
+        )
+
+        parsed = client._parse_response(response)
+
+        assert parsed.content == "ab"
+        assert parsed.stop_reason == "max_tokens"
+
+    @pytest.mark.asyncio
+    async def test_context_cache_created_once_and_referenced(self):
+        """Test the prompt and tools are cached once and sent by reference."""
+        from atlas_town.tools.definitions import OWNER_TOOLS
+
+        client = GeminiClient()
+        client._context_cache_ttl = 3600
+        client._client = MagicMock()
+        client._client.aio.caches.create = AsyncMock(
+            return_value=types.CachedContent(name="cachedContents/abc")
+        )
+        client._client.aio.models.generate_content = AsyncMock(
+            return_value=types.GenerateContentResponse(candidates=[])
+        )
+        messages = [{"role": "user", "content": "Hi"}]
+
+        await client.generate("You are Craig", messages, OWNER_TOOLS)
+        await client.generate("You are Craig", messages, OWNER_TOOLS)
+
+        client._client.aio.caches.create.assert_awaited_once()
+        config = client._client.aio.models.generate_content.await_args.kwargs["config"]
+        assert config.cached_content == "cachedContents/abc"
+        assert config.system_instruction is None
+        assert config.tools is None
+
+    @pytest.mark.asyncio
+    async def test_context_cache_failure_falls_back_to_inline_prompt(self):
+        """Test a prefix that can't be cached is sent inline."""
+        client = GeminiClient()
+        client._context_cache_ttl = 3600
+        client._client = MagicMock()
+        client._client.aio.caches.create = AsyncMock(side_effect=RuntimeError("too small"))
+        client._client.aio.models.generate_content = AsyncMock(
+            return_value=types.GenerateContentResponse(candidates=[])
+        )
+
+        await client.generate("You are Craig", [{"role": "user", "content": "Hi"}])
+
+        config = client._client.aio.models.generate_content.await_args.kwargs["config"]
+        assert config.cached_content is None
+        assert config.system_instruction == "You are Craig"
@@ -1,12 +1,23 @@
 """Tests for Ollama LLM client."""
 
-from unittest.mock import AsyncMock, MagicMock
+import asyncio
+import json
+from unittest.mock import AsyncMock
 
+import httpx
 import pytest
 
+from atlas_town.clients.cache import ResponseCache
 from atlas_town.clients.ollama import OllamaClient, OllamaResponse
 
 
+def _json_response(body: dict) -> httpx.Response:
+    """Build a successful /api/chat response carrying ``body``."""
+    return httpx.Response(
+        200, json=body, request=httpx.Request("POST", "http://localhost:11434/api/chat")
+    )
+
+
 class TestOllamaClient:
     """Tests for OllamaClient."""
 
@@ -38,6 +49,41 @@ class TestOllamaClient:
 
         assert client._base_url == "http://localhost:11434"
 
+    def test_default_http_client_is_pooled(self):
+        """Test the default transport uses the shared pool settings."""
+        client = OllamaClient()
+
+        pool = client._client._transport._pool
+        assert pool._max_connections == 256
+        assert pool._max_keepalive_connections == 64
+        assert client._client.timeout.read == 120.0
+        assert client._client.timeout.connect == 5.0
+
+    def test_injected_http_client_is_used(self):
+        """Test a shared httpx client can be injected."""
+        shared = httpx.AsyncClient()
+        client = OllamaClient(http_client=shared)
+
+        assert client._client is shared
+
+    def test_frozen_tools_converted_once(self):
+        """Test a frozen tool tuple is converted once and reused."""
+        from atlas_town.tools.definitions import OWNER_TOOLS
+
+        client = OllamaClient()
+
+        first = client._prepare_tools(OWNER_TOOLS)
+
+        assert client._prepare_tools(OWNER_TOOLS) is first
+        assert len(first) == len(OWNER_TOOLS)
+
+    def test_mutable_tool_lists_not_memoized(self):
+        """Test lists are converted afresh since they may change in place."""
+        tools = [{"name": "t", "description": "d", "input_schema": {"type": "object"}}]
+        client = OllamaClient()
+
+        assert client._prepare_tools(tools) is not client._prepare_tools(tools)
+
     def test_convert_tools_to_ollama_format(self):
         """Test tool format conversion to OpenAI-compatible format."""
         client = OllamaClient()
@@ -194,6 +240,27 @@ class TestOllamaClient:
 
         assert parsed.tool_calls[0]["arguments"] == {"customer_id": "123"}
 
+    def test_parse_tool_calls_without_ids_are_numbered(self):
+        """Test calls missing an id get one from their position."""
+        client = OllamaClient()
+
+        response_data = {
+            "message": {
+                "content": "",
+                "tool_calls": [
+                    {"function": {"name": "list_bills", "arguments": {}}},
+                    {"id": "call_kept", "function": {"name": "list_vendors", "arguments": {}}},
+                    {"function": {"name": "list_accounts", "arguments": "not json"}},
+                ],
+            },
+            "done_reason": "stop",
+        }
+
+        parsed = client._parse_response(response_data)
+
+        assert [tc["id"] for tc in parsed.tool_calls] == ["call_0", "call_kept", "call_2"]
+        assert parsed.tool_calls[2]["arguments"] == {}
+
     def test_parse_response_with_length_stop(self):
         """Test parsing response that stopped due to max tokens."""
         client = OllamaClient()
@@ -209,15 +276,29 @@ class TestOllamaClient:
 
         assert parsed.stop_reason == "max_tokens"
 
+    def test_transient_errors(self):
+        """Test overload, outages and connection failures are transient."""
+        request = httpx.Request("POST", "http://localhost:11434/api/chat")
+
+        def status_error(code: int) -> httpx.HTTPStatusError:
+            response = httpx.Response(code, request=request)
+            return httpx.HTTPStatusError("error", request=request, response=response)
+
+        assert OllamaClient.is_transient_error(status_error(503))
+        assert OllamaClient.is_transient_error(httpx.ConnectError("refused"))
+        assert OllamaClient.is_transient_error(httpx.RemoteProtocolError("aborted"))
+        assert not OllamaClient.is_transient_error(status_error(404))
+        assert not OllamaClient.is_transient_error(ValueError("bad"))
+
     def test_count_tokens_approximation(self):
         """Test token counting approximation."""
         client = OllamaClient()
 
-        # ~4 chars per token for English
+        # ~3 chars per token, rounding toward overestimates
         text = "Hello world, this is a test."  # 28 chars
         count = client.count_tokens(text)
 
-        assert count == 7  # 28 // 4
+        assert count == 9  # 28 // 3
 
     @pytest.mark.asyncio
     async def test_generate_makes_correct_api_call(self):
@@ -225,14 +306,12 @@ class TestOllamaClient:
         client = OllamaClient()
 
         # Mock the HTTP response
-        mock_response = MagicMock()
-        mock_response.json.return_value = {
+        mock_response = _json_response({
             "message": {"content": "Response from model"},
             "done_reason": "stop",
             "prompt_eval_count": 50,
             "eval_count": 20,
-        }
-        mock_response.raise_for_status = MagicMock()
+        })
 
         client._client.post = AsyncMock(return_value=mock_response)
 
@@ -247,7 +326,8 @@ class TestOllamaClient:
         call_args = client._client.post.call_args
 
         assert call_args[0][0] == "http://localhost:11434/api/chat"
-        payload = call_args[1]["json"]
+        assert call_args[1]["headers"]["Content-Type"] == "application/json"
+        payload = json.loads(call_args[1]["content"])
         assert payload["model"] == "qwen3:30b"
         assert payload["stream"] is False
         assert len(payload["messages"]) == 2  # system + user
@@ -261,8 +341,7 @@ class TestOllamaClient:
         """Test generate method includes tools in API call."""
         client = OllamaClient()
 
-        mock_response = MagicMock()
-        mock_response.json.return_value = {
+        mock_response = _json_response({
             "message": {
                 "content": "",
                 "tool_calls": [
@@ -275,8 +354,7 @@ class TestOllamaClient:
             "done_reason": "stop",
             "prompt_eval_count": 30,
             "eval_count": 10,
-        }
-        mock_response.raise_for_status = MagicMock()
+        })
 
         client._client.post = AsyncMock(return_value=mock_response)
 
@@ -295,7 +373,7 @@ class TestOllamaClient:
         )
 
         call_args = client._client.post.call_args
-        payload = call_args[1]["json"]
+        payload = json.loads(call_args[1]["content"])
 
         assert "tools" in payload
         assert len(payload["tools"]) == 1
@@ -304,6 +382,124 @@ class TestOllamaClient:
         assert len(result.tool_calls) == 1
         assert result.stop_reason == "tool_use"
 
+    @pytest.mark.asyncio
+    async def test_requests_beyond_server_parallelism_wait(self):
+        """Test at most max_parallel requests are sent to the server at once."""
+        client = OllamaClient(max_parallel=2)
+        in_flight = 0
+        peak = 0
+
+        async def post(*args, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return _json_response({"message": {"content": "ok"}, "done_reason": "stop"})
+
+        client._client.post = post
+
+        results = await asyncio.gather(
+            *(client.generate("System", [{"role": "user", "content": str(i)}]) for i in range(5))
+        )
+
+        assert peak == 2
+        assert [r.content for r in results] == ["ok"] * 5
+
+    @pytest.mark.asyncio
+    async def test_streamed_tool_calls_reported_before_response(self):
+        """Test tool calls reach on_tool_use while the stream is still open."""
+        events = []
+        lines = [
+            {"message": {"role": "assistant", "content": "Checking "}, "done": False},
+            {"message": {"role": "assistant", "content": "invoices"}, "done": False},
+            {
+                "message": {
+                    "role": "assistant",
+                    "content": "",
+                    "tool_calls": [
+                        {"function": {"name": "list_invoices", "arguments": {"limit": 5}}}
+                    ],
+                },
+                "done": False,
+            },
+            {
+                "message": {"role": "assistant", "content": ""},
+                "done": True,
+                "done_reason": "stop",
+                "prompt_eval_count": 40,
+                "eval_count": 12,
+            },
+        ]
+
+        async def ndjson():
+            for line in lines:
+                if line["done"]:
+                    events.append("done_sent")
+                yield (json.dumps(line) + "\n").encode()
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            assert json.loads(request.content)["stream"] is True
+            return httpx.Response(200, content=ndjson())
+
+        client = OllamaClient(http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+        result = await client.generate(
+            "System",
+            [{"role": "user", "content": "List invoices"}],
+            on_tool_use=lambda name, args: events.append((name, args)),
+        )
+
+        assert events == [("list_invoices", {"limit": 5}), "done_sent"]
+        assert result.content == "Checking invoices"
+        assert result.tool_calls == [
+            {"id": "call_0", "name": "list_invoices", "arguments": {"limit": 5}}
+        ]
+        assert result.stop_reason == "tool_use"
+        assert result.usage == {"input_tokens": 40, "output_tokens": 12}
+
+    @pytest.mark.asyncio
+    async def test_cached_tool_calls_replayed_to_callback(self):
+        """Test a cache hit still reports its tool calls to on_tool_use."""
+        client = OllamaClient(response_cache=ResponseCache())
+        client._client.post = AsyncMock(
+            return_value=_json_response({
+                "message": {
+                    "content": "",
+                    "tool_calls": [{"function": {"name": "list_bills", "arguments": {}}}],
+                },
+                "done_reason": "stop",
+            })
+        )
+        messages = [{"role": "user", "content": "Bills?"}]
+        await client.generate("System", messages, cache_key_extra="v1")
+
+        reported = []
+        result = await client.generate(
+            "System",
+            messages,
+            on_tool_use=lambda name, args: reported.append(name),
+            cache_key_extra="v1",
+        )
+
+        assert client._client.post.await_count == 1
+        assert reported == ["list_bills"]
+        assert result.stop_reason == "tool_use"
+
+    @pytest.mark.asyncio
+    async def test_stream_error_line_raises(self):
+        """Test an error reported mid-stream fails the request."""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, content=b'{"error": "model crashed"}\n')
+
+        client = OllamaClient(http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+        with pytest.raises(httpx.RemoteProtocolError, match="model crashed"):
+            await client.generate(
+                "System", [{"role": "user", "content": "Hi"}], on_tool_use=lambda n, a: None
+            )
+
     @pytest.mark.asyncio
     async def test_close_closes_client(self):
         """Test close method closes the HTTP client."""
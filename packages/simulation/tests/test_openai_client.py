@@ -0,0 +1,190 @@
+"""Tests for OpenAI LLM client."""
+
+import asyncio
+import dataclasses
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import openai
+import pytest
+
+from atlas_town.clients import openai_client
+from atlas_town.clients.cache import ResponseCache
+from atlas_town.clients.openai_client import OpenAIClient
+
+
+def _completion(content: str = "Done") -> SimpleNamespace:
+    """Build a minimal chat completion with no tool calls or usage."""
+    message = SimpleNamespace(content=content, tool_calls=None)
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=message, finish_reason="stop")],
+        usage=None,
+    )
+
+
+class TestOpenAIClient:
+    """Tests for OpenAIClient."""
+
+    def test_frozen_tools_converted_once(self):
+        """Test a frozen tool tuple is converted once and reused."""
+        from atlas_town.tools.definitions import OWNER_TOOLS
+
+        client = OpenAIClient(api_key="test")
+
+        first = client._prepare_tools(OWNER_TOOLS)
+
+        assert client._prepare_tools(OWNER_TOOLS) is first
+        assert len(first) == len(OWNER_TOOLS)
+
+    def test_mutable_tool_lists_not_memoized(self):
+        """Test lists are converted afresh since they may change in place."""
+        tools = [{"name": "t", "description": "d", "input_schema": {"type": "object"}}]
+        client = OpenAIClient(api_key="test")
+
+        assert client._prepare_tools(tools) is not client._prepare_tools(tools)
+
+    def test_gpt5_nano_request_options(self):
+        """Test GPT-5 models get max_completion_tokens and nano no temperature."""
+        client = OpenAIClient(api_key="test", model="gpt-5-nano", max_tokens=512)
+
+        assert client._request_options == {"model": "gpt-5-nano", "max_completion_tokens": 512}
+
+    def test_classic_model_request_options(self):
+        """Test older models get max_tokens and temperature."""
+        client = OpenAIClient(api_key="test", model="gpt-4o", max_tokens=512, temperature=0.5)
+
+        assert client._request_options == {
+            "model": "gpt-4o",
+            "temperature": 0.5,
+            "max_tokens": 512,
+        }
+
+    @pytest.mark.asyncio
+    async def test_prompt_cache_key_is_per_request(self):
+        """Test one client sends each caller's own prompt cache key."""
+        client = OpenAIClient(api_key="test", model="gpt-4o")
+        create = AsyncMock(return_value=_completion())
+        client._client.chat.completions.create = create
+        messages = [{"role": "user", "content": "Hi"}]
+
+        await client.generate("System", messages, prompt_cache_key="atlas-town-owner-craig")
+        await client.generate("System", messages)
+
+        assert create.await_args_list[0].kwargs["prompt_cache_key"] == "atlas-town-owner-craig"
+        assert "prompt_cache_key" not in create.await_args_list[1].kwargs
+
+    @pytest.mark.asyncio
+    async def test_generate_awaits_the_async_client(self):
+        """Test generate awaits the SDK call and parses its result."""
+        client = OpenAIClient(api_key="test", model="gpt-4o")
+        create = AsyncMock(return_value=_completion())
+        client._client.chat.completions.create = create
+
+        response = await client.generate("System", [{"role": "user", "content": "Hi"}])
+
+        assert response.content == "Done"
+        assert response.stop_reason == "end_turn"
+        assert create.await_args.kwargs["model"] == "gpt-4o"
+        assert create.await_args.kwargs["max_tokens"] == client._max_tokens
+        sent = create.await_args.kwargs["messages"]
+        assert sent == [
+            {"role": "system", "content": "System"},
+            {"role": "user", "content": "Hi"},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_generates_overlap(self):
+        """Test gathered requests are in flight together rather than queued."""
+        client = OpenAIClient(api_key="test", model="gpt-4o")
+        in_flight = 0
+        peak = 0
+
+        async def create(**kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return _completion()
+
+        client._client.chat.completions.create = create
+
+        await asyncio.gather(
+            *(client.generate("System", [{"role": "user", "content": str(i)}]) for i in range(3))
+        )
+
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_deterministic_requests_served_from_response_cache(self):
+        """Test a temperature-0 request skips the API on a repeat."""
+        client = OpenAIClient(api_key="test", model="gpt-4o", response_cache=ResponseCache())
+        client._temperature = 0
+        create = AsyncMock(return_value=_completion())
+        client._client.chat.completions.create = create
+        messages = [{"role": "user", "content": "Hi"}]
+
+        first = await client.generate("System", messages)
+        second = await client.generate("System", messages)
+
+        assert first.content == second.content == "Done"
+        assert create.await_count == 1
+
+    def test_responses_are_immutable(self):
+        """Test parsed responses are frozen and carry no instance dict."""
+        client = OpenAIClient(api_key="test")
+        response = client._parse_response(_completion())
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            response.content = "changed"  # type: ignore[misc]
+        assert not hasattr(response, "__dict__")
+
+    def test_transient_errors(self):
+        """Test rate limits, outages and connection failures are transient."""
+        request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+        def status_error(code: int) -> openai.APIStatusError:
+            response = httpx.Response(code, request=request)
+            return openai.APIStatusError("error", response=response, body=None)
+
+        assert OpenAIClient.is_transient_error(status_error(429))
+        assert OpenAIClient.is_transient_error(status_error(503))
+        assert OpenAIClient.is_transient_error(openai.APIConnectionError(request=request))
+        assert not OpenAIClient.is_transient_error(status_error(400))
+        assert not OpenAIClient.is_transient_error(ValueError("bad"))
+
+    @pytest.mark.asyncio
+    async def test_close_closes_sdk_client(self):
+        """Test close releases the SDK's connection pool."""
+        client = OpenAIClient(api_key="test")
+
+        await client.close()
+
+        assert client._client.is_closed()
+
+    def test_count_tokens_estimates_without_tiktoken(self, monkeypatch):
+        """Test the character heuristic is used when no encoding is available."""
+        monkeypatch.setattr(openai_client, "_encoding_for", lambda model: None)
+        client = OpenAIClient(api_key="test")
+
+        assert client.count_tokens("Hello world, this is a test.") == 9  # 28 // 3
+
+    def test_count_tokens_uses_model_encoding(self, monkeypatch):
+        """Test an available tiktoken encoding gives the exact count."""
+        encoding = MagicMock()
+        encoding.encode.return_value = [1, 2, 3, 4]
+        monkeypatch.setattr(openai_client, "_encoding_for", lambda model: encoding)
+        client = OpenAIClient(api_key="test", model="gpt-4o")
+
+        assert client.count_tokens("Hello world") == 4
+        encoding.encode.assert_called_once_with("Hello world", disallowed_special=())
+
+    def test_count_tokens_estimates_for_compatible_servers(self, monkeypatch):
+        """Test LM Studio models, which tiktoken doesn't cover, are estimated."""
+        encoding = MagicMock()
+        monkeypatch.setattr(openai_client, "_encoding_for", lambda model: encoding)
+        client = OpenAIClient(api_key="test", base_url="http://localhost:1234/v1")
+
+        assert client.count_tokens("abcdef") == 2
+        encoding.encode.assert_not_called()
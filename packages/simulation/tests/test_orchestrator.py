@@ -117,6 +117,7 @@ class TestOrchestrator:
         ):
             mock_client = AsyncMock()
             mock_client.login = AsyncMock(return_value={})
+            mock_client.add_write_listener = MagicMock()
             mock_client.organizations = [
                 {"id": str(uuid4()), "name": "Test Org", "industry": "consulting"}
             ]
@@ -168,6 +169,7 @@ class TestOrchestrator:
         ):
             mock_client = AsyncMock()
             mock_client.login = AsyncMock(return_value={})
+            mock_client.add_write_listener = MagicMock()
             mock_client.organizations = []
             mock_client.close = AsyncMock()
             MockClient.return_value = mock_client
@@ -1,14 +1,18 @@
 """Tests for owner agent implementations."""
 
+from unittest.mock import AsyncMock, MagicMock
 from uuid import uuid4
 
 import pytest
 
 from atlas_town.agents.owner import (
     OWNER_PERSONAS,
+    OWNER_SYSTEM_PROMPTS,
     LLMProvider,
     OwnerAgent,
     create_all_owners,
+    create_all_owners_async,
+    get_shared_llm_client,
 )
 
 
@@ -79,6 +83,20 @@ class TestOwnerAgent:
         assert "Main Street Dental" in prompt
         assert "healthcare" in prompt.lower() or "dental" in prompt.lower()
 
+    def test_owner_prompts_share_static_prefix(self):
+        """Test persona details come after the instructions common to all owners."""
+        prefixes = {p.split("## Who You Are")[0] for p in OWNER_SYSTEM_PROMPTS.values()}
+
+        assert len(prefixes) == 1
+        assert "## Guidelines" in prefixes.pop()
+
+    def test_owner_system_prompt_rendered_once(self):
+        """Test owners reuse the prompt rendered for their persona."""
+        agent = OwnerAgent(persona_key="tony")
+
+        assert agent._get_system_prompt() is OWNER_SYSTEM_PROMPTS["tony"]
+        assert set(OWNER_SYSTEM_PROMPTS) == set(OWNER_PERSONAS)
+
     def test_owner_has_read_only_tools(self):
         """Test that owners have read-only tools."""
         agent = OwnerAgent(persona_key="marcus")
@@ -101,6 +119,29 @@ class TestOwnerAgent:
         agent = OwnerAgent(persona_key="craig")
         assert agent.persona.llm_provider == LLMProvider.OPENAI
 
+    @pytest.mark.asyncio
+    async def test_openai_owner_sends_persona_prompt_cache_key(self):
+        """Test OpenAI-backed owners route their prefix to a per-persona cache."""
+        agent = OwnerAgent(persona_key="craig")
+        agent._llm_client = MagicMock(accepts_prompt_cache_key=True)
+        agent._llm_client.generate = AsyncMock(
+            return_value=MagicMock(content="Fine", tool_calls=[], stop_reason="end_turn")
+        )
+        agent.add_user_message("How's business?")
+
+        await agent._generate_response()
+
+        kwargs = agent._llm_client.generate.await_args.kwargs
+        assert kwargs["prompt_cache_key"] == "atlas-town-owner-craig"
+
+    def test_owners_reuse_shared_llm_clients(self):
+        """Test owners on one provider share a client whatever their cache key."""
+        craig = OwnerAgent(persona_key="craig")
+        tony = OwnerAgent(persona_key="tony")
+
+        assert craig._llm_client is tony._llm_client
+        assert craig._llm_client is get_shared_llm_client(LLMProvider.OPENAI)
+
     def test_maya_uses_claude(self):
         """Test Maya (tech) uses Claude."""
         agent = OwnerAgent(persona_key="maya")
@@ -112,6 +153,56 @@ class TestOwnerAgent:
         assert agent.persona.llm_provider == LLMProvider.GEMINI
 
 
+class TestSharedLLMClients:
+    """Tests for the process-wide provider clients."""
+
+    @pytest.mark.asyncio
+    async def test_different_providers_build_in_parallel(self, monkeypatch):
+        """Test one provider's client build doesn't wait for another's."""
+        import asyncio
+        import threading
+
+        from atlas_town.agents import owner
+
+        # Each factory returns only once both are running at the same time
+        both_building = threading.Barrier(2, timeout=5)
+
+        def factory() -> object:
+            both_building.wait()
+            return object()
+
+        monkeypatch.setattr(owner, "_LLM_CLIENTS", {})
+        monkeypatch.setitem(owner._LLM_FACTORIES, LLMProvider.OLLAMA, factory)
+        monkeypatch.setitem(owner._LLM_FACTORIES, LLMProvider.LM_STUDIO, factory)
+
+        ollama, lm_studio = await asyncio.gather(
+            asyncio.to_thread(get_shared_llm_client, LLMProvider.OLLAMA),
+            asyncio.to_thread(get_shared_llm_client, LLMProvider.LM_STUDIO),
+        )
+
+        assert ollama is not lm_studio
+        assert get_shared_llm_client(LLMProvider.OLLAMA) is ollama
+
+
+class TestLazyClientImports:
+    """Tests for deferred provider SDK imports."""
+
+    def test_importing_package_skips_unused_provider_sdks(self):
+        """Test anthropic and google-genai load only when their client is used."""
+        import subprocess
+        import sys
+
+        code = (
+            "import sys, atlas_town; "
+            "print('anthropic' in sys.modules, 'google.genai' in sys.modules)"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+
+        assert out.stdout.split() == ["False", "False"]
+
+
 class TestCreateAllOwners:
     """Tests for create_all_owners factory function."""
 
@@ -145,3 +236,14 @@ class TestCreateAllOwners:
 
         ids = [o.id for o in owners.values()]
         assert len(ids) == len(set(ids))  # All unique
+
+    @pytest.mark.asyncio
+    async def test_async_factory_matches_sync_factory(self):
+        """Test the concurrent factory builds the same owners in the same order."""
+        org_ids = {"maya": uuid4()}
+
+        owners = await create_all_owners_async(org_ids)
+
+        assert list(owners) == list(create_all_owners())
+        assert owners["maya"].current_org_id == org_ids["maya"]
+        assert owners["chen"].current_org_id is None
@@ -0,0 +1,129 @@
+"""Tests for the LLM response cache."""
+
+import asyncio
+
+import pytest
+
+from atlas_town.clients.cache import ResponseCache, make_cache_key
+
+
+class TestMakeCacheKey:
+    """Tests for make_cache_key."""
+
+    def test_key_ignores_dict_ordering(self):
+        """Test logically equal requests produce the same key."""
+        a = make_cache_key("m", "sys", [{"role": "user", "content": "hi"}])
+        b = make_cache_key("m", "sys", [{"content": "hi", "role": "user"}])
+
+        assert a == b
+
+    def test_key_depends_on_every_input(self):
+        """Test changing model, prompt, history or tools changes the key."""
+        messages = [{"role": "user", "content": "hi"}]
+        tools = [{"name": "t", "description": "d", "input_schema": {}}]
+        base = make_cache_key("m", "sys", messages)
+
+        assert make_cache_key("other", "sys", messages) != base
+        assert make_cache_key("m", "sys2", messages) != base
+        assert make_cache_key("m", "sys", [{"role": "user", "content": "yo"}]) != base
+        assert make_cache_key("m", "sys", messages, tools) != base
+
+    def test_key_is_prefixed_by_namespace_and_model(self):
+        """Test the namespace and model lead the key for invalidation."""
+        key = make_cache_key("m", "sys", [], cache_key_extra="v2")
+
+        assert key.startswith("v2:m:")
+
+
+class TestResponseCache:
+    """Tests for ResponseCache."""
+
+    def test_get_returns_a_copy(self):
+        """Test mutating a returned value leaves the cached one intact."""
+        cache: ResponseCache[dict[str, list[int]]] = ResponseCache()
+        cache.put("k", {"calls": [1]})
+
+        cache.get("k")["calls"].append(2)  # type: ignore[index]
+
+        assert cache.get("k") == {"calls": [1]}
+        assert cache.hits == 2
+
+    def test_least_recently_used_entry_evicted(self):
+        """Test the cache holds at most maxsize entries."""
+        cache: ResponseCache[int] = ResponseCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_expired_entry_is_a_miss(self, monkeypatch):
+        """Test entries are dropped once their TTL has passed."""
+        now = [100.0]
+        monkeypatch.setattr("atlas_town.clients.cache.time.monotonic", lambda: now[0])
+        cache: ResponseCache[int] = ResponseCache(ttl=10)
+        cache.put("k", 1)
+
+        now[0] = 111.0
+
+        assert cache.get("k") is None
+        assert len(cache) == 0
+
+    def test_invalidate_by_prefix(self):
+        """Test invalidate drops only the matching namespace."""
+        cache: ResponseCache[int] = ResponseCache()
+        cache.put("v1:m:a", 1)
+        cache.put("v1:m:b", 2)
+        cache.put("v2:m:a", 3)
+
+        assert cache.invalidate("v1:") == 2
+        assert cache.get("v2:m:a") == 3
+        assert cache.invalidate() == 1
+        assert len(cache) == 0
+
+
+class TestGetOrFetch:
+    """Tests for ResponseCache.get_or_fetch."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_fetch(self):
+        """Test identical in-flight requests are coalesced."""
+        cache: ResponseCache[dict[str, str]] = ResponseCache()
+        calls = 0
+
+        async def fetch() -> dict[str, str]:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0)
+            return {"content": "hi"}
+
+        results = await asyncio.gather(*(cache.get_or_fetch("k", fetch) for _ in range(5)))
+
+        assert calls == 1
+        assert [fresh for _, fresh in results].count(True) == 1
+        assert all(value == {"content": "hi"} for value, _ in results)
+        assert cache.coalesced == 4
+
+    @pytest.mark.asyncio
+    async def test_failed_fetch_propagates_to_waiters_and_is_not_cached(self):
+        """Test waiters see the leader's error and the next call retries."""
+        cache: ResponseCache[int] = ResponseCache()
+
+        async def boom() -> int:
+            await asyncio.sleep(0)
+            raise RuntimeError("rate limited")
+
+        async def ok() -> int:
+            return 7
+
+        results = await asyncio.gather(
+            cache.get_or_fetch("k", boom),
+            cache.get_or_fetch("k", boom),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert await cache.get_or_fetch("k", ok) == (7, True)
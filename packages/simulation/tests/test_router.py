@@ -0,0 +1,81 @@
+"""Tests for the provider fallback router."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from atlas_town.clients.router import RouterLLMClient
+
+
+def _client(*, transient: bool = True, streams: bool = False) -> MagicMock:
+    client = MagicMock()
+    client.generate = AsyncMock(return_value=MagicMock(content="ok"))
+    client.is_transient_error = MagicMock(return_value=transient)
+    client.streams_tool_calls = streams
+    return client
+
+
+class TestRouterLLMClient:
+    """Tests for RouterLLMClient."""
+
+    @pytest.mark.asyncio
+    async def test_primary_answer_is_returned(self):
+        """Test the fallback is untouched while the primary succeeds."""
+        primary, fallback = _client(), _client()
+        router = RouterLLMClient(primary, fallback)
+
+        await router.generate("sys", [{"role": "user", "content": "hi"}])
+
+        primary.generate.assert_awaited_once()
+        fallback.generate.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_transient_failure_reroutes_same_request(self):
+        """Test a rate-limited primary hands the request to the fallback."""
+        primary, fallback = _client(transient=True), _client()
+        primary.generate.side_effect = RuntimeError("429")
+        router = RouterLLMClient(primary, fallback)
+        messages = [{"role": "user", "content": "hi"}]
+
+        response = await router.generate("sys", messages, None)
+
+        assert response.content == "ok"
+        fallback.generate.assert_awaited_once_with("sys", messages, None)
+
+    @pytest.mark.asyncio
+    async def test_permanent_failure_is_raised(self):
+        """Test errors the fallback would repeat are not rerouted."""
+        primary, fallback = _client(transient=False), _client()
+        primary.generate.side_effect = ValueError("bad request")
+        router = RouterLLMClient(primary, fallback)
+
+        with pytest.raises(ValueError):
+            await router.generate("sys", [])
+
+        fallback.generate.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_prompt_cache_key_only_reaches_clients_that_take_it(self):
+        """Test the key is forwarded to OpenAI-style clients and dropped for others."""
+        primary, fallback = _client(), _client()
+        primary.accepts_prompt_cache_key = False
+        fallback.accepts_prompt_cache_key = True
+        primary.generate.side_effect = RuntimeError("429")
+        router = RouterLLMClient(primary, fallback)
+
+        await router.generate("sys", [], None, prompt_cache_key="key")
+
+        primary.generate.assert_awaited_once_with("sys", [], None)
+        fallback.generate.assert_awaited_once_with("sys", [], None, prompt_cache_key="key")
+
+    def test_primary_must_classify_errors(self):
+        """Test a primary without is_transient_error is refused, not wrapped."""
+        primary = MagicMock(spec=["generate", "count_tokens"])
+
+        with pytest.raises(TypeError):
+            RouterLLMClient(primary, _client())
+
+    def test_streams_tool_calls_only_when_both_do(self):
+        """Test streaming is advertised only if either client could serve it."""
+        assert RouterLLMClient(_client(streams=True), _client(streams=True)).streams_tool_calls
+        assert not RouterLLMClient(_client(streams=True), _client()).streams_tool_calls
@@ -1,6 +1,7 @@
 """Tests for configuration settings."""
 
-
+import pytest
+from pydantic import ValidationError
 
 
 def test_settings_loads_from_env():
@@ -47,3 +48,45 @@ def test_settings_are_cached():
     settings2 = get_settings()
 
     assert settings1 is settings2
+
+
+def test_settings_are_frozen():
+    """Test the shared settings instance can't be changed by one caller."""
+    from atlas_town.config.settings import get_settings
+
+    settings = get_settings()
+
+    with pytest.raises(ValidationError):
+        settings.ollama_num_parallel = 1
+
+
+def test_invalid_fallback_provider_fails_at_load(monkeypatch):
+    """Test a mistyped fallback provider is rejected when settings load."""
+    from atlas_town.config.settings import FlatSettings
+
+    monkeypatch.setenv("LLM_FALLBACK_PROVIDER", "gpt")
+
+    with pytest.raises(ValidationError, match="LLM_FALLBACK_PROVIDER"):
+        FlatSettings()  # type: ignore[call-arg]
+
+
+def test_blank_fallback_provider_disables_fallback(monkeypatch):
+    """Test an empty LLM_FALLBACK_PROVIDER, as in .env.example, means none."""
+    from atlas_town.config.settings import FlatSettings
+
+    monkeypatch.setenv("LLM_FALLBACK_PROVIDER", "")
+
+    assert FlatSettings().llm_fallback_provider is None  # type: ignore[call-arg]
+
+
+def test_fallback_provider_choices_match_providers():
+    """Test every LLMProvider, and nothing else, is a valid fallback."""
+    from typing import get_args
+
+    from atlas_town.agents.owner import LLMProvider
+    from atlas_town.config.settings import FlatSettings
+
+    annotation = FlatSettings.model_fields["llm_fallback_provider"].annotation
+    choices, _ = get_args(annotation)
+
+    assert set(get_args(choices)) == {p.value for p in LLMProvider}